@@ -0,0 +1,225 @@
+"""
+Benchmark de ponta a ponta das rotas mais usadas, com o backend em memória.
+
+Para cada escala (linhas por unidade de pedidos, itens de pedido, estoque e frequência),
+o banco em memória (lib/fake_postgrest) é populado com dados sintéticos e cada rota
+recebe requisições concorrentes pela aplicação ASGI (httpx.ASGITransport):
+  - GET  /reports/unit/{unit_id}
+  - GET  /orders/unit/{unit_id}?limit=100
+  - POST /storage/exit
+  - POST /storage/entry
+  - POST /auth/login
+Mede vazão (req/s), latência p50/p95/p99 e consultas ao banco por requisição, e grava
+os resultados em JSON para acompanhar regressões entre versões.
+
+Uso:
+    python -m benchmarks.bench_endpoints [--scales 10,1000,100000] [--requests 200]
+        [--concurrency 10] [--latency-ms 5] [--output bench_endpoints.json]
+"""
+import os
+
+os.environ["SUPABASE_BACKEND"] = "memory"
+# sob carga toda rota passaria de SLOW_REQUEST_MS; o log [SLOW] só atrapalharia a saída
+os.environ.setdefault("SLOW_REQUEST_MS", "1e9")
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Tuple
+import httpx
+from passlib.context import CryptContext
+from cmd.main import app
+from lib.cache import clear_caches
+from lib.supabase_client import fake_backend
+
+UNIT_ID = "00000000-0000-0000-0000-000000000001"
+OTHER_UNIT_ID = "00000000-0000-0000-0000-000000000002"
+USER_EMAIL = "benchmark@unas.org.br"
+USER_PASSWORD = "benchmark123"
+FOODS = ["Arroz", "Feijão", "Macarrão", "Óleo", "Leite", "Açúcar", "Café", "Farinha"]
+
+# (nome, método, caminho, corpo, fração de --requests)
+Scenario = Tuple[str, str, str, Callable[[int], Any], float]
+
+
+def seed(rows_per_unit: int, password_hash: str) -> List[str]:
+    """Popula o banco em memória. Retorna os nomes dos itens de estoque da unidade."""
+    fake_backend.reset()
+    clear_caches()
+    random.seed(42)
+    now = datetime.now(timezone.utc)
+
+    fake_backend.seed("units", [
+        {"id": UNIT_ID, "name": "Unidade Benchmark", "address": "Rua A", "type": "cozinha", "capacity": 200},
+        {"id": OTHER_UNIT_ID, "name": "Outra Unidade", "address": "Rua B", "type": "cozinha", "capacity": 80},
+    ])
+    user = fake_backend.seed("users", [{
+        "email": USER_EMAIL, "password": password_hash, "username": "benchmark",
+        "role": "admin", "email_verified": True,
+    }])[0]
+    fake_backend.seed("unit_users", [{"unit_id": UNIT_ID, "user_id": user["id"], "role": "gestor"}])
+    fake_backend.seed("budgets", [{
+        "description": "Verba do mês", "amount": 50000.0,
+        "initial_date": now.replace(day=1).date().isoformat(),
+        "final_date": (now.replace(day=1) + timedelta(days=32)).replace(day=1).date().isoformat(),
+    }])
+
+    for unit_id in (UNIT_ID, OTHER_UNIT_ID):
+        orders = fake_backend.seed("orders", [
+            {
+                "unit_id": unit_id,
+                "description": f"Pedido {i}",
+                "amount": round(random.uniform(50, 2000), 2),
+                "status": "approved",
+                "created_at": (now - timedelta(minutes=random.randrange(0, 60 * 24 * 730))).isoformat(),
+            }
+            for i in range(rows_per_unit)
+        ])
+        fake_backend.seed("order_items", [
+            {"order_id": order["id"], "description": "Item", "amount": 1.0, "measure_unit": "pacote", "received": True}
+            for order in orders
+        ])
+        fake_backend.seed("storage", [
+            {
+                "unit_id": unit_id,
+                "name": f"{FOODS[i % len(FOODS)]} {i}",
+                "amount": 10.0,
+                "type": "doado" if i % 3 == 0 else "comprado",
+                "initial_quantity": 10_000_000,
+                "used_quantity": random.randrange(0, 1000),
+                "updated_at": None,
+            }
+            for i in range(rows_per_unit)
+        ])
+        fake_backend.seed("frequency", [
+            {"unit_id": unit_id, "amount": random.randrange(50, 200), "date": (now - timedelta(days=i % 730)).date().isoformat()}
+            for i in range(rows_per_unit)
+        ])
+
+    return [f"{FOODS[i % len(FOODS)]} {i}" for i in range(rows_per_unit)]
+
+
+def scenarios(storage_names: List[str]) -> List[Scenario]:
+    today = datetime.now().date().isoformat()
+    return [
+        ("GET /reports/unit/{unit_id}", "GET", f"/reports/unit/{UNIT_ID}", lambda i: None, 1.0),
+        ("GET /orders/unit/{unit_id}", "GET", f"/orders/unit/{UNIT_ID}?limit=100", lambda i: None, 1.0),
+        ("POST /storage/exit", "POST", "/storage/exit", lambda i: {
+            "unit_id": UNIT_ID, "purpose": "Almoço", "responsible": "Benchmark", "date": today,
+            "items": [{"name": storage_names[i % len(storage_names)], "used_quantity": 1}],
+        }, 1.0),
+        ("POST /storage/entry", "POST", "/storage/entry", lambda i: {
+            "unit_id": UNIT_ID, "name": storage_names[i % len(storage_names)], "amount": 10.0,
+            "type": "comprado", "responsible": "Benchmark", "date": today, "initial_quantity": 5,
+        }, 1.0),
+        # bcrypt domina o login: menos requisições
+        ("POST /auth/login", "POST", "/auth/login", lambda i: {
+            "email": USER_EMAIL, "password": USER_PASSWORD,
+        }, 0.1),
+    ]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Percentil pelo método nearest-rank."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, requests: int, concurrency: int) -> Dict[str, Any]:
+    name, method, path, body, weight = scenario
+    total = max(int(requests * weight), concurrency)
+    latencies: List[float] = []
+    errors: Dict[int, int] = {}
+    counter = iter(range(total))
+
+    async def worker():
+        for i in counter:
+            started = time.perf_counter()
+            response = await client.request(method, path, json=body(i))
+            latencies.append((time.perf_counter() - started) * 1000.0)
+            if response.status_code >= 400:
+                errors[response.status_code] = errors.get(response.status_code, 0) + 1
+
+    # aquecimento: caches, templates de rota e pools
+    for i in range(min(3, total)):
+        await client.request(method, path, json=body(i))
+
+    queries_before = fake_backend.requests
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "endpoint": name,
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": errors,
+        "throughput_rps": round(total / elapsed, 2),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "db_queries_per_request": round((fake_backend.requests - queries_before) / total, 2),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="10,1000,100000", help="linhas por unidade, separadas por vírgula")
+    parser.add_argument("--requests", type=int, default=200, help="requisições por rota")
+    parser.add_argument("--concurrency", type=int, default=10, help="requisições simultâneas")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="latência simulada por consulta ao banco")
+    parser.add_argument("--jitter-ms", type=float, default=2.0, help="variação aleatória da latência")
+    parser.add_argument("--output", default="bench_endpoints.json", help="arquivo JSON de resultados")
+    args = parser.parse_args()
+
+    password_hash = CryptContext(schemes=["bcrypt"], deprecated="auto").hash(USER_PASSWORD)
+    results: List[Dict[str, Any]] = []
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+        for scale in (int(value) for value in args.scales.split(",")):
+            started = time.perf_counter()
+            fake_backend.latency_ms = fake_backend.jitter_ms = 0.0
+            storage_names = seed(scale, password_hash)
+            fake_backend.latency_ms, fake_backend.jitter_ms = args.latency_ms, args.jitter_ms
+            print(f"escala {scale} linhas/unidade (seed {time.perf_counter() - started:.1f} s)")
+
+            for scenario in scenarios(storage_names):
+                result = await run_scenario(client, scenario, args.requests, args.concurrency)
+                result["scale"] = scale
+                results.append(result)
+                print(
+                    f"  {result['endpoint']:<30} {result['throughput_rps']:>9.1f} req/s  "
+                    f"p50 {result['p50_ms']:>8.1f}  p95 {result['p95_ms']:>8.1f}  p99 {result['p99_ms']:>8.1f} ms  "
+                    f"{result['db_queries_per_request']:>5.1f} consultas/req"
+                    + (f"  erros {result['errors']}" if result["errors"] else "")
+                )
+
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "report_db_aggregation": os.getenv("REPORT_DB_AGGREGATION", "true"),
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as output:
+        json.dump(report, output, indent=2, ensure_ascii=False)
+    print(f"resultados em {args.output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,144 @@
+"""
+Tempo de import da aplicação (cold start da função serverless em api/index.py).
+
+Cada rodada importa api.index em um processo Python novo, com -X importtime, como a
+Vercel faz em uma instância fria. Mede:
+  - o tempo total do import (mediana das rodadas)
+  - o custo acumulado por pacote (fastapi, pydantic, ...) e por módulo da aplicação,
+    pelo relatório do -X importtime
+  - se algum dos pacotes que deveriam carregar só no primeiro uso (cliente do Supabase,
+    python-jose, passlib, jinja2) foi importado no cold start
+e grava os resultados em JSON para acompanhar regressões entre versões.
+
+Uso:
+    python -m benchmarks.bench_import_time [--runs 5] [--top 15]
+        [--output bench_import_time.json] [--budget-ms 0]
+Com --budget-ms > 0, termina com erro se a mediana passar do orçamento (para CI).
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Carregados sob demanda (lib/supabase_client, services/jwt_service, services/user_service, lib/templates)
+DEFERRED_MODULES = ("supabase", "postgrest", "jose", "passlib", "jinja2")
+
+APP_PACKAGES = ("api", "cmd", "router", "services", "repositories", "lib", "entities")
+
+CHILD_CODE = f"""
+import json, sys, time
+started = time.perf_counter()
+import api.index
+elapsed = time.perf_counter() - started
+print(json.dumps({{
+    "import_ms": elapsed * 1000.0,
+    "loaded": [name for name in {DEFERRED_MODULES!r} if name in sys.modules],
+}}))
+"""
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def run_once() -> Dict[str, Any]:
+    """Importa api.index em um processo novo. Retorna o tempo total e o relatório do -X importtime."""
+    env = dict(os.environ)
+    env["VERCEL"] = "1"
+    env.setdefault("SUPABASE_URL", "http://localhost")
+    env.setdefault("SUPABASE_SERVICE_ROLE_KEY", "benchmark")
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD_CODE],
+        cwd=ROOT_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    packages: Dict[str, float] = {}
+    modules: Dict[str, Dict[str, float]] = {}
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, _, name = match.groups()
+        root = name.split(".", 1)[0]
+        if root in APP_PACKAGES:
+            modules[name] = {"self_ms": int(self_us) / 1000.0, "cumulative_ms": int(cumulative_us) / 1000.0}
+        elif "." not in name:
+            # pacote importado pela primeira vez: o acumulado inclui as dependências que ele trouxe
+            packages[name] = int(cumulative_us) / 1000.0
+    result["packages"] = packages
+    result["modules"] = modules
+    return result
+
+
+def median_by_key(runs: List[Dict[str, float]]) -> Dict[str, float]:
+    keys = {key for run in runs for key in run}
+    return {key: statistics.median(run.get(key, 0.0) for run in runs) for key in keys}
+
+
+def top(values: Dict[str, float], count: int) -> List[Dict[str, Any]]:
+    ranked = sorted(values.items(), key=lambda item: item[1], reverse=True)[:count]
+    return [{"name": name, "cumulative_ms": round(value, 2)} for name, value in ranked]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="processos novos (rodadas)")
+    parser.add_argument("--top", type=int, default=15, help="pacotes/módulos listados")
+    parser.add_argument("--output", default="bench_import_time.json", help="arquivo JSON de resultados")
+    parser.add_argument("--budget-ms", type=float, default=0.0, help="falha se a mediana passar deste tempo")
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    import_ms = sorted(run["import_ms"] for run in runs)
+    loaded = sorted({name for run in runs for name in run["loaded"]})
+    packages = median_by_key([run["packages"] for run in runs])
+    modules = median_by_key([
+        {name: values["cumulative_ms"] for name, values in run["modules"].items()} for run in runs
+    ])
+
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "runs": args.runs,
+        "import_ms": {
+            "median": round(statistics.median(import_ms), 2),
+            "min": round(import_ms[0], 2),
+            "max": round(import_ms[-1], 2),
+        },
+        "deferred_modules_loaded": loaded,
+        "top_packages": top(packages, args.top),
+        "top_app_modules": top(modules, args.top),
+    }
+
+    print(
+        f"import api.index: mediana {report['import_ms']['median']:.0f} ms "
+        f"(mín {report['import_ms']['min']:.0f}, máx {report['import_ms']['max']:.0f}) em {args.runs} rodada(s)"
+    )
+    print("pacotes (acumulado, -X importtime):")
+    for entry in report["top_packages"]:
+        print(f"  {entry['name']:<40} {entry['cumulative_ms']:>8.1f} ms")
+    print("módulos da aplicação (acumulado):")
+    for entry in report["top_app_modules"]:
+        print(f"  {entry['name']:<40} {entry['cumulative_ms']:>8.1f} ms")
+    if loaded:
+        print(f"ATENÇÃO: carregados no cold start (deveriam ser sob demanda): {', '.join(loaded)}")
+
+    with open(args.output, "w", encoding="utf-8") as output:
+        json.dump(report, output, indent=2, ensure_ascii=False)
+    print(f"resultados em {args.output}")
+
+    if args.budget_ms > 0 and report["import_ms"]["median"] > args.budget_ms:
+        print(f"orçamento de {args.budget_ms:g} ms excedido")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Micro-benchmark da verificação de JWT.
+
+Compara:
+  - antes: jwt.decode com a chave em string e options recriadas a cada chamada
+  - decode: JWTService com a chave HMAC pré-construída, sem o cache de tokens
+  - cache: JWTService.validate_token com o token já verificado em cache
+
+Uso:
+    python -m benchmarks.bench_jwt [iterações]
+"""
+import asyncio
+import sys
+import time
+from jose import jwt
+from services.jwt_service import JWTService
+
+
+def decode_before(token: str) -> dict:
+    return jwt.decode(
+        token,
+        JWTService.SECRET_KEY,
+        algorithms=[JWTService.ALGORITHM],
+        options={"verify_aud": False},
+    )
+
+
+async def validate_uncached(token: str) -> dict:
+    JWTService.verified_tokens.clear()
+    return await JWTService.validate_token(token)
+
+
+async def validate_cached(token: str) -> dict:
+    return await JWTService.validate_token(token)
+
+
+async def bench(label: str, func, token: str, iterations: int) -> float:
+    is_async = asyncio.iscoroutinefunction(func)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        if is_async:
+            await func(token)
+        else:
+            func(token)
+    elapsed = time.perf_counter() - start
+    rate = iterations / elapsed
+    print(f"{label:<8} {rate:>12.0f} tokens/s  {elapsed / iterations * 1e6:>8.1f} µs/token")
+    return rate
+
+
+async def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    token = await JWTService.generate_jwt_token("00000000-0000-0000-0000-000000000000")
+
+    before = await bench("antes", decode_before, token, iterations)
+    await bench("decode", validate_uncached, token, iterations)
+    after = await bench("cache", validate_cached, token, iterations)
+    print(f"{'':<8} {after / before:>12.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,216 @@
+"""
+Benchmark da agregação dos relatórios em Python (REPORT_DB_AGGREGATION=false).
+
+Compara, sobre uma unidade sintética com N pedidos e N itens de estoque:
+  - antes: laços por linha (getattr, to_naive_datetime e float a cada etapa,
+    ordenação completa para os 10 pedidos mais recentes)
+  - colunar: lib/report_engine.py (colunas lidas uma vez, heapq.nlargest)
+e confere que os dois produzem o mesmo resultado.
+
+Uso:
+    python -m benchmarks.bench_report_engine [linhas] [unidades]
+"""
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from entities.dtos.report_dto import OrderSummary
+from entities.models.orders import Order
+from entities.models.storage import Storage
+from lib.report_engine import (
+    to_naive_datetime, summarize_storage, summarize_orders, OrderColumns, StorageColumns,
+)
+
+FOODS = ["Arroz", "Feijão", "Macarrão", "Óleo", "Leite", "Açúcar", "Café", "Farinha"]
+
+
+def summarize_storage_before(storage_items: List[Any]) -> List[Dict[str, Any]]:
+    """
+    Agrupa o estoque por (name, measure_unit), somando comprado/doado (initial) e atual.
+    Mesmo formato da view report_storage_summary.
+    """
+    storage_map: Dict[str, Dict[str, Any]] = {}
+    for s in (storage_items or []):
+        name = getattr(s, "name", "Desconhecido")
+        origin = getattr(s, "type", "") or ""
+        initial_q = float(getattr(s, "initial_quantity", 0) or 0)
+        used_q = float(getattr(s, "used_quantity", 0) or 0)
+        current_q = max(0.0, initial_q - used_q)
+        measure_unit = getattr(s, "measure_unit", None) or getattr(s, "measureUnit", None) or None
+
+        key_str = f"{name}||{measure_unit or ''}"
+        if key_str not in storage_map:
+            storage_map[key_str] = {
+                "name": name,
+                "measure_unit": measure_unit,
+                "bought": 0.0,
+                "donated": 0.0,
+                "current": 0.0
+            }
+
+        if isinstance(origin, str) and origin.lower().startswith("doa"):
+            storage_map[key_str]["donated"] += initial_q
+        else:
+            storage_map[key_str]["bought"] += initial_q
+
+        storage_map[key_str]["current"] += current_q
+    return list(storage_map.values())
+
+
+def summarize_orders_before(
+    orders: List[Any],
+    start_dt: Optional[datetime],
+    end_dt: Optional[datetime],
+) -> Dict[str, Any]:
+    """
+    Totais dos pedidos no intervalo [start_dt, end_dt) (sem intervalo completo, todos):
+    gasto total, gasto por mês (YYYY-MM) e os 10 pedidos mais recentes.
+    Mesmo formato da RPC report_order_aggregates.
+    """
+    # filtrar orders por intervalo efetivo
+    filtered_orders = []
+    for o in (orders or []):
+        created = getattr(o, "created_at", None)
+        created = to_naive_datetime(created)
+        if start_dt and end_dt:
+            if created and (created >= start_dt and created < end_dt):
+                filtered_orders.append(o)
+        else:
+            filtered_orders.append(o)
+
+    # total_spending (soma dos orders filtrados)
+    total_spending = 0.0
+    for o in filtered_orders:
+        amt = getattr(o, "amount", 0) or 0
+        try:
+            total_spending += float(amt)
+        except Exception:
+            pass
+
+    # recent orders
+    recent_orders: List[OrderSummary] = []
+    def order_key(o):
+        created = getattr(o, "created_at", None)
+        created = to_naive_datetime(created)
+        return created or datetime.min
+
+    sorted_orders = sorted(filtered_orders, key=order_key, reverse=True)[:10]
+    for o in sorted_orders:
+        created = getattr(o, "created_at", None)
+        created = to_naive_datetime(created)
+        items = getattr(o, "items", None)
+        items_count = len(items) if isinstance(items, (list, tuple)) else getattr(o, "items_count", None)
+        recent_orders.append(OrderSummary(
+            id=str(getattr(o, "id", "")),
+            date=created,
+            amount=float(getattr(o, "amount", 0) or 0),
+            items_count=items_count
+        ))
+
+    # gasto por mês
+    monthly_spent: Dict[str, float] = {}
+    for o in filtered_orders:
+        created = getattr(o, "created_at", None)
+        created_dt = to_naive_datetime(created)
+        if created_dt:
+            key = f"{created_dt.year:04d}-{created_dt.month:02d}"
+            monthly_spent[key] = monthly_spent.get(key, 0.0) + float(getattr(o, "amount", 0) or 0)
+
+    return {
+        "total_spending": total_spending,
+        "monthly_spent": monthly_spent,
+        "recent_orders": recent_orders,
+    }
+
+
+def make_rows(count: int, units: int):
+    random.seed(42)
+    unit_ids = [f"unit-{u}" for u in range(units)]
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    orders = [
+        Order(
+            id=f"order-{i}",
+            amount=round(random.uniform(10, 500), 2),
+            unit_id=random.choice(unit_ids),
+            created_at=start + timedelta(minutes=random.randrange(0, 60 * 24 * 600)),
+        )
+        for i in range(count)
+    ]
+    storage = [
+        Storage(
+            id=f"storage-{i}",
+            amount=0,
+            unit_id=random.choice(unit_ids),
+            type=random.choice(["comprado", "doação"]),
+            name=random.choice(FOODS),
+            created_at=start,
+            initial_quantity=random.randrange(1, 100),
+            used_quantity=random.randrange(0, 100),
+        )
+        for i in range(count)
+    ]
+    return orders, storage
+
+
+def bench(label: str, func, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<32} {best * 1000:>10.1f} ms")
+    return best
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    units = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    orders, storage = make_rows(count, 1)
+    start_dt, end_dt = datetime(2025, 3, 1), datetime(2026, 3, 1)
+
+    assert summarize_orders(orders, start_dt, end_dt) == summarize_orders_before(orders, start_dt, end_dt)
+    assert summarize_storage(storage) == summarize_storage_before(storage)
+
+    print(f"unidade com {count} pedidos e {count} itens de estoque")
+    before = bench("pedidos (antes)", lambda: summarize_orders_before(orders, start_dt, end_dt))
+    after = bench("pedidos (colunar)", lambda: summarize_orders(orders, start_dt, end_dt))
+    print(f"{'':<32} {before / after:>10.1f}x")
+    before = bench("estoque (antes)", lambda: summarize_storage_before(storage))
+    after = bench("estoque (colunar)", lambda: summarize_storage(storage))
+    print(f"{'':<32} {before / after:>10.1f}x")
+
+    orders, storage = make_rows(count, units)
+
+    def consolidated_before():
+        orders_by_unit: Dict[str, List[Any]] = {}
+        for order in orders:
+            orders_by_unit.setdefault(order.unit_id, []).append(order)
+        storage_by_unit: Dict[str, List[Any]] = {}
+        for item in storage:
+            storage_by_unit.setdefault(item.unit_id, []).append(item)
+        return (
+            {u: summarize_orders_before(o, start_dt, end_dt) for u, o in orders_by_unit.items()},
+            {u: summarize_storage_before(s) for u, s in storage_by_unit.items()},
+        )
+
+    def consolidated_after():
+        return (
+            OrderColumns(orders).totals_by_unit(start_dt, end_dt),
+            StorageColumns(storage).groups_by_unit(),
+        )
+
+    expected_orders, expected_storage = consolidated_before()
+    actual_orders, actual_storage = consolidated_after()
+    assert actual_storage == expected_storage
+    assert actual_orders.keys() == expected_orders.keys()
+    assert all(actual_orders[u] == expected_orders[u] for u in expected_orders if expected_orders[u]["recent_orders"])
+
+    print(f"consolidado: {units} unidades")
+    before = bench("consolidado (antes)", consolidated_before)
+    after = bench("consolidado (colunar)", consolidated_after)
+    print(f"{'':<32} {before / after:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
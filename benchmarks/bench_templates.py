@@ -0,0 +1,52 @@
+"""
+Benchmark de renderização dos templates de e-mail.
+
+Compara o modo antigo (novo Environment + compilação a cada e-mail) com o
+registro de templates compilados em lib/templates.py.
+
+Uso:
+    python -m benchmarks.bench_templates [iterações]
+"""
+import sys
+import time
+from jinja2 import Environment, FileSystemLoader
+from lib import templates
+
+CONTEXT = {
+    "code": "123456",
+    "username": "usuario",
+    "verification_link": "https://example.org/auth/verify-email?code=123456",
+}
+
+
+def render_uncached(name: str) -> str:
+    env = Environment(loader=FileSystemLoader(templates.TEMPLATES_DIR))
+    return env.get_template(name).render(CONTEXT)
+
+
+def render_cached(name: str) -> str:
+    return templates.render_template(name, CONTEXT)
+
+
+def bench(label: str, func, name: str, iterations: int) -> float:
+    func(name)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(name)
+    elapsed = time.perf_counter() - start
+    rate = iterations / elapsed
+    print(f"{label:<10} {name:<30} {rate:>10.0f} renders/s  {elapsed / iterations * 1e6:>8.1f} µs/render")
+    return rate
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    templates.load_templates()
+    for name in templates.get_environment().list_templates(extensions=["html"]):
+        before = bench("sem cache", render_uncached, name, max(iterations // 10, 1))
+        after = bench("registro", render_cached, name, iterations)
+        print(f"{'':<10} {'':<30} {after / before:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,24 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from router import auth, storage, units, orders, budgets , unit_user, user, frequency, report
+from lib.pagination import NEXT_CURSOR_HEADER
+from lib.cache import cache_stats
+from lib.password_pool import password_pool_stats
+from lib.email_outbox import email_outbox
+from lib.templates import load_templates
+from lib.metrics import MetricsMiddleware, render_metrics
+from lib.supabase_client import get_supabase
+from lib.auth import require_infra_access
 import os
 from dotenv import load_dotenv
 load_dotenv()
 
+# Na Vercel (VERCEL=1, via api/index.py) cada instância atende poucas requisições:
+# templates e cliente do Supabase são criados no primeiro uso, fora do cold start.
+# Em servidor contínuo (uvicorn), ficam prontos já na inicialização.
+SERVERLESS = bool(os.getenv("VERCEL"))
+
 
 app = FastAPI(
     title="UNAS Finance API",
@@ -17,7 +31,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "Content-Disposition"],
 )
+app.add_middleware(MetricsMiddleware)
 
 
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
@@ -35,14 +51,47 @@ async def healthcheck():
     return {"status": "ok"}
 
 
+@app.get("/cache/stats", tags=["infra"], dependencies=[Depends(require_infra_access)])
+async def get_cache_stats():
+    return cache_stats()
+
+
+@app.get("/password-pool/stats", tags=["infra"], dependencies=[Depends(require_infra_access)])
+async def get_password_pool_stats():
+    return password_pool_stats()
+
+
+@app.get("/email/stats", tags=["infra"], dependencies=[Depends(require_infra_access)])
+async def get_email_stats():
+    return email_outbox.stats()
+
+
+@app.get(
+    "/metrics",
+    tags=["infra"],
+    response_class=PlainTextResponse,
+    dependencies=[Depends(require_infra_access)],
+)
+async def get_metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 
 @app.on_event("startup")
 async def startup_event():
+    if not SERVERLESS:
+        print(f"[INIT] {load_templates()} template(s) de e-mail compilado(s)")
+        get_supabase()
     if os.getenv("ENVIRONMENT")  == "prod":
         from services.auth_service import AuthService
         print("🔥 Iniciando API UNAS… verificando usuário admin...")
         await AuthService.initialize_admin_user()
 
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await email_outbox.stop()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("cmd.main:app", host="0.0.0.0", port=8000, reload=True)
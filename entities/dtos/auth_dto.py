@@ -1,4 +1,3 @@
-from click import confirm
 from pydantic import BaseModel, EmailStr, Field
 
 class LoginDTO(BaseModel):
@@ -49,3 +49,19 @@ class ReportByUnit(BaseModel):
     monthly_comparison: List[MonthlyComparison] = []
     recent_orders: List[OrderSummary] = []
     frequencies: List[FrequencySummary] = []
+
+class NetworkTotals(BaseModel):
+    units_count: int = Field(0, description="Quantidade de unidades no relatório")
+    total_capacity: int = Field(0, description="Soma das capacidades das unidades")
+    frequency_pct: Optional[float] = Field(None, description="Frequência média da rede em porcentagem (ponderada pela capacidade)")
+    budget_total: float = Field(0.0, description="Soma dos orçamentos do período")
+    total_spending: float = Field(0.0, description="Gasto total da rede no período")
+    packs_budget: int = Field(0, description="Pacotes provenientes da verba/compras na rede")
+    packs_donations: int = Field(0, description="Pacotes provenientes de doações na rede")
+    total_packs: int = Field(0, description="Total de pacotes na rede")
+
+class ConsolidatedReport(BaseModel):
+    month: Optional[str] = Field(None, description="Período do relatório no formato YYYY-MM (opcional)")
+    generated_at: datetime
+    totals: NetworkTotals
+    units: List[ReportByUnit] = []
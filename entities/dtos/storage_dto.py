@@ -35,6 +35,22 @@ class StorageEntryDTO(BaseModel):
         return self
 
 
+class StorageBulkEntryItemDTO(BaseModel):
+    name: str = Field(..., description="Nome do item")
+    amount: float = Field(..., gt=0, description="Preço do item")
+    initial_quantity: int = Field(..., ge=0, description="Quantidade recebida do item")
+
+
+class StorageBulkEntryDTO(BaseModel):
+    items: List[StorageBulkEntryItemDTO] = Field(..., min_length=1, description="Lista de itens recebidos")
+    unit_id: str = Field(..., description="Identificador da unidade")
+    type: str = Field(..., description="Tipo de entrada (comprado ou doado)")
+    supplier: Optional[str] = Field(None, description="Nome do fornecedor ou doador")
+    invoice: Optional[str] = Field(None, description="Número da nota fiscal")
+    responsible: str = Field(..., description="Nome do responsável")
+    date: date_type = Field(..., description="Data da entrada")
+
+
 class StorageExitItemDTO(BaseModel):
     name: str = Field(..., description="Nome do item")
     used_quantity: int = Field(..., ge=1, description="Quantidade a consumir do estoque (inteiro > 0)")
@@ -0,0 +1,108 @@
+import asyncio
+import hashlib
+import os
+import time
+from typing import Optional
+from fastapi import Depends, Header, HTTPException
+from lib.cache import TTLCache
+from entities.dtos.user_dto import UserResponseDTO
+from repositories.user_repository import UserRepository
+from repositories.unit_user_repository import UnitUserRepository
+from services.jwt_service import JWTService
+
+# token (hash SHA-256) -> usuário autenticado (UserResponseDTO com `units` = ids das unidades).
+# Cada entrada expira no menor entre o TTL do cache e o `exp` do token.
+principal_cache = TTLCache("principals")
+
+# papéis com acesso às rotas administrativas (estatísticas e métricas de infraestrutura)
+ADMIN_ROLES = {"gestor", "admin"}
+
+# `true` deixa as rotas de infraestrutura abertas (ex.: desenvolvimento local, scraper em rede privada)
+INFRA_STATS_PUBLIC = os.getenv("INFRA_STATS_PUBLIC", "false").lower() == "true"
+
+
+def hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def invalidate_principals(user_id: Optional[str] = None) -> None:
+    """
+    Descarta os usuários autenticados em cache (de um usuário, ou todos).
+    Chamado quando senha, dados, papel ou unidades do usuário mudam, ou quando ele é removido.
+    """
+    if user_id is None:
+        principal_cache.clear()
+    else:
+        principal_cache.invalidate_where(lambda principal: principal.id == user_id)
+
+
+async def resolve_principal(token: str) -> UserResponseDTO:
+    """
+    Valida o token e resolve o usuário autenticado com suas unidades.
+    Levanta HTTPException(401) se o token for inválido ou o usuário não existir.
+    """
+    key = hash_token(token)
+    cached = principal_cache.get(key)
+    if cached is not None:
+        return cached.model_copy()
+
+    # antes das leituras: se o usuário for invalidado durante a consulta, não grava
+    cache_token = principal_cache.token()
+    payload = await JWTService.validate_token(token)
+    user_id = payload.get("sub")
+    if not isinstance(user_id, str):
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+    user_record, unit_users = await asyncio.gather(
+        UserRepository.get_user("id", user_id),
+        UnitUserRepository.list_unit_users_by_user(user_id),
+    )
+    if not user_record:
+        raise HTTPException(status_code=401, detail="User not found")
+
+    principal = UserResponseDTO(
+        id=str(getattr(user_record, "id", "")),
+        email=getattr(user_record, "email", ""),
+        username=getattr(user_record, "username", getattr(user_record, "name", "")),
+        role=getattr(user_record, "role", ""),
+        units=[unit_user.unit_id for unit_user in unit_users],
+    )
+
+    ttl = min(principal_cache.ttl, float(payload.get("exp", 0)) - time.time())
+    if ttl > 0:
+        principal_cache.set(key, principal.model_copy(), ttl=ttl, since=cache_token)
+    return principal
+
+
+async def get_current_user(authorization: str = Header(None)) -> UserResponseDTO:
+    """
+    Dependência para resolver o usuário atual a partir do header Authorization: "Bearer <token>".
+    Retorna um UserResponseDTO (com `units` = ids das unidades) ou levanta HTTPException(401).
+    Uso: `current_user: UserResponseDTO = Depends(get_current_user)`.
+    """
+    if not authorization:
+        raise HTTPException(status_code=401, detail="Authorization header missing")
+    parts = authorization.split()
+    if len(parts) != 2 or parts[0].lower() != "bearer":
+        raise HTTPException(status_code=401, detail="Invalid authorization header format")
+    return await resolve_principal(parts[1])
+
+
+async def require_admin(current_user: UserResponseDTO = Depends(get_current_user)) -> UserResponseDTO:
+    """
+    Dependência que exige um usuário autenticado com papel administrativo (ADMIN_ROLES).
+    Levanta HTTPException(401) sem token válido e HTTPException(403) para os demais papéis.
+    """
+    if current_user.role not in ADMIN_ROLES:
+        raise HTTPException(status_code=403, detail="Acesso restrito a administradores")
+    return current_user
+
+
+async def require_infra_access(authorization: str = Header(None)) -> None:
+    """
+    Dependência das rotas de infraestrutura (/cache/stats, /metrics, ...).
+    Exige administrador, a não ser que INFRA_STATS_PUBLIC=true.
+    """
+    if INFRA_STATS_PUBLIC:
+        return
+    await require_admin(await get_current_user(authorization))
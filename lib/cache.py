@@ -0,0 +1,101 @@
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+# Valores padrão dos caches em memória (por processo)
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "60"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+
+_registry: Dict[str, "TTLCache"] = {}
+
+
+class TTLCache:
+    """
+    Cache LRU limitado com expiração por TTL.
+    O cache é local ao processo: a invalidação explícita vale apenas para este worker,
+    e o TTL limita o tempo em que outros workers podem servir dados antigos.
+    """
+
+    def __init__(self, name: str, maxsize: int = CACHE_MAX_ENTRIES, ttl: float = CACHE_TTL_SECONDS):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # incrementado a cada invalidação (ver token/set)
+        self._invalidations = 0
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        _registry[name] = self
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Retorna o valor em cache, ou None se ausente/expirado."""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def token(self) -> int:
+        """
+        Marca o início de uma leitura no banco. Passado a set(since=...), descarta o valor
+        se houve invalidação desde então: a leitura pode ter visto a linha antes da escrita.
+        """
+        return self._invalidations
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, since: Optional[int] = None) -> None:
+        """Armazena um valor; remove o menos usado recentemente se passar do limite."""
+        if since is not None and since != self._invalidations:
+            return
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Remove uma chave do cache."""
+        self._invalidations += 1
+        self._data.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Any], bool]) -> int:
+        """Remove as entradas cujo valor satisfaz `predicate`; retorna quantas foram removidas."""
+        self._invalidations += 1
+        keys = [key for key, (_, value) in self._data.items() if predicate(value)]
+        for key in keys:
+            del self._data[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        """Remove todas as chaves do cache."""
+        self._invalidations += 1
+        self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores de uso do cache."""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits / total) if total else 0.0,
+        }
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Contadores de todos os caches registrados, por nome."""
+    return {name: cache.stats() for name, cache in _registry.items()}
+
+
+def clear_caches() -> None:
+    """Esvazia todos os caches registrados (ex.: ao trocar os dados em testes e benchmarks)."""
+    for cache in _registry.values():
+        cache.clear()
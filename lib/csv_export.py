@@ -0,0 +1,62 @@
+import csv
+import io
+import os
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional, Sequence
+from fastapi.responses import StreamingResponse
+from lib.pagination import build_next_cursor
+
+# Registros buscados por consulta nas exportações
+EXPORT_PAGE_SIZE = int(os.getenv("EXPORT_PAGE_SIZE", "500"))
+
+# BOM UTF-8: faz o Excel abrir o arquivo com a acentuação correta
+CSV_BOM = "\ufeff"
+
+
+async def iter_keyset(
+    fetch_page: Callable[[int, Optional[str]], Awaitable[List[Any]]],
+    page_size: int = EXPORT_PAGE_SIZE,
+    column: str = "created_at",
+) -> AsyncIterator[List[Any]]:
+    """
+    Percorre uma listagem paginada por keyset (apply_keyset), uma página por vez.
+    `fetch_page(limit, cursor)` busca a página; a iteração termina na primeira página incompleta.
+    """
+    cursor = None
+    while True:
+        page = await fetch_page(page_size, cursor)
+        if page:
+            yield page
+        cursor = build_next_cursor(page, page_size, column)
+        if not cursor:
+            return
+
+
+def encode_rows(rows: Sequence[Sequence[Any]]) -> bytes:
+    """Serializa um bloco de linhas em CSV (UTF-8)."""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+async def csv_response(
+    filename: str,
+    pages: AsyncIterator[List[Sequence[Any]]],
+    header: Optional[Sequence[str]] = None,
+) -> StreamingResponse:
+    """
+    Resposta CSV em streaming: cada bloco de linhas de `pages` é enviado assim que fica pronto.
+    O primeiro bloco é buscado antes de abrir a resposta, para que erros de consulta
+    ainda cheguem ao cliente como HTTPException com o status correto.
+    """
+    first = await anext(pages, [])
+
+    async def body():
+        yield CSV_BOM.encode("utf-8") + encode_rows(([header] if header else []) + first)
+        async for rows in pages:
+            yield encode_rows(rows)
+
+    return StreamingResponse(
+        body(),
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,268 @@
+import asyncio
+import os
+import smtplib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Any, Dict, List, Optional
+
+# Outbox desligado: cada e-mail é enviado na hora, ainda fora do event loop.
+# Desligado por padrão na Vercel (VERCEL definido): sem processo de longa duração,
+# o worker e o esvaziamento da fila no shutdown morreriam junto com a requisição.
+EMAIL_OUTBOX_ENABLED = os.getenv(
+    "EMAIL_OUTBOX_ENABLED", "false" if os.getenv("VERCEL") else "true"
+).lower() == "true"
+
+EMAIL_QUEUE_MAX_SIZE = int(os.getenv("EMAIL_QUEUE_MAX_SIZE", "1000"))
+EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", "20"))
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "5"))
+EMAIL_RETRY_BASE_SECONDS = float(os.getenv("EMAIL_RETRY_BASE_SECONDS", "1"))
+EMAIL_RETRY_MAX_SECONDS = float(os.getenv("EMAIL_RETRY_MAX_SECONDS", "60"))
+# Conexão SMTP ociosa por mais que isso é fechada
+EMAIL_IDLE_SECONDS = float(os.getenv("EMAIL_IDLE_SECONDS", "30"))
+
+
+@dataclass
+class OutgoingEmail:
+    to: str
+    subject: str
+    html_content: str
+    attempts: int = 0
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class SMTPSender:
+    """
+    Conexão SMTP autenticada e reaproveitada entre envios.
+    Todos os métodos são bloqueantes e devem rodar na thread do outbox.
+    """
+
+    def __init__(self):
+        self.host = os.getenv("SMTP_HOST")
+        self.port = int(os.getenv("SMTP_PORT", "465"))
+        self.user = os.getenv("SMTP_USER")
+        self.password = os.getenv("SMTP_PASS")
+        self.sender = os.getenv("SMTP_FROM") or self.user
+        # SMTP_SSL=false permite usar um servidor local sem TLS (ex.: aiosmtpd em testes)
+        self.use_ssl = os.getenv("SMTP_SSL", "true").lower() == "true"
+        self.server: Optional[smtplib.SMTP] = None
+        self.connections_opened = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        if self.use_ssl:
+            server = smtplib.SMTP_SSL(self.host, self.port, timeout=30)
+        else:
+            server = smtplib.SMTP(self.host, self.port, timeout=30)
+        if self.password:
+            server.login(self.user, self.password)
+        self.connections_opened += 1
+        return server
+
+    def _ensure_connected(self) -> smtplib.SMTP:
+        if self.server is not None:
+            try:
+                if self.server.noop()[0] == 250:
+                    return self.server
+            except smtplib.SMTPException:
+                pass
+            self.close()
+        self.server = self._connect()
+        return self.server
+
+    def build_message(self, email: OutgoingEmail) -> str:
+        msg = MIMEMultipart("alternative")
+        msg["Subject"] = email.subject
+        msg["From"] = self.sender
+        msg["To"] = email.to
+        msg.attach(MIMEText(email.html_content, "html"))
+        return msg.as_string()
+
+    def send(self, email: OutgoingEmail) -> None:
+        """Envia um e-mail; em queda de conexão, reconecta uma vez."""
+        message = self.build_message(email)
+        try:
+            self._ensure_connected().sendmail(self.sender, email.to, message)
+        except (smtplib.SMTPServerDisconnected, ConnectionError):
+            self.close()
+            self._ensure_connected().sendmail(self.sender, email.to, message)
+
+    def send_batch(self, emails: List[OutgoingEmail]) -> List[Optional[Exception]]:
+        """Envia um lote pela mesma conexão; retorna o erro de cada e-mail (ou None)."""
+        errors: List[Optional[Exception]] = []
+        for email in emails:
+            try:
+                self.send(email)
+                errors.append(None)
+            except Exception as e:
+                errors.append(e)
+        return errors
+
+    def close(self) -> None:
+        if self.server is None:
+            return
+        try:
+            self.server.quit()
+        except Exception:
+            pass
+        self.server = None
+
+
+class EmailOutbox:
+    """
+    Fila de e-mails de saída. As rotas apenas enfileiram; um worker em background
+    envia em lotes por uma conexão SMTP reaproveitada, com retentativas e backoff.
+    """
+
+    def __init__(self):
+        self.sender = SMTPSender()
+        # thread única: a conexão SMTP não é thread-safe
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="smtp")
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        # e-mails aguardando o backoff para nova tentativa
+        self._retry_tasks: Dict[asyncio.Task, OutgoingEmail] = {}
+        self._stopping = False
+        self._metrics: Dict[str, Any] = {
+            "enqueued": 0,
+            "sent": 0,
+            "failed": 0,
+            "retried": 0,
+            "dropped": 0,
+            "batches": 0,
+            "total_latency_ms": 0.0,
+        }
+
+    def start(self) -> None:
+        """Inicia o worker no event loop atual (idempotente)."""
+        if self._worker is not None and not self._worker.done():
+            return
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=EMAIL_QUEUE_MAX_SIZE)
+        self._stopping = False
+        self._worker = asyncio.create_task(self._run(), name="email-outbox")
+
+    async def stop(self, timeout: float = 10) -> None:
+        """
+        Tenta esvaziar a fila, para o worker e fecha a conexão SMTP.
+        E-mails aguardando retentativa voltam para a fila sem esperar o backoff; até o
+        fim do timeout, novas falhas são retentadas na hora (até EMAIL_MAX_ATTEMPTS).
+        """
+        if self._worker is None:
+            return
+        self._stopping = True
+        for task, email in list(self._retry_tasks.items()):
+            self._retry_tasks.pop(task, None)
+            if task.done():
+                continue  # já voltou para a fila
+            task.cancel()
+            self._requeue(email)
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            print(f"[EMAIL] Encerrando com {self._queue.qsize()} e-mail(s) na fila")
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        await self._in_thread(self.sender.close)
+
+    async def enqueue(self, to: str, subject: str, html_content: str) -> None:
+        """Enfileira um e-mail para envio e retorna imediatamente."""
+        email = OutgoingEmail(to=to, subject=subject, html_content=html_content)
+        if not EMAIL_OUTBOX_ENABLED:
+            await self._in_thread(self.sender.send, email)
+            self._record_sent(email)
+            return
+
+        self.start()
+        try:
+            self._queue.put_nowait(email)
+            self._metrics["enqueued"] += 1
+        except asyncio.QueueFull:
+            self._metrics["dropped"] += 1
+            print(f"[EMAIL] Fila cheia, e-mail para {to} descartado")
+
+    async def _in_thread(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def _next_batch(self) -> List[OutgoingEmail]:
+        try:
+            first = await asyncio.wait_for(self._queue.get(), EMAIL_IDLE_SECONDS)
+        except asyncio.TimeoutError:
+            await self._in_thread(self.sender.close)
+            first = await self._queue.get()
+        batch = [first]
+        while len(batch) < EMAIL_BATCH_SIZE and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            try:
+                errors = await self._in_thread(self.sender.send_batch, batch)
+            except Exception as e:
+                errors = [e] * len(batch)
+            self._metrics["batches"] += 1
+
+            for email, error in zip(batch, errors):
+                if error is None:
+                    self._record_sent(email)
+                else:
+                    self._schedule_retry(email, error)
+                self._queue.task_done()
+
+    def _record_sent(self, email: OutgoingEmail) -> None:
+        self._metrics["sent"] += 1
+        self._metrics["total_latency_ms"] += (time.monotonic() - email.enqueued_at) * 1000
+
+    def _schedule_retry(self, email: OutgoingEmail, error: Exception) -> None:
+        email.attempts += 1
+        if email.attempts >= EMAIL_MAX_ATTEMPTS:
+            self._metrics["failed"] += 1
+            print(f"[EMAIL] Falha definitiva ao enviar para {email.to} após {email.attempts} tentativas: {error}")
+            return
+
+        delay = 0.0 if self._stopping else min(
+            EMAIL_RETRY_BASE_SECONDS * (2 ** (email.attempts - 1)), EMAIL_RETRY_MAX_SECONDS
+        )
+        self._metrics["retried"] += 1
+        print(f"[EMAIL] Erro ao enviar para {email.to} (tentativa {email.attempts}), nova tentativa em {delay:.1f}s: {error}")
+        if self._stopping:
+            self._requeue(email)
+            return
+
+        async def requeue_later():
+            await asyncio.sleep(delay)
+            self._requeue(email)
+
+        task = asyncio.create_task(requeue_later())
+        self._retry_tasks[task] = email
+        task.add_done_callback(lambda done: self._retry_tasks.pop(done, None))
+
+    def _requeue(self, email: OutgoingEmail) -> None:
+        try:
+            self._queue.put_nowait(email)
+        except asyncio.QueueFull:
+            self._metrics["dropped"] += 1
+            print(f"[EMAIL] Fila cheia, e-mail para {email.to} descartado")
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores de entrega do outbox."""
+        sent = self._metrics["sent"]
+        return {
+            "enabled": EMAIL_OUTBOX_ENABLED,
+            "queue_size": self._queue.qsize() if self._queue is not None else 0,
+            "pending_retries": len(self._retry_tasks),
+            "connections_opened": self.sender.connections_opened,
+            **{k: v for k, v in self._metrics.items() if k != "total_latency_ms"},
+            "avg_latency_ms": (self._metrics["total_latency_ms"] / sent) if sent else 0.0,
+        }
+
+
+email_outbox = EmailOutbox()
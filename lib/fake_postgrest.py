@@ -0,0 +1,555 @@
+"""
+Backend PostgREST em memória, para testes de carga e benchmarks sem Supabase.
+
+FakePostgREST é um transporte httpx: o cliente real do Supabase (e os builders do
+postgrest) continua montando as requisições, que são respondidas aqui a partir de
+tabelas em memória. Suporta o que os repositórios usam:
+  - GET com select (colunas), filtros eq/neq/gt/gte/lt/lte/in/is/like/ilike,
+    or=(...) com and(...) aninhado, order, limit e offset
+  - POST (insert e upsert com on_conflict, inclusive ignore-duplicates), PATCH e DELETE com filtros
+  - a view report_storage_summary e as RPCs das migrations em supabase/migrations
+Erros das RPCs seguem o PostgREST: SQLSTATE PTxxx vira status HTTP xxx.
+
+Latência simulada: cada requisição espera latency_ms (+ até jitter_ms) na thread do
+pool de execute(), como uma ida e volta de rede ao Supabase.
+
+Ativado em lib/supabase_client com SUPABASE_BACKEND=memory.
+"""
+import fnmatch
+import json
+import operator
+import random
+import threading
+import time
+import uuid
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import unquote
+import httpx
+
+# DEFAULTs das colunas de order_items (tabela criada no Supabase)
+ORDER_ITEM_DEFAULTS = {"measure_unit": "pacote", "received": True}
+
+
+class PostgrestError(Exception):
+    """Erro devolvido no formato do PostgREST ({code, message, details, hint})."""
+
+    def __init__(self, status: int, code: str, message: str):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+
+
+def utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """Timestamp/data ISO como datetime sem fuso (UTC), ou None se não for uma data."""
+    if isinstance(value, datetime):
+        dt = value
+    elif isinstance(value, date):
+        return datetime.combine(value, datetime.min.time())
+    elif isinstance(value, str):
+        return parse_iso(value)
+    else:
+        return None
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+@lru_cache(maxsize=1 << 19)
+def parse_iso(value: str) -> Optional[datetime]:
+    """Texto ISO como datetime sem fuso (UTC). Em cache: filtros e ordenações repetem os mesmos valores."""
+    if len(value) < 10 or value[4:5] != "-" or value[7:8] != "-":
+        return None
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def comparable(stored: Any, raw: str) -> Tuple[Any, Any]:
+    """Converte o valor do filtro (texto) para o tipo do valor armazenado."""
+    raw = unquote_value(raw)
+    if isinstance(stored, bool):
+        return stored, raw.lower() == "true"
+    if isinstance(stored, (int, float)):
+        try:
+            return stored, float(raw)
+        except ValueError:
+            return str(stored), raw
+    stored_dt = parse_timestamp(stored)
+    if stored_dt is not None:
+        raw_dt = parse_timestamp(raw)
+        if raw_dt is not None:
+            return stored_dt, raw_dt
+    return str(stored), raw
+
+
+def unquote_value(raw: str) -> str:
+    return raw[1:-1] if len(raw) >= 2 and raw[0] == raw[-1] == '"' else raw
+
+
+def sort_value(value: Any) -> Any:
+    return parse_timestamp(value) or value
+
+
+@lru_cache(maxsize=1024)
+def split_top_level(text: str) -> Tuple[str, ...]:
+    """
+    Divide "a.eq.1,and(b.eq.2,c.lt.3)" nas vírgulas fora de parênteses e aspas.
+    Em cache: o mesmo filtro é avaliado em todas as linhas da tabela.
+    """
+    parts, depth, quoted, current = [], 0, False, []
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and char == ",":
+            parts.append("".join(current))
+            current = []
+            continue
+        current.append(char)
+    if current:
+        parts.append("".join(current))
+    return tuple(parts)
+
+
+@lru_cache(maxsize=1024)
+def in_values(raw: str) -> Tuple[Tuple[str, ...], frozenset]:
+    """Valores de um filtro in.(a,b,...): a lista (para comparar datas e números) e o conjunto sem aspas."""
+    values = tuple(value.strip() for value in split_top_level(raw.strip()[1:-1]))
+    return values, frozenset(unquote_value(value) for value in values)
+
+
+Predicate = Callable[[Dict[str, Any]], bool]
+
+COMPARISONS = {
+    "eq": operator.eq, "neq": operator.ne,
+    "gt": operator.gt, "gte": operator.ge, "lt": operator.lt, "lte": operator.le,
+}
+
+
+@lru_cache(maxsize=1024)
+def compile_condition(column: str, expression: str) -> Predicate:
+    """
+    Compila um filtro do PostgREST (ex.: "eq.abc", "in.(a,b)", "not.is.null") em uma função
+    linha -> bool. Em cache: o filtro é interpretado uma vez, não uma vez por linha da tabela.
+    """
+    if column in ("or", "and"):
+        predicates = [compile_logical(condition) for condition in split_top_level(expression.strip()[1:-1])]
+        combine = any if column == "or" else all
+        return lambda row: combine(predicate(row) for predicate in predicates)
+
+    negate = expression.startswith("not.")
+    if negate:
+        expression = expression[4:]
+    name, _, raw = expression.partition(".")
+    test = compile_operator(column, name, raw)
+    return (lambda row: not test(row)) if negate else test
+
+
+def compile_operator(column: str, name: str, raw: str) -> Predicate:
+    if name == "is":
+        if raw == "null":
+            return lambda row: row.get(column) is None
+        expected = raw == "true"
+        return lambda row: row.get(column) is expected
+
+    if name == "in":
+        values, texts = in_values(raw)
+        # sem datas na lista, texto armazenado é comparado direto (ids), sem converter valor a valor
+        has_dates = any(parse_iso(text) is not None for text in texts)
+
+        def test_in(row: Dict[str, Any]) -> bool:
+            stored = row.get(column)
+            if stored is None:
+                return False
+            if isinstance(stored, str) and not has_dates:
+                return stored in texts
+            return any(a == b for a, b in (comparable(stored, value) for value in values))
+        return test_in
+
+    if name in ("like", "ilike"):
+        pattern = raw.replace("*", "%")
+        if name == "ilike":
+            pattern = pattern.lower()
+
+        def test_like(row: Dict[str, Any]) -> bool:
+            stored = row.get(column)
+            if stored is None:
+                return False
+            text = str(stored)
+            return like(text.lower() if name == "ilike" else text, pattern)
+        return test_like
+
+    compare = COMPARISONS.get(name)
+    if compare is None:
+        raise PostgrestError(400, "PGRST100", f"Operador não suportado: {name}")
+    text = unquote_value(raw)
+    text_is_date = parse_iso(text) is not None
+
+    def test_compare(row: Dict[str, Any]) -> bool:
+        stored = row.get(column)
+        if stored is None:
+            return False
+        a, b = (stored, text) if isinstance(stored, str) and not text_is_date else comparable(stored, raw)
+        try:
+            return compare(a, b)
+        except TypeError:
+            return False
+    return test_compare
+
+
+def compile_logical(condition: str) -> Predicate:
+    """Condição dentro de or(...)/and(...): "coluna.op.valor" ou "and(...)"/"or(...)"."""
+    for logical in ("and", "or"):
+        if condition.startswith(f"{logical}("):
+            return compile_condition(logical, condition[len(logical):])
+    column, _, expression = condition.partition(".")
+    return compile_condition(column, expression)
+
+
+def like(text: str, pattern: str) -> bool:
+    return fnmatch.fnmatchcase(text, pattern.replace("%", "*").replace("_", "?"))
+
+
+class FakePostgREST(httpx.BaseTransport):
+    """Servidor PostgREST em memória (transporte httpx para o cliente síncrono do Supabase)."""
+
+    # Parâmetros da query string que não são filtros
+    RESERVED_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.tables: Dict[str, List[Dict[str, Any]]] = {}
+        self.requests = 0
+        self._lock = threading.RLock()
+        self.views: Dict[str, Callable[[], List[Dict[str, Any]]]] = {
+            "report_storage_summary": self.report_storage_summary,
+        }
+        self.rpcs: Dict[str, Callable[..., Any]] = {
+            "register_storage_exit": self.register_storage_exit,
+            "upsert_storage_entries": self.upsert_storage_entries,
+            "create_order_with_items": self.create_order_with_items,
+            "report_order_aggregates": self.report_order_aggregates,
+            "invalidate_report_snapshots": self.invalidate_report_snapshots,
+        }
+
+    # ---- dados ----
+
+    def table(self, name: str) -> List[Dict[str, Any]]:
+        return self.tables.setdefault(name, [])
+
+    def seed(self, name: str, rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insere linhas diretamente (sem latência), preenchendo id e created_at se faltarem."""
+        with self._lock:
+            created = [self.new_row(row) for row in rows]
+            self.table(name).extend(created)
+            return created
+
+    def load(self, data: Dict[str, List[Dict[str, Any]]]) -> None:
+        """Carrega várias tabelas de uma vez (ex.: JSON {"units": [...], "orders": [...]})."""
+        for name, rows in data.items():
+            self.seed(name, rows)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.tables.clear()
+            self.requests = 0
+
+    @staticmethod
+    def new_row(values: Dict[str, Any]) -> Dict[str, Any]:
+        row = dict(values)
+        row.setdefault("id", str(uuid.uuid4()))
+        row.setdefault("created_at", utc_now())
+        return row
+
+    # ---- transporte ----
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        delay = self.latency_ms + (random.uniform(0, self.jitter_ms) if self.jitter_ms else 0.0)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+
+        path = unquote(request.url.path).split("/rest/v1/", 1)[-1].strip("/")
+        params = list(request.url.params.multi_items())
+        body = json.loads(request.content) if request.content else None
+        try:
+            with self._lock:
+                self.requests += 1
+                if path.startswith("rpc/"):
+                    status, data = 200, self.call_rpc(path[4:], body or {})
+                else:
+                    status, data = self.handle_table(request, path, params, body)
+        except PostgrestError as e:
+            return httpx.Response(
+                e.status,
+                json={"code": e.code, "message": e.message, "details": None, "hint": None},
+            )
+        return httpx.Response(status, json=data)
+
+    def handle_table(self, request: httpx.Request, name: str, params, body) -> Tuple[int, Any]:
+        method = request.method
+        filters = [(key, value) for key, value in params if key not in self.RESERVED_PARAMS]
+        options = {key: value for key, value in params if key in self.RESERVED_PARAMS}
+
+        if method in ("GET", "HEAD"):
+            rows = self.views[name]() if name in self.views else self.table(name)
+            matches = self.compile_filters(filters)
+            rows = [row for row in rows if matches(row)]
+            rows = self.apply_order(rows, options.get("order"))
+            offset = int(options.get("offset", 0))
+            if "limit" in options:
+                rows = rows[offset:offset + int(options["limit"])]
+            elif offset:
+                rows = rows[offset:]
+            return 200, [self.project(row, options.get("select", "*")) for row in rows]
+
+        if name in self.views:
+            raise PostgrestError(405, "PGRST105", f"A view '{name}' é somente leitura")
+        table = self.table(name)
+
+        if method == "POST":
+            values = body if isinstance(body, list) else [body or {}]
+            prefer = request.headers.get("prefer", "")
+            if "merge-duplicates" in prefer or "ignore-duplicates" in prefer:
+                keys = [key.strip() for key in options.get("on_conflict", "id").split(",")]
+                if "ignore-duplicates" in prefer:
+                    # linhas já existentes ficam como estão e não voltam na resposta
+                    created = []
+                    for value in values:
+                        if not any(all(row.get(key) == value.get(key) for key in keys) for row in table):
+                            created.append(self.new_row(value))
+                            table.append(created[-1])
+                    return 201, [dict(row) for row in created]
+                return 201, [self.upsert_row(table, value, keys) for value in values]
+            created = [self.new_row(value) for value in values]
+            table.extend(created)
+            return 201, [dict(row) for row in created]
+
+        matches = self.compile_filters(filters)
+        matched = [row for row in table if matches(row)]
+        if method == "PATCH":
+            for row in matched:
+                row.update(body or {})
+            return 200, [dict(row) for row in matched]
+        if method == "DELETE":
+            matched_ids = {id(row) for row in matched}
+            self.tables[name] = [row for row in table if id(row) not in matched_ids]
+            return 200, [dict(row) for row in matched]
+        raise PostgrestError(405, "PGRST105", f"Método não suportado: {method}")
+
+    @staticmethod
+    def compile_filters(filters) -> Predicate:
+        predicates = [compile_condition(column, expression) for column, expression in filters]
+        if len(predicates) == 1:
+            return predicates[0]
+        return lambda row: all(predicate(row) for predicate in predicates)
+
+    @staticmethod
+    def apply_order(rows: List[Dict[str, Any]], order: Optional[str]) -> List[Dict[str, Any]]:
+        if not order:
+            return list(rows)
+        rows = list(rows)
+        # ordenações estáveis, da última chave para a primeira
+        for term in reversed(order.split(",")):
+            column, *modifiers = term.split(".")
+            desc = "desc" in modifiers
+            present = [row for row in rows if row.get(column) is not None]
+            missing = [row for row in rows if row.get(column) is None]
+            present.sort(key=lambda row: sort_value(row[column]), reverse=desc)
+            # PostgreSQL: nulos por último em ASC e primeiro em DESC, salvo nullsfirst/nullslast
+            nulls_first = "nullsfirst" in modifiers or (desc and "nullslast" not in modifiers)
+            rows = missing + present if nulls_first else present + missing
+        return rows
+
+    @staticmethod
+    def project(row: Dict[str, Any], select: str) -> Dict[str, Any]:
+        columns = [column.strip() for column in split_top_level(select)]
+        if "*" in columns:
+            return dict(row)
+        return {column: row.get(column) for column in columns if "(" not in column}
+
+    def upsert_row(self, table: List[Dict[str, Any]], values: Dict[str, Any], keys: List[str]) -> Dict[str, Any]:
+        for row in table:
+            if all(row.get(key) == values.get(key) for key in keys):
+                row.update(values)
+                return dict(row)
+        row = self.new_row(values)
+        table.append(row)
+        return dict(row)
+
+    def call_rpc(self, name: str, params: Dict[str, Any]) -> Any:
+        function = self.rpcs.get(name)
+        if function is None:
+            raise PostgrestError(404, "PGRST202", f"Função '{name}' não encontrada")
+        return function(**params)
+
+    # ---- view e RPCs (mesma regra das migrations) ----
+
+    def report_storage_summary(self) -> List[Dict[str, Any]]:
+        groups: Dict[Tuple[Any, Any], Dict[str, Any]] = {}
+        for s in self.table("storage"):
+            key = (s.get("unit_id"), s.get("name"))
+            group = groups.setdefault(key, {
+                "unit_id": key[0], "name": key[1], "bought": 0.0, "donated": 0.0, "current": 0.0,
+            })
+            initial_q = float(s.get("initial_quantity") or 0)
+            used_q = float(s.get("used_quantity") or 0)
+            if str(s.get("type") or "").lower().startswith("doa"):
+                group["donated"] += initial_q
+            else:
+                group["bought"] += initial_q
+            group["current"] += max(initial_q - used_q, 0.0)
+        return list(groups.values())
+
+    def register_storage_exit(self, p_unit_id: str, p_items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        quantities: Dict[str, int] = {}
+        for item in p_items or []:
+            quantities[item["name"]] = quantities.get(item["name"], 0) + int(item.get("used_quantity") or 0)
+
+        rows = {s["name"]: s for s in self.table("storage") if s.get("unit_id") == p_unit_id and s.get("name") in quantities}
+        for name in sorted(quantities):
+            if name not in rows:
+                raise PostgrestError(404, "PT404", f"Item '{name}' não encontrado")
+        for name in sorted(quantities):
+            row = rows[name]
+            initial_q = row.get("initial_quantity") or 0
+            used_q = row.get("used_quantity") or 0
+            if used_q + quantities[name] > initial_q:
+                raise PostgrestError(
+                    400, "PT400",
+                    f"Quantidade indisponível para o item '{name}'. "
+                    f"Disponível: {initial_q - used_q}, Solicitada: {quantities[name]}",
+                )
+
+        updated = []
+        for name, quantity in quantities.items():
+            row = rows[name]
+            row["used_quantity"] = (row.get("used_quantity") or 0) + quantity
+            row["updated_at"] = utc_now()
+            updated.append(dict(row))
+        return updated
+
+    def upsert_storage_entries(self, p_unit_id: str, p_items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not any(unit.get("id") == p_unit_id for unit in self.table("units")):
+            raise PostgrestError(409, "23503", "insert or update on table \"storage\" violates foreign key constraint")
+        entries: Dict[str, Dict[str, Any]] = {}
+        for item in p_items or []:
+            entry = entries.setdefault(item["name"], {"initial_quantity": 0})
+            entry["initial_quantity"] += int(item.get("initial_quantity") or 0)
+            entry["amount"] = item.get("amount")
+            entry["type"] = item.get("type")
+
+        storage = self.table("storage")
+        existing = {s.get("name") for s in storage if s.get("unit_id") == p_unit_id}
+        if any(name in existing and entry["initial_quantity"] <= 0 for name, entry in entries.items()):
+            raise PostgrestError(400, "PT400", "increment deve ser maior que 0")
+        result = []
+        for name, entry in entries.items():
+            row = next((s for s in storage if s.get("unit_id") == p_unit_id and s.get("name") == name), None)
+            if row is None:
+                row = self.new_row({
+                    "unit_id": p_unit_id, "name": name, "amount": entry["amount"], "type": entry["type"],
+                    "initial_quantity": entry["initial_quantity"], "used_quantity": 0, "updated_at": None,
+                })
+                storage.append(row)
+            else:
+                # amount/type do registro existente são mantidos
+                row["initial_quantity"] = (row.get("initial_quantity") or 0) + entry["initial_quantity"]
+                row["updated_at"] = utc_now()
+            result.append(dict(row))
+        return result
+
+    def create_order_with_items(self, p_order: Dict[str, Any], p_items: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        # só as chaves presentes, como na migration; os DEFAULTs das colunas ficam
+        # com os valores de ORDER_ITEM_DEFAULTS (o backend em memória não tem schema)
+        order = self.new_row({
+            key: value for key, value in (p_order or {}).items()
+            if key in ("description", "amount", "unit_id", "budget_id")
+        })
+        self.table("orders").append(order)
+        items = [
+            self.new_row({
+                **ORDER_ITEM_DEFAULTS,
+                **{
+                    key: value for key, value in item.items()
+                    if key in ("description", "amount", "measure_unit", "received")
+                },
+                "order_id": order["id"],
+            })
+            for item in p_items or []
+        ]
+        self.table("order_items").extend(items)
+        return {"order": dict(order), "items": [dict(item) for item in items]}
+
+    def invalidate_report_snapshots(
+        self,
+        p_unit_id: Optional[str] = None,
+        p_months: Optional[List[str]] = None,
+        p_at: Optional[str] = None,
+    ) -> None:
+        at = parse_timestamp(p_at)
+        for row in self.table("report_snapshots"):
+            if p_unit_id is not None and row.get("unit_id") != p_unit_id:
+                continue
+            if p_months is not None and row.get("month") not in p_months:
+                continue
+            start, end = parse_timestamp(row.get("range_start")), parse_timestamp(row.get("range_end"))
+            if at is not None and start is not None and end is not None and not (start <= at < end):
+                continue
+            row.update(payload=None, version=(row.get("version") or 0) + 1, updated_at=utc_now())
+        return None
+
+    def report_order_aggregates(
+        self, p_unit_id: Optional[str] = None, p_start: Optional[str] = None, p_end: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        start, end = parse_timestamp(p_start), parse_timestamp(p_end)
+        items_count: Dict[str, int] = {}
+        for item in self.table("order_items"):
+            items_count[item.get("order_id")] = items_count.get(item.get("order_id"), 0) + 1
+
+        by_unit: Dict[str, List[Tuple[datetime, Dict[str, Any]]]] = {}
+        for order in self.table("orders"):
+            unit_id = order.get("unit_id")
+            created = parse_timestamp(order.get("created_at"))
+            if unit_id is None or (p_unit_id and unit_id != p_unit_id):
+                continue
+            if start and end and not (created and start <= created < end):
+                continue
+            by_unit.setdefault(unit_id, []).append((created, order))
+
+        result = []
+        for unit_id, orders in by_unit.items():
+            monthly: Dict[str, float] = {}
+            for created, order in orders:
+                key = f"{created.year:04d}-{created.month:02d}"
+                monthly[key] = monthly.get(key, 0.0) + float(order.get("amount") or 0)
+            recent = sorted(orders, key=lambda pair: (pair[0], str(pair[1]["id"])), reverse=True)[:10]
+            result.append({
+                "unit_id": unit_id,
+                "total_spending": sum(float(order.get("amount") or 0) for _, order in orders),
+                "monthly_spent": monthly,
+                "recent_orders": [
+                    {
+                        "id": order["id"],
+                        "date": created.isoformat(),
+                        "amount": float(order.get("amount") or 0),
+                        "items_count": items_count.get(order["id"]) or None,
+                    }
+                    for created, order in recent
+                ],
+            })
+        return result
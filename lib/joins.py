@@ -0,0 +1,32 @@
+import asyncio
+from typing import Any, Iterable, List
+from lib.supabase_client import supabase, execute
+
+# Quantidade de valores por filtro in_(), para manter a URL do PostgREST curta
+IN_BATCH_SIZE = 150
+
+
+async def select_in(table: str, column: str, values: Iterable[Any], columns: str = "*") -> List[dict]:
+    """
+    Busca as linhas de `table` cujo `column` está em `values`.
+    Valores repetidos são ignorados; lotes de IN_BATCH_SIZE são buscados em paralelo.
+    Retorna a lista de linhas (dicts), sem ordem garantida.
+    """
+    unique_values = list(dict.fromkeys(values))
+    if not unique_values:
+        return []
+
+    batches = [
+        unique_values[i:i + IN_BATCH_SIZE]
+        for i in range(0, len(unique_values), IN_BATCH_SIZE)
+    ]
+    responses = await asyncio.gather(*(
+        execute(supabase.table(table).select(columns).in_(column, batch))
+        for batch in batches
+    ))
+
+    rows: List[dict] = []
+    for response in responses:
+        rows.extend(response.data or [])
+    return rows
+
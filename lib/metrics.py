@@ -0,0 +1,237 @@
+import os
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+# Requisições acima deste tempo (ms) são logadas com o número de consultas ao Supabase
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "1000"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    """Contador com labels, no formato de exposição do Prometheus."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Tuple[str, ...], amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value:g}")
+        return lines
+
+
+class Histogram:
+    """Histograma com labels e buckets fixos, no formato de exposição do Prometheus."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [contagem por bucket..., soma, contagem total]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        with self._lock:
+            values = self._values.get(labels)
+            if values is None:
+                values = self._values[labels] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    values[i] += 1
+            values[-2] += value
+            values[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, values in sorted(self._values.items()):
+                for bound, count in zip(self.buckets, values):
+                    le = _format_labels(self.labelnames, labels, f'le="{bound:g}"')
+                    lines.append(f"{self.name}_bucket{le} {count:g}")
+                inf = _format_labels(self.labelnames, labels, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{inf} {values[-1]:g}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {values[-2]:g}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {values[-1]:g}")
+        return lines
+
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "Latência das requisições HTTP por rota.",
+    ("method", "route", "status"), LATENCY_BUCKETS,
+)
+http_request_queries = Histogram(
+    "http_request_supabase_queries", "Consultas ao Supabase por requisição HTTP (N+1 aparece aqui).",
+    ("method", "route"), QUERY_COUNT_BUCKETS,
+)
+supabase_request_duration = Histogram(
+    "supabase_request_duration_seconds", "Latência das consultas ao Supabase por tabela e operação.",
+    ("table", "operation"), LATENCY_BUCKETS,
+)
+supabase_rows = Counter(
+    "supabase_rows_total", "Linhas retornadas pelo Supabase por tabela e operação.",
+    ("table", "operation"),
+)
+supabase_errors = Counter(
+    "supabase_errors_total", "Consultas ao Supabase que falharam, por tabela e operação.",
+    ("table", "operation"),
+)
+
+REGISTRY = (http_request_duration, http_request_queries, supabase_request_duration, supabase_rows, supabase_errors)
+
+
+def render_metrics() -> str:
+    """Todas as métricas no formato texto do Prometheus (rota GET /metrics)."""
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+@dataclass
+class RequestStats:
+    """Consultas ao Supabase feitas durante uma requisição HTTP (ou um bloco track_queries)."""
+    label: str = ""
+    queries: int = 0
+    rows: int = 0
+    db_seconds: float = 0.0
+    # (tabela, operação) -> número de consultas
+    by_table: Dict[Tuple[str, str], int] = field(default_factory=dict)
+    # usados por lib/query_budget: formato da consulta -> valores distintos, e alertas já emitidos
+    shapes: Dict[str, Set[str]] = field(default_factory=dict)
+    alerts: Set[str] = field(default_factory=set)
+
+
+# Estatísticas da requisição em andamento (None fora de uma requisição HTTP)
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def describe_query(query) -> Tuple[str, str]:
+    """
+    Tabela e operação de uma query do postgrest (select, insert, upsert, update, delete ou rpc).
+    Para RPCs, a "tabela" é o nome da função.
+    """
+    request = getattr(query, "request", None)
+    path = str(getattr(request, "path", "") or "")
+    table = path.rsplit("/rest/v1/", 1)[-1].split("?", 1)[0] or "unknown"
+    if table.startswith("rpc/"):
+        return table[4:], "rpc"
+
+    method = (getattr(request, "http_method", "") or "").upper()
+    if method == "POST":
+        prefer = (getattr(request, "headers", None) or {}).get("prefer", "") or ""
+        return table, "upsert" if "-duplicates" in prefer else "insert"
+    return table, {"PATCH": "update", "DELETE": "delete"}.get(method, "select")
+
+
+def count_query(table: str, operation: str) -> None:
+    """
+    Conta uma consulta na requisição em andamento ao ser disparada (antes de terminar),
+    para que consultas concorrentes (asyncio.gather) já apareçam no orçamento.
+    """
+    stats = request_stats.get()
+    if stats is not None:
+        labels = (table, operation)
+        stats.queries += 1
+        stats.by_table[labels] = stats.by_table.get(labels, 0) + 1
+
+
+def record_query(table: str, operation: str, seconds: float, rows: int, failed: bool = False) -> None:
+    """Registra uma consulta terminada nas métricas globais e na requisição em andamento."""
+    labels = (table, operation)
+    supabase_request_duration.observe(labels, seconds)
+    if failed:
+        supabase_errors.inc(labels)
+    else:
+        supabase_rows.inc(labels, rows)
+
+    stats = request_stats.get()
+    if stats is not None:
+        stats.rows += rows
+        stats.db_seconds += seconds
+
+
+def route_template(scope) -> str:
+    """
+    Rota da requisição como template (ex.: /orders/{order_id}), para manter poucas séries.
+    O FastAPI guarda em scope["route"] a rota do APIRouter sem o prefixo do include_router:
+    o prefixo vem dos primeiros segmentos do caminho requisitado.
+    """
+    route = scope.get("route")
+    route_path = getattr(route, "path", None)
+    if route_path is None:
+        return "unmatched"
+    route_segments = [segment for segment in route_path.split("/") if segment]
+    path_segments = [segment for segment in scope.get("path", "").split("/") if segment]
+    prefix = path_segments[:max(len(path_segments) - len(route_segments), 0)]
+    return "/" + "/".join(prefix + route_segments)
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI: mede a latência de cada requisição por rota (template, ex.: /orders/{order_id})
+    e o número de consultas ao Supabase feitas durante ela.
+    Requisições mais lentas que SLOW_REQUEST_MS são logadas com as consultas por tabela.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(label=f"{scope.get('method', '')} {scope.get('path', '')}")
+        token = request_stats.set(stats)
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_stats.reset(token)
+            elapsed = time.perf_counter() - started
+            route = route_template(scope)
+            method = scope.get("method", "")
+            http_request_duration.observe((method, route, str(status_code)), elapsed)
+            http_request_queries.observe((method, route), stats.queries)
+
+            if elapsed * 1000.0 >= SLOW_REQUEST_MS:
+                tables = ", ".join(f"{t}.{op}×{n}" for (t, op), n in stats.by_table.items())
+                print(
+                    f"[SLOW] {method} {route} {status_code} {elapsed * 1000.0:.0f} ms, "
+                    f"{stats.queries} consulta(s) ({stats.db_seconds * 1000.0:.0f} ms) {tables}"
+                )
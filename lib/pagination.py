@@ -0,0 +1,88 @@
+import base64
+import json
+import uuid
+from datetime import date, datetime
+from typing import Any, List, Optional, Tuple
+from fastapi import HTTPException
+
+# Tamanho máximo de página aceito pelas rotas de listagem
+MAX_PAGE_SIZE = 500
+
+# Header de resposta com o cursor da próxima página
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(sort_value: Any, row_id: Any) -> str:
+    """
+    Gera um cursor opaco a partir do valor de ordenação e do id do último registro.
+    """
+    if isinstance(sort_value, (datetime, date)):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[str], str]:
+    """
+    Decodifica um cursor gerado por encode_cursor.
+    Retorna (valor de ordenação ou None se era nulo, id). Levanta HTTPException(400) se inválido.
+    O id precisa ser um UUID e o valor de ordenação uma data/timestamp ISO: os dois vão para
+    o filtro or=(...) do PostgREST, e outros caracteres poderiam alterar o filtro.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        row_id = str(uuid.UUID(row_id))
+        if sort_value is not None:
+            if not isinstance(sort_value, str):
+                raise ValueError("valor de ordenação não é texto")
+            datetime.fromisoformat(sort_value)
+        return sort_value, row_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Parâmetro 'cursor' inválido")
+
+
+def apply_keyset(query, limit: Optional[int], cursor: Optional[str] = None, column: str = "created_at"):
+    """
+    Aplica paginação keyset (column DESC NULLS FIRST, id DESC) a uma query do Supabase.
+    Linhas com `column` nulo vêm primeiro, ordenadas só pelo id.
+    Sem `limit`, a query é retornada sem alterações.
+    """
+    if not limit:
+        return query
+
+    query = query.order(column, desc=True, nullsfirst=True).order("id", desc=True)
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        if sort_value is None:
+            # ainda entre os nulos: os próximos nulos pelo id, depois todos os não nulos
+            query = query.or_(
+                f'and({column}.is.null,id.lt."{row_id}"),'
+                f'{column}.not.is.null'
+            )
+        else:
+            # valores entre aspas: timestamps contêm ':' e '.', reservados na sintaxe do PostgREST
+            query = query.or_(
+                f'{column}.lt."{sort_value}",'
+                f'and({column}.eq."{sort_value}",id.lt."{row_id}")'
+            )
+    return query.limit(limit)
+
+
+def build_next_cursor(items: List[Any], limit: Optional[int], column: str = "created_at") -> Optional[str]:
+    """
+    Retorna o cursor da próxima página, ou None se esta for a última.
+    Uma página cheia (len == limit) indica que pode haver mais registros.
+    """
+    if not limit or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor(getattr(last, column), getattr(last, "id"))
+
+
+def set_next_cursor(response, cursor: Optional[str]) -> None:
+    """
+    Expõe o cursor da próxima página no header da resposta, se houver.
+    """
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
@@ -0,0 +1,100 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+from fastapi import HTTPException
+
+# bcrypt libera o GIL durante o cálculo do hash, então threads dão paralelismo real.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Máximo de operações (em execução + na fila) antes de recusar novas com 503.
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+
+_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS,
+    thread_name_prefix="bcrypt",
+)
+
+# Atualizados pelo event loop (in_flight, rejected, cancelled) e pelas threads do pool
+# (completed, failed, tempos): sempre sob _metrics_lock.
+_metrics_lock = threading.Lock()
+_metrics: Dict[str, Any] = {
+    "in_flight": 0,
+    "max_in_flight": 0,
+    "completed": 0,
+    "failed": 0,
+    "cancelled": 0,
+    "rejected": 0,
+    "total_wait_ms": 0.0,
+    "total_run_ms": 0.0,
+}
+
+
+def _timed(func: Callable, submitted_at: float, *args):
+    """Roda na thread do pool. Só hashes bem-sucedidos entram em completed e nas médias."""
+    started_at = time.perf_counter()
+    try:
+        result = func(*args)
+    except BaseException:
+        with _metrics_lock:
+            _metrics["failed"] += 1
+        raise
+    finished_at = time.perf_counter()
+    with _metrics_lock:
+        _metrics["completed"] += 1
+        _metrics["total_wait_ms"] += (started_at - submitted_at) * 1000
+        _metrics["total_run_ms"] += (finished_at - started_at) * 1000
+    return result
+
+
+async def run_in_password_pool(func: Callable, *args):
+    """
+    Executa uma operação de hash de senha no pool dedicado, sem bloquear o event loop.
+    Levanta HTTPException(503) se a fila estiver cheia.
+    """
+    with _metrics_lock:
+        rejected = _metrics["in_flight"] >= PASSWORD_HASH_MAX_QUEUE
+        if rejected:
+            _metrics["rejected"] += 1
+        else:
+            _metrics["in_flight"] += 1
+            _metrics["max_in_flight"] = max(_metrics["max_in_flight"], _metrics["in_flight"])
+    if rejected:
+        raise HTTPException(
+            status_code=503,
+            detail="Servidor ocupado, tente novamente em instantes",
+            headers={"Retry-After": "1"},
+        )
+
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, _timed, func, time.perf_counter(), *args)
+    except asyncio.CancelledError:
+        # requisição abandonada (ex.: cliente desconectou); o hash pode ainda terminar na thread
+        with _metrics_lock:
+            _metrics["cancelled"] += 1
+        raise
+    finally:
+        with _metrics_lock:
+            _metrics["in_flight"] -= 1
+
+
+def password_pool_stats() -> Dict[str, Any]:
+    """Contadores do pool de hash de senha."""
+    with _metrics_lock:
+        metrics = dict(_metrics)
+    completed = metrics["completed"]
+    return {
+        "workers": PASSWORD_HASH_WORKERS,
+        "max_queue": PASSWORD_HASH_MAX_QUEUE,
+        "in_flight": metrics["in_flight"],
+        "max_in_flight": metrics["max_in_flight"],
+        "completed": completed,
+        "failed": metrics["failed"],
+        "cancelled": metrics["cancelled"],
+        "rejected": metrics["rejected"],
+        "avg_wait_ms": (metrics["total_wait_ms"] / completed) if completed else 0.0,
+        "avg_run_ms": (metrics["total_run_ms"] / completed) if completed else 0.0,
+    }
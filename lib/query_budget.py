@@ -0,0 +1,98 @@
+"""
+Orçamento de consultas por requisição e detector de N+1 (opcional, para desenvolvimento e CI).
+
+Com QUERY_BUDGET > 0, uma requisição que passa de QUERY_BUDGET consultas ao Supabase
+é sinalizada. Com N_PLUS_ONE_THRESHOLD > 0, também é sinalizada a requisição que repete
+a mesma consulta (mesma tabela, operação e filtros) com N_PLUS_ONE_THRESHOLD valores
+diferentes, o padrão de um laço com uma consulta por id.
+
+Por padrão a violação é logada ([QUERY-BUDGET]); com QUERY_BUDGET_MODE=raise, a consulta
+é interrompida com HTTPException(500), para que testes e CI falhem.
+"""
+import json
+import os
+from contextlib import contextmanager
+from typing import Iterator, Tuple
+from fastapi import HTTPException
+from lib.metrics import RequestStats, request_stats
+
+QUERY_BUDGET = int(os.getenv("QUERY_BUDGET", "0"))
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "0"))
+QUERY_BUDGET_MODE = os.getenv("QUERY_BUDGET_MODE", "log").lower()
+
+# Parâmetros que fazem parte do formato da consulta (não são valores de filtro).
+# "or"/"and" são os cursores da paginação keyset: cada página tem um formato próprio.
+SHAPE_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns", "or", "and"}
+
+
+def query_shape(table: str, operation: str, query) -> Tuple[str, str]:
+    """
+    Formato da consulta (tabela, operação, colunas filtradas e operadores) e os valores usados.
+    Ex.: orders.select?select=*&unit_id=eq  /  unit_id=eq.abc
+    """
+    request = getattr(query, "request", None)
+    params = getattr(request, "params", None)
+    shape_parts = []
+    value_parts = []
+    for key, value in (params.multi_items() if params is not None else []):
+        if key in SHAPE_PARAMS:
+            shape_parts.append(f"{key}={value}")
+        else:
+            operator, _, operand = value.partition(".")
+            shape_parts.append(f"{key}={operator}")
+            # lotes de in_() (lib/joins.select_in) são a correção do N+1, não valores distintos
+            if operator != "in":
+                value_parts.append(f"{key}={operand}")
+    if operation == "rpc":
+        value_parts.append(json.dumps(getattr(request, "json", None), sort_keys=True, default=str))
+    return f"{table}.{operation}?{'&'.join(shape_parts)}", "&".join(value_parts)
+
+
+def report_violation(stats: RequestStats, key: str, message: str) -> None:
+    """Loga a violação (uma vez por requisição) e, em QUERY_BUDGET_MODE=raise, interrompe a consulta."""
+    if key not in stats.alerts:
+        stats.alerts.add(key)
+        print(f"[QUERY-BUDGET] {stats.label}: {message}")
+    if QUERY_BUDGET_MODE == "raise":
+        raise HTTPException(status_code=500, detail=f"Orçamento de consultas violado: {message}")
+
+
+def check_query(table: str, operation: str, query) -> None:
+    """
+    Confere o orçamento antes de executar uma consulta (chamado por execute()).
+    Fora de uma requisição (ou bloco track_queries), ou com o modo desligado, não faz nada.
+    """
+    if QUERY_BUDGET <= 0 and N_PLUS_ONE_THRESHOLD <= 0:
+        return
+    stats = request_stats.get()
+    if stats is None:
+        return
+
+    # stats.queries já inclui esta consulta (lib/metrics.count_query, no disparo)
+    if 0 < QUERY_BUDGET < stats.queries:
+        report_violation(stats, "budget", f"{stats.queries} consultas, orçamento de {QUERY_BUDGET}")
+
+    if N_PLUS_ONE_THRESHOLD > 0:
+        shape, values = query_shape(table, operation, query)
+        seen = stats.shapes.setdefault(shape, set())
+        seen.add(values)
+        if len(seen) >= N_PLUS_ONE_THRESHOLD:
+            report_violation(
+                stats, shape,
+                f"possível N+1: {shape} repetida com {len(seen)} valores diferentes",
+            )
+
+
+@contextmanager
+def track_queries(label: str = "track_queries") -> Iterator[RequestStats]:
+    """
+    Conta as consultas feitas dentro do bloco, fora de uma requisição HTTP
+    (scripts, benchmarks, testes), com as mesmas verificações de orçamento e N+1.
+    Uso: `with track_queries("relatorio") as stats: ...; stats.queries`.
+    """
+    stats = RequestStats(label=label)
+    token = request_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        request_stats.reset(token)
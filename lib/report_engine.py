@@ -0,0 +1,215 @@
+"""
+Agregação colunar dos relatórios (caminho em Python, REPORT_DB_AGGREGATION=false).
+
+As linhas de pedidos e de estoque são lidas uma única vez para colunas
+(listas e array('d')), com as datas convertidas em lote; filtros, somas,
+agrupamentos por mês/unidade e os pedidos mais recentes (heapq.nlargest)
+trabalham sobre essas colunas, sem repetir getattr/conversões por etapa.
+Os resultados têm o mesmo formato da view report_storage_summary e da
+RPC report_order_aggregates.
+"""
+import heapq
+from array import array
+from operator import attrgetter
+from datetime import datetime, date
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from entities.dtos.report_dto import OrderSummary
+
+# Quantidade de pedidos recentes no relatório
+RECENT_ORDERS_LIMIT = 10
+
+
+def to_naive_datetime(dt: Optional[datetime]) -> Optional[datetime]:
+    if dt is None:
+        return None
+    if isinstance(dt, str):
+        try:
+            dt = datetime.fromisoformat(dt)
+        except Exception:
+            return None
+    if isinstance(dt, date) and not isinstance(dt, datetime):
+        return datetime.combine(dt, datetime.min.time())
+    if isinstance(dt, datetime):
+        if dt.tzinfo is not None:
+            return dt.replace(tzinfo=None)
+        return dt
+    return None
+
+
+def parse_timestamps(values: Iterable[Any]) -> List[Optional[datetime]]:
+    """
+    Converte uma coluna de datas (datetime, date ou string ISO) para datetime sem fuso.
+    Strings repetidas são convertidas uma única vez.
+    """
+    parsed: Dict[Any, Optional[datetime]] = {}
+    column: List[Optional[datetime]] = []
+    append = column.append
+    for value in values:
+        if value.__class__ is datetime:
+            append(value if value.tzinfo is None else value.replace(tzinfo=None))
+        elif value.__class__ is str:
+            if value not in parsed:
+                parsed[value] = to_naive_datetime(value)
+            append(parsed[value])
+        else:
+            append(to_naive_datetime(value))
+    return column
+
+
+def read_column(rows: List[Any], name: str, default: Any = None) -> List[Any]:
+    """
+    Lê o atributo `name` de todas as linhas.
+    Em linhas de um mesmo modelo pydantic, consulta os campos do modelo uma vez:
+    campo inexistente vira `default` sem passar pelo getattr com erro de cada linha.
+    """
+    if not rows:
+        return []
+    cls = rows[0].__class__
+    fields = getattr(cls, "model_fields", None)
+    if fields is not None and all(row.__class__ is cls for row in rows):
+        if name not in fields:
+            return [default] * len(rows)
+        return list(map(attrgetter(name), rows))
+    return [getattr(row, name, default) for row in rows]
+
+
+def empty_order_totals() -> Dict[str, Any]:
+    """Totais de pedidos de uma unidade sem pedidos no período."""
+    return {"total_spending": 0.0, "monthly_spent": {}, "recent_orders": []}
+
+
+class OrderColumns:
+    """Pedidos em colunas: unidade, data (sem fuso), chave de mês (AAAAMM) e valor."""
+
+    def __init__(self, orders: List[Any]):
+        self.orders = orders or []
+        self.unit_ids = read_column(self.orders, "unit_id")
+        self.created = parse_timestamps(read_column(self.orders, "created_at"))
+        self.amounts = array("d", [float(a or 0) for a in read_column(self.orders, "amount", 0)])
+        self.months = array("l", [c.year * 100 + c.month if c else 0 for c in self.created])
+        # chave de ordenação dos recentes: pedidos sem data ficam por último
+        self.sort_keys = [c or datetime.min for c in self.created]
+
+    def select(self, start_dt: Optional[datetime], end_dt: Optional[datetime]) -> List[int]:
+        """Índices dos pedidos em [start_dt, end_dt); sem intervalo completo, todos."""
+        if not (start_dt and end_dt):
+            return list(range(len(self.orders)))
+        return [
+            i for i, created in enumerate(self.created)
+            if created is not None and start_dt <= created < end_dt
+        ]
+
+    def totals(self, rows: List[int]) -> Dict[str, Any]:
+        """Gasto total, gasto por mês (YYYY-MM) e pedidos mais recentes das linhas `rows`."""
+        if not rows:
+            return empty_order_totals()
+
+        amounts = list(map(self.amounts.__getitem__, rows))
+
+        monthly: Dict[int, float] = {}
+        for month, amount in zip(map(self.months.__getitem__, rows), amounts):
+            if month:
+                monthly[month] = monthly.get(month, 0.0) + amount
+
+        recent_orders: List[OrderSummary] = []
+        for i in heapq.nlargest(RECENT_ORDERS_LIMIT, rows, key=self.sort_keys.__getitem__):
+            o = self.orders[i]
+            items = getattr(o, "items", None)
+            items_count = len(items) if isinstance(items, (list, tuple)) else getattr(o, "items_count", None)
+            recent_orders.append(OrderSummary(
+                id=str(getattr(o, "id", "")),
+                date=self.created[i],
+                amount=self.amounts[i],
+                items_count=items_count
+            ))
+
+        return {
+            "total_spending": sum(amounts),
+            "monthly_spent": {f"{m // 100:04d}-{m % 100:02d}": spent for m, spent in monthly.items()},
+            "recent_orders": recent_orders,
+        }
+
+    def totals_by_unit(self, start_dt: Optional[datetime], end_dt: Optional[datetime]) -> Dict[str, Dict[str, Any]]:
+        """Totais de cada unidade com pedidos no intervalo (pedidos sem unidade são ignorados)."""
+        rows_by_unit: Dict[str, List[int]] = {}
+        unit_ids = self.unit_ids
+        for i in self.select(start_dt, end_dt):
+            unit_id = unit_ids[i]
+            if unit_id is not None:
+                rows_by_unit.setdefault(unit_id, []).append(i)
+        return {unit_id: self.totals(rows) for unit_id, rows in rows_by_unit.items()}
+
+
+class StorageColumns:
+    """Estoque em colunas: unidade, item (nome, unidade de medida), origem e quantidades."""
+
+    def __init__(self, storage_items: List[Any]):
+        items = storage_items or []
+        self.unit_ids = read_column(items, "unit_id")
+        self.names = read_column(items, "name", "Desconhecido")
+        self.measure_units = [
+            a or b or None
+            for a, b in zip(read_column(items, "measure_unit"), read_column(items, "measureUnit"))
+        ]
+        self.donated = [
+            isinstance(origin, str) and origin.lower().startswith("doa")
+            for origin in read_column(items, "type", "")
+        ]
+        self.initial = array("d", [float(q or 0) for q in read_column(items, "initial_quantity", 0)])
+        used = array("d", [float(q or 0) for q in read_column(items, "used_quantity", 0)])
+        self.current = array("d", [max(0.0, i - u) for i, u in zip(self.initial, used)])
+
+    def groups_by(self, keys: Iterable[Tuple]) -> Dict[Tuple, Dict[str, Any]]:
+        """Soma comprado/doado (initial) e atual por chave, na ordem da primeira ocorrência."""
+        groups: Dict[Tuple, Dict[str, Any]] = {}
+        for key, name, measure_unit, donated, initial_q, current_q in zip(
+            keys, self.names, self.measure_units, self.donated, self.initial, self.current
+        ):
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = {
+                    "name": name,
+                    "measure_unit": measure_unit,
+                    "bought": 0.0,
+                    "donated": 0.0,
+                    "current": 0.0
+                }
+            if donated:
+                group["donated"] += initial_q
+            else:
+                group["bought"] += initial_q
+            group["current"] += current_q
+        return groups
+
+    def groups(self) -> List[Dict[str, Any]]:
+        """Estoque agrupado por (name, measure_unit)."""
+        return list(self.groups_by(zip(self.names, self.measure_units)).values())
+
+    def groups_by_unit(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Estoque agrupado por (unit_id, name, measure_unit), separado por unidade."""
+        by_unit: Dict[str, List[Dict[str, Any]]] = {}
+        for (unit_id, _, _), group in self.groups_by(zip(self.unit_ids, self.names, self.measure_units)).items():
+            by_unit.setdefault(unit_id, []).append(group)
+        return by_unit
+
+
+def summarize_storage(storage_items: List[Any]) -> List[Dict[str, Any]]:
+    """
+    Agrupa o estoque por (name, measure_unit), somando comprado/doado (initial) e atual.
+    Mesmo formato da view report_storage_summary.
+    """
+    return StorageColumns(storage_items).groups()
+
+
+def summarize_orders(
+    orders: List[Any],
+    start_dt: Optional[datetime],
+    end_dt: Optional[datetime],
+) -> Dict[str, Any]:
+    """
+    Totais dos pedidos no intervalo [start_dt, end_dt) (sem intervalo completo, todos):
+    gasto total, gasto por mês (YYYY-MM) e os 10 pedidos mais recentes.
+    Mesmo formato da RPC report_order_aggregates.
+    """
+    columns = OrderColumns(orders)
+    return columns.totals(columns.select(start_dt, end_dt))
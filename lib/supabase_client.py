@@ -1,9 +1,129 @@
+import asyncio
+import json
 import os
-from supabase import create_client, Client
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Optional
+from fastapi import HTTPException
 from dotenv import load_dotenv
+from lib.metrics import count_query, describe_query, record_query
+from lib.query_budget import check_query
 load_dotenv()
 
+if TYPE_CHECKING:
+    from supabase import Client
+
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+# Número máximo de requisições simultâneas ao PostgREST por worker.
+SUPABASE_MAX_WORKERS = int(os.getenv("SUPABASE_MAX_WORKERS", "16"))
+
+# "supabase" (padrão) ou "memory": PostgREST em memória (lib/fake_postgrest), para
+# testes de carga e benchmarks offline. Com "memory":
+#   FAKE_SUPABASE_LATENCY_MS / FAKE_SUPABASE_JITTER_MS - latência simulada por consulta
+#   FAKE_SUPABASE_SEED - arquivo JSON {"tabela": [linhas]} carregado na inicialização
+SUPABASE_BACKEND = os.getenv("SUPABASE_BACKEND", "supabase").lower()
+
+# Backend em memória em uso (None com o Supabase real)
+fake_backend = None
+
+if SUPABASE_BACKEND == "memory":
+    from lib.fake_postgrest import FakePostgREST
+
+    fake_backend = FakePostgREST(
+        latency_ms=float(os.getenv("FAKE_SUPABASE_LATENCY_MS", "0")),
+        jitter_ms=float(os.getenv("FAKE_SUPABASE_JITTER_MS", "0")),
+    )
+    if os.getenv("FAKE_SUPABASE_SEED"):
+        with open(os.getenv("FAKE_SUPABASE_SEED"), encoding="utf-8") as seed_file:
+            fake_backend.load(json.load(seed_file))
+    print(f"[INIT] Supabase em memória (latência {fake_backend.latency_ms:g} ms)")
+
+_client: Optional["Client"] = None
+_client_lock = threading.Lock()
+
+
+def get_supabase() -> "Client":
+    """
+    Cliente do Supabase, criado no primeiro uso.
+    Importar o pacote supabase e montar o cliente leva algumas centenas de ms: fora do
+    import, o cold start da função serverless (api/index.py) não paga esse custo em
+    rotas que não consultam o banco.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from supabase import create_client
+
+                if fake_backend is not None:
+                    import httpx
+                    from supabase.lib.client_options import SyncClientOptions
+
+                    _client = create_client(
+                        SUPABASE_URL or "http://memory.local",
+                        SUPABASE_KEY or "memory",
+                        options=SyncClientOptions(httpx_client=httpx.Client(transport=fake_backend)),
+                    )
+                else:
+                    _client = create_client(SUPABASE_URL, SUPABASE_KEY)
+    return _client
+
+
+class LazySupabaseClient:
+    """Repassa supabase.table(...)/supabase.rpc(...) ao cliente de get_supabase()."""
+
+    def __getattr__(self, name: str):
+        return getattr(get_supabase(), name)
+
+
+supabase: "Client" = LazySupabaseClient()
+
+# O cliente do Supabase é síncrono: cada .execute() bloqueia até a resposta HTTP.
+# As queries são executadas neste pool limitado para não travar o event loop.
+_executor = ThreadPoolExecutor(
+    max_workers=SUPABASE_MAX_WORKERS,
+    thread_name_prefix="supabase",
+)
+
+
+async def execute(query):
+    """
+    Executa uma query do Supabase (ex.: supabase.table(...).select(...))
+    em uma thread do pool, sem bloquear o event loop.
+    Retorna a mesma resposta de query.execute().
+    Cada chamada é registrada nas métricas (lib/metrics) por tabela e operação
+    e conferida pelo orçamento de consultas (lib/query_budget), se ativado.
+    """
+    loop = asyncio.get_running_loop()
+    table, operation = describe_query(query)
+    count_query(table, operation)
+    check_query(table, operation, query)
+    started = time.perf_counter()
+    try:
+        response = await loop.run_in_executor(_executor, query.execute)
+    except Exception:
+        record_query(table, operation, time.perf_counter() - started, 0, failed=True)
+        raise
+    data = getattr(response, "data", None)
+    rows = len(data) if isinstance(data, list) else int(data is not None)
+    record_query(table, operation, time.perf_counter() - started, rows)
+    return response
+
+
+def raise_rpc_error(error: Exception, detail: str):
+    """
+    Converte o erro de uma função RPC em HTTPException.
+    Funções SQL sinalizam erros de negócio com SQLSTATE 'PTxxx' (xxx = status HTTP);
+    qualquer outro erro vira 500 com a mensagem `detail`.
+    """
+    from postgrest.exceptions import APIError
+
+    if isinstance(error, HTTPException):
+        raise error
+    code = getattr(error, "code", None) if isinstance(error, APIError) else None
+    if code and code.startswith("PT") and code[2:].isdigit():
+        raise HTTPException(status_code=int(code[2:]), detail=error.message)
+    raise HTTPException(status_code=500, detail=f"{detail}: {str(error)}")
@@ -0,0 +1,66 @@
+import os
+from typing import TYPE_CHECKING, Dict, Optional
+
+if TYPE_CHECKING:
+    from jinja2 import Environment, Template
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates")
+
+# Diretório opcional para o cache de bytecode do Jinja (compartilhado entre workers/reinícios).
+TEMPLATE_BYTECODE_CACHE_DIR = os.getenv("TEMPLATE_BYTECODE_CACHE_DIR")
+
+
+def _build_environment() -> "Environment":
+    from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+    bytecode_cache = None
+    if TEMPLATE_BYTECODE_CACHE_DIR:
+        os.makedirs(TEMPLATE_BYTECODE_CACHE_DIR, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(TEMPLATE_BYTECODE_CACHE_DIR)
+    return Environment(
+        loader=FileSystemLoader(TEMPLATES_DIR),
+        bytecode_cache=bytecode_cache,
+        # templates só mudam em deploy: não verifica o mtime do arquivo a cada render
+        auto_reload=False,
+        cache_size=-1,
+    )
+
+
+_env: Optional["Environment"] = None
+
+
+def get_environment() -> "Environment":
+    """Ambiente do Jinja, criado no primeiro uso (o jinja2 só é importado quando há e-mail a renderizar)."""
+    global _env
+    if _env is None:
+        _env = _build_environment()
+    return _env
+
+
+# Templates já compilados, por nome. O Jinja compila as partes estáticas do HTML
+# como constantes no código gerado, então cada render só executa as interpolações.
+_registry: Dict[str, "Template"] = {}
+
+
+def load_templates() -> int:
+    """
+    Compila todos os templates do diretório de templates.
+    Retorna a quantidade de templates carregados.
+    """
+    env = get_environment()
+    for name in env.list_templates(extensions=["html"]):
+        _registry[name] = env.get_template(name)
+    return len(_registry)
+
+
+def get_template(name: str) -> "Template":
+    """Retorna o template compilado; compila na primeira vez se ainda não estiver carregado."""
+    template = _registry.get(name)
+    if template is None:
+        template = _registry[name] = get_environment().get_template(name)
+    return template
+
+
+def render_template(name: str, context: dict) -> str:
+    """Renderiza um template compilado com o contexto informado."""
+    return get_template(name).render(context)
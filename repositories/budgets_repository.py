@@ -1,6 +1,7 @@
 from typing import List, Optional
 from fastapi import HTTPException
-from lib.supabase_client import supabase
+from lib.supabase_client import supabase, execute
+from lib.pagination import apply_keyset
 from entities.models.budgets import Budget
 
 
@@ -14,10 +15,9 @@ class BudgetRepository:
         Retorna o registro criado.
         """
         try:
-            response = (
+            response = await execute(
                 supabase.table(BudgetRepository.TABLE_NAME)
                 .insert(data)
-                .execute()
             )
             if not response.data:
                 raise HTTPException(
@@ -39,12 +39,11 @@ class BudgetRepository:
         Busca um orçamento pelo ID.
         Retorna o registro encontrado.
         """
-        response = (
+        response = await execute(
             supabase.table(BudgetRepository.TABLE_NAME)
             .select("*")
             .eq("id", budget_id)
             .limit(1)
-            .execute()
         )
         if not response.data:
             raise HTTPException(status_code=404, detail="Orçamento não encontrado")
@@ -54,9 +53,12 @@ class BudgetRepository:
     async def list_budgets(
         initial_date: Optional[str] = None,
         final_date: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
     ) -> List[Budget]:
         """
         Lista todos os orçamentos, com filtros opcionais por período.
+        Com `limit`, retorna uma página (created_at DESC, id DESC) a partir de `cursor`.
         Retorna lista de Budget.
         """
         query = supabase.table(BudgetRepository.TABLE_NAME).select("*")
@@ -66,7 +68,8 @@ class BudgetRepository:
         if final_date:
             query = query.lte("final_date", final_date)
 
-        response = query.execute()
+        query = apply_keyset(query, limit, cursor)
+        response = await execute(query)
 
         if not response.data:
             return []
@@ -79,11 +82,10 @@ class BudgetRepository:
         Retorna o registro atualizado.
         """
         try:
-            response = (
+            response = await execute(
                 supabase.table(BudgetRepository.TABLE_NAME)
                 .update(data)
                 .eq("id", budget_id)
-                .execute()
             )
             if not response.data:
                 raise HTTPException(status_code=404, detail="Orçamento não encontrado")
@@ -97,18 +99,18 @@ class BudgetRepository:
             )
 
     @staticmethod
-    async def delete_budget(budget_id: str) -> None:
+    async def delete_budget(budget_id: str) -> Budget:
         """
         Deleta um orçamento.
         Antes, valida se existem pedidos usando este orçamento.
+        Retorna o registro deletado.
         """
         # Verifica se existe algum pedido referenciando este orçamento
-        orders_response = (
+        orders_response = await execute(
             supabase.table("orders")
             .select("id")
             .eq("budget_id", budget_id)
             .limit(1)
-            .execute()
         )
 
         if orders_response.data:
@@ -118,13 +120,12 @@ class BudgetRepository:
             )
 
         # Se não houver pedidos, tenta deletar
-        response = (
+        response = await execute(
             supabase.table(BudgetRepository.TABLE_NAME)
             .delete()
             .eq("id", budget_id)
-            .execute()
         )
 
         if not response.data:
             raise HTTPException(status_code=404, detail="Orçamento não encontrado")
-        return None
\ No newline at end of file
+        return Budget(**response.data[0])
\ No newline at end of file
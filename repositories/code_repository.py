@@ -1,7 +1,7 @@
 from typing import Optional, Dict, Any
 
 from fastapi import HTTPException
-from lib.supabase_client import supabase  
+from lib.supabase_client import supabase, execute
 from entities.models.security_code import SecurityCode
 
 class CodeRepository:
@@ -19,7 +19,7 @@ class CodeRepository:
         Retorna o registro criado como dict.
         """
 
-        response = (
+        response = await execute(
             supabase.table(CodeRepository.TABLE_NAME)
             .insert(
                 {
@@ -29,7 +29,6 @@ class CodeRepository:
                     "revoked": False
                 }
             )
-            .execute()
         )
 
         if not response.data:
@@ -43,12 +42,11 @@ class CodeRepository:
         Busca um código de segurança pelo campo especificado.
         Retorna dict ou None.
         """
-        response = (
+        response = await execute(
             supabase.table(CodeRepository.TABLE_NAME)
             .select("*")
             .eq(key, value)
             .limit(1)
-            .execute()
         )
 
         if not response.data:
@@ -61,11 +59,10 @@ class CodeRepository:
         """
         Marca um código de segurança como revogado.
         """
-        response = (
+        response = await execute(
             supabase.table(CodeRepository.TABLE_NAME)
             .update({"revoked": True})
             .eq("id", code_id)
-            .execute()
         )
 
         if not response.data:
@@ -77,11 +74,10 @@ class CodeRepository:
         """
         Revoga todos os códigos de um determinado tipo para um usuário.
         """
-        response = (
+        response = await execute(
             supabase.table(CodeRepository.TABLE_NAME)
             .update({"revoked": True})
             .eq("user_id", user_id)
             .eq("type", code_type)
-            .execute()
         )
     
\ No newline at end of file
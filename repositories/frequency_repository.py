@@ -1,6 +1,7 @@
 from typing import List, Optional
 from fastapi import HTTPException
-from lib.supabase_client import supabase
+from lib.supabase_client import supabase, execute
+from lib.pagination import apply_keyset
 from entities.models.frequency import Frequency
 from datetime import date, datetime
 
@@ -12,9 +13,12 @@ class FrequencyRepository:
         initial_date: Optional[str] = None,
         final_date: Optional[str] = None,
         unit_id: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
     ) -> List[Frequency]:
         """
         Lista todas as frequências, com filtros opcionais por período e unidade.
+        Com `limit`, retorna uma página (date DESC, id DESC) a partir de `cursor`.
         Retorna lista de Frequency.
         """
         query = supabase.table(FrequencyRepository.TABLE_NAME).select("*")
@@ -26,7 +30,8 @@ class FrequencyRepository:
         if unit_id:
             query = query.eq("unit_id", unit_id)
 
-        response = query.execute()
+        query = apply_keyset(query, limit, cursor, column="date")
+        response = await execute(query)
 
         if not response.data:
             return []
@@ -60,12 +65,11 @@ class FrequencyRepository:
         Busca uma frequência pelo ID.
         Retorna o registro encontrado.
         """
-        response = (
+        response = await execute(
             supabase.table(FrequencyRepository.TABLE_NAME)
             .select("*")
             .eq("id", frequency_id)
             .limit(1)
-            .execute()
         )
         if not response.data:
             raise HTTPException(status_code=404, detail="Frequência não encontrada")
@@ -103,12 +107,11 @@ class FrequencyRepository:
         freq_date = data.get("date")
         
         if unit_id and freq_date:
-            existing = (
+            existing = await execute(
                 supabase.table(FrequencyRepository.TABLE_NAME)
                 .select("*")
                 .eq("unit_id", unit_id)
                 .eq("date", freq_date)
-                .execute()
             )
             if existing.data:
                 raise HTTPException(
@@ -116,10 +119,9 @@ class FrequencyRepository:
                     detail=f"Já existe uma frequência registrada para esta unidade no dia {freq_date}"
                 )
         
-        response = (
+        response = await execute(
             supabase.table(FrequencyRepository.TABLE_NAME)
             .insert(data)
-            .execute()
         )
 
         if not response.data:
@@ -152,11 +154,10 @@ class FrequencyRepository:
         Atualiza uma frequência existente.
         Retorna o registro atualizado.
         """
-        response = (
+        response = await execute(
             supabase.table(FrequencyRepository.TABLE_NAME)
             .update(data)
             .eq("id", frequency_id)
-            .execute()
         )
 
         if not response.data:
@@ -184,16 +185,18 @@ class FrequencyRepository:
         )
     
     @staticmethod
-    async def delete_frequency(frequency_id: str) -> None:
+    async def delete_frequency(frequency_id: str) -> Optional[dict]:
         """
         Deleta uma frequência pelo ID.
+        Retorna o registro deletado (dict).
         """
-        response = (
+        response = await execute(
             supabase.table(FrequencyRepository.TABLE_NAME)
             .delete()
             .eq("id", frequency_id)
-            .execute()
         )
 
         if not response.data:
-            raise HTTPException(status_code=500, detail="Erro ao deletar frequência")
\ No newline at end of file
+            raise HTTPException(status_code=500, detail="Erro ao deletar frequência")
+
+        return response.data[0]
\ No newline at end of file
@@ -1,6 +1,8 @@
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from fastapi import HTTPException
-from lib.supabase_client import supabase
+from lib.supabase_client import supabase, execute
+from lib.pagination import apply_keyset
+from lib.joins import select_in
 from entities.models.orders import Order
 from entities.models.order_item import OrderItem
 
@@ -8,27 +10,29 @@ class OrderRepository:
     TABLE_NAME = "orders"
 
     @staticmethod
-    async def create_order(data: dict) -> Order:
+    async def create_order_with_items(data: dict, items: List[dict]) -> Tuple[Order, List[OrderItem]]:
         """
-        Cria um novo pedido.
-        Retorna o registro criado.
+        Cria um pedido e todos os seus itens em uma única transação (RPC create_order_with_items).
+        Retorna (pedido criado, itens criados).
         """
         try:
-            response = (
-                supabase.table(OrderRepository.TABLE_NAME)
-                .insert(data)
-                .execute()
+            response = await execute(
+                supabase.rpc(
+                    "create_order_with_items",
+                    {"p_order": data, "p_items": items},
+                )
             )
             if not response.data:
                 raise HTTPException(status_code=500, detail="Erro ao criar pedido no Supabase")
-            return Order(**response.data[0])
+            order = Order(**response.data["order"])
+            return order, [OrderItem(**item) for item in response.data.get("items") or []]
         except Exception as e:
             error_str = str(e)
             error_lower = error_str.lower()
-            
+
             # Verifica erros de foreign key constraint
-            if ("foreign key constraint" in error_lower or 
-                "23503" in error_str or 
+            if ("foreign key constraint" in error_lower or
+                "23503" in error_str or
                 "violates foreign key constraint" in error_lower):
                 if "unit_id" in error_lower or "units" in error_lower:
                     raise HTTPException(
@@ -40,7 +44,7 @@ class OrderRepository:
                         status_code=404,
                         detail=f"Orçamento com ID '{data.get('budget_id')}' não encontrado."
                     )
-            
+
             if isinstance(e, HTTPException):
                 raise
             raise HTTPException(status_code=500, detail=f"Erro ao criar pedido: {str(e)}")
@@ -51,12 +55,11 @@ class OrderRepository:
         Busca um pedido pelo ID.
         Retorna o registro encontrado.
         """
-        response = (
+        response = await execute(
             supabase.table(OrderRepository.TABLE_NAME)
             .select("*")
             .eq("id", order_id)
             .limit(1)
-            .execute()
         )
         if not response.data:
             raise HTTPException(status_code=404, detail="Pedido não encontrado")
@@ -65,10 +68,13 @@ class OrderRepository:
     @staticmethod
     async def list_orders(
         unit_id: Optional[str] = None,
-        budget_id: Optional[str] = None
+        budget_id: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
     ) -> List[Order]:
         """
         Lista todos os pedidos, com filtros opcionais.
+        Com `limit`, retorna uma página (created_at DESC, id DESC) a partir de `cursor`.
         Retorna lista de pedidos.
         """
         query = supabase.table(OrderRepository.TABLE_NAME).select("*")
@@ -77,8 +83,9 @@ class OrderRepository:
             query = query.eq("unit_id", unit_id)
         if budget_id:
             query = query.eq("budget_id", budget_id)
-        
-        response = query.execute()
+
+        query = apply_keyset(query, limit, cursor)
+        response = await execute(query)
         
         if not response.data:
             return []
@@ -91,11 +98,10 @@ class OrderRepository:
         Retorna o registro atualizado.
         """
         try:
-            response = (
+            response = await execute(
                 supabase.table(OrderRepository.TABLE_NAME)
                 .update(data)
                 .eq("id", order_id)
-                .execute()
             )
             if not response.data:
                 raise HTTPException(status_code=404, detail="Pedido não encontrado")
@@ -124,19 +130,19 @@ class OrderRepository:
             raise HTTPException(status_code=500, detail=f"Erro ao atualizar pedido: {str(e)}")
 
     @staticmethod
-    async def delete_order(order_id: str) -> None:
+    async def delete_order(order_id: str) -> Order:
         """
         Deleta um pedido.
+        Retorna o registro deletado.
         """
-        response = (
+        response = await execute(
             supabase.table(OrderRepository.TABLE_NAME)
             .delete()
             .eq("id", order_id)
-            .execute()
         )
         if not response.data:
             raise HTTPException(status_code=404, detail="Pedido não encontrado")
-        return None
+        return Order(**response.data[0])
 
     @staticmethod
     async def get_orders_by_unit_id(unit_id: str) -> List[Order]:
@@ -157,50 +163,17 @@ class OrderRepository:
 class OrderItemRepository:
     TABLE_NAME = "order_items"
 
-    @staticmethod
-    async def create_order_item(data: dict) -> OrderItem:
-        """
-        Cria um novo item de pedido.
-        Retorna o registro criado.
-        """
-        try:
-            response = (
-                supabase.table(OrderItemRepository.TABLE_NAME)
-                .insert(data)
-                .execute()
-            )
-            if not response.data:
-                raise HTTPException(status_code=500, detail="Erro ao criar item de pedido no Supabase")
-            return OrderItem(**response.data[0])
-        except Exception as e:
-            error_str = str(e)
-            error_lower = error_str.lower()
-            
-            # Verifica erros de foreign key constraint
-            if ("foreign key constraint" in error_lower or 
-                "23503" in error_str or 
-                "violates foreign key constraint" in error_lower):
-                if "order_id" in error_lower or "orders" in error_lower:
-                    raise HTTPException(
-                        status_code=404,
-                        detail=f"Pedido com ID '{data.get('order_id')}' não encontrado."
-                    )
-            if isinstance(e, HTTPException):
-                raise
-            raise HTTPException(status_code=500, detail=f"Erro ao criar item de pedido: {str(e)}")
-
     @staticmethod
     async def get_order_item_by_id(order_item_id: str) -> Optional[OrderItem]:
         """
         Busca um item de pedido pelo ID.
         Retorna OrderItem ou None se não encontrado.
         """
-        response = (
+        response = await execute(
             supabase.table(OrderItemRepository.TABLE_NAME)
             .select("*")
             .eq("id", order_item_id)
             .limit(1)
-            .execute()
         )
         if not response.data:
             return None
@@ -212,16 +185,42 @@ class OrderItemRepository:
         Busca todos os itens de um pedido.
         Retorna lista de OrderItem.
         """
-        response = (
+        response = await execute(
             supabase.table(OrderItemRepository.TABLE_NAME)
             .select("*")
             .eq("order_id", order_id)
-            .execute()
         )
         if not response.data:
             return []
         return [OrderItem(**item) for item in response.data]
 
+    @staticmethod
+    async def get_order_items_by_order_ids(order_ids: List[str]) -> Dict[str, List[OrderItem]]:
+        """
+        Busca os itens de vários pedidos de uma vez (filtro in_ em lotes).
+        Retorna dict order_id -> lista de OrderItem; pedidos sem itens não aparecem.
+        """
+        rows = await select_in(OrderItemRepository.TABLE_NAME, "order_id", order_ids)
+
+        items_by_order: Dict[str, List[OrderItem]] = {}
+        for item in rows:
+            order_item = OrderItem(**item)
+            items_by_order.setdefault(order_item.order_id, []).append(order_item)
+        return items_by_order
+
+    @staticmethod
+    async def count_items_by_order_ids(order_ids: List[str]) -> Dict[str, int]:
+        """
+        Conta os itens de vários pedidos de uma vez, buscando apenas a coluna order_id.
+        Retorna dict order_id -> quantidade de itens; pedidos sem itens não aparecem.
+        """
+        rows = await select_in(OrderItemRepository.TABLE_NAME, "order_id", order_ids, columns="order_id")
+
+        counts: Dict[str, int] = {}
+        for row in rows:
+            counts[row["order_id"]] = counts.get(row["order_id"], 0) + 1
+        return counts
+
     @staticmethod
     async def update_order_item(order_item_id: str, data: dict) -> OrderItem:
         """
@@ -229,11 +228,10 @@ class OrderItemRepository:
         Retorna o registro atualizado.
         """
         try:
-            response = (
+            response = await execute(
                 supabase.table(OrderItemRepository.TABLE_NAME)
                 .update(data)
                 .eq("id", order_item_id)
-                .execute()
             )
             if not response.data:
                 raise HTTPException(status_code=404, detail="Item de pedido não encontrado")
@@ -260,11 +258,10 @@ class OrderItemRepository:
         """
         Deleta um item de pedido.
         """
-        response = (
+        response = await execute(
             supabase.table(OrderItemRepository.TABLE_NAME)
             .delete()
             .eq("id", order_item_id)
-            .execute()
         )
         if not response.data:
             raise HTTPException(status_code=404, detail="Item de pedido não encontrado")
@@ -275,11 +272,10 @@ class OrderItemRepository:
         """
         Deleta todos os itens de um pedido.
         """
-        response = (
+        response = await execute(
             supabase.table(OrderItemRepository.TABLE_NAME)
             .delete()
             .eq("order_id", order_id)
-            .execute()
         )
         return None
         
@@ -0,0 +1,79 @@
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+from fastapi import HTTPException
+from lib.supabase_client import supabase, execute
+from entities.dtos.report_dto import OrderSummary
+
+
+class ReportAggregateRepository:
+    """
+    Agregações dos relatórios calculadas no banco (view report_storage_summary e
+    RPC report_order_aggregates), para não transferir o histórico completo da unidade.
+    """
+
+    STORAGE_VIEW = "report_storage_summary"
+
+    @staticmethod
+    async def list_storage_summary(unit_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Estoque agrupado por (unit_id, name), com bought/donated/current.
+        Sem unit_id, retorna o resumo de todas as unidades.
+        """
+        query = supabase.table(ReportAggregateRepository.STORAGE_VIEW).select("*")
+        if unit_id:
+            query = query.eq("unit_id", unit_id)
+        response = await execute(query)
+
+        return [
+            {
+                "unit_id": str(row["unit_id"]),
+                "name": row.get("name") or "Desconhecido",
+                "measure_unit": None,
+                "bought": float(row.get("bought") or 0),
+                "donated": float(row.get("donated") or 0),
+                "current": float(row.get("current") or 0),
+            }
+            for row in response.data or []
+        ]
+
+    @staticmethod
+    async def get_order_aggregates(
+        unit_id: Optional[str] = None,
+        start_dt: Optional[datetime] = None,
+        end_dt: Optional[datetime] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Pedidos agregados por unidade no intervalo [start_dt, end_dt).
+        Retorna dict unit_id -> {"total_spending", "monthly_spent" (YYYY-MM -> gasto), "recent_orders"}.
+        Unidades sem pedidos no intervalo não aparecem.
+        """
+        try:
+            response = await execute(
+                supabase.rpc(
+                    "report_order_aggregates",
+                    {
+                        "p_unit_id": unit_id,
+                        "p_start": start_dt.isoformat() if start_dt and end_dt else None,
+                        "p_end": end_dt.isoformat() if start_dt and end_dt else None,
+                    },
+                )
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Erro ao agregar pedidos do relatório: {str(e)}")
+
+        aggregates: Dict[str, Dict[str, Any]] = {}
+        for row in response.data or []:
+            aggregates[str(row["unit_id"])] = {
+                "total_spending": float(row.get("total_spending") or 0),
+                "monthly_spent": {k: float(v or 0) for k, v in (row.get("monthly_spent") or {}).items()},
+                "recent_orders": [
+                    OrderSummary(
+                        id=str(o["id"]),
+                        date=o.get("date"),
+                        amount=float(o.get("amount") or 0),
+                        items_count=o.get("items_count"),
+                    )
+                    for o in row.get("recent_orders") or []
+                ],
+            }
+        return aggregates
@@ -0,0 +1,146 @@
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime, timezone
+from lib.supabase_client import supabase, execute
+from entities.dtos.budgets_dto import BudgetResponseDTO
+from entities.dtos.frequency_dto import FrequencyResponseDTO
+from entities.dtos.report_dto import OrderSummary
+
+
+class ReportSnapshotRepository:
+    """
+    Snapshots dos dados mensais dos relatórios por (unit_id, month): orçamentos,
+    frequências e totais de pedidos do período (ver ReportsService.fetch_month_sources).
+    O snapshot é um cache: falhas de leitura/escrita nunca impedem a geração do relatório.
+    """
+
+    TABLE_NAME = "report_snapshots"
+
+    @staticmethod
+    def dump_sources(sources: Dict[str, Any]) -> Dict[str, Any]:
+        order_totals = sources["order_totals"]
+        return {
+            "budgets": [b.model_dump(mode="json") for b in sources["budgets"] or []],
+            "frequencies": [f.model_dump(mode="json") for f in sources["frequencies"] or []],
+            "order_totals": {
+                "total_spending": order_totals["total_spending"],
+                "monthly_spent": order_totals["monthly_spent"],
+                "recent_orders": [o.model_dump(mode="json") for o in order_totals["recent_orders"]],
+            },
+        }
+
+    @staticmethod
+    def load_sources(payload: Dict[str, Any]) -> Dict[str, Any]:
+        order_totals = payload["order_totals"]
+        return {
+            "budgets": [BudgetResponseDTO.model_validate(b) for b in payload["budgets"]],
+            "frequencies": [FrequencyResponseDTO.model_validate(f) for f in payload["frequencies"]],
+            "order_totals": {
+                "total_spending": float(order_totals["total_spending"]),
+                "monthly_spent": {k: float(v) for k, v in order_totals["monthly_spent"].items()},
+                "recent_orders": [OrderSummary.model_validate(o) for o in order_totals["recent_orders"]],
+            },
+        }
+
+    @staticmethod
+    async def get_snapshot(unit_id: str, month: str) -> Tuple[Optional[Dict[str, Any]], Optional[int]]:
+        """
+        Busca o snapshot da unidade no mês (YYYY-MM).
+        Retorna (dados do mês ou None se invalidado, version ou None se não houver linha).
+        """
+        try:
+            response = await execute(
+                supabase.table(ReportSnapshotRepository.TABLE_NAME)
+                .select("payload,version")
+                .eq("unit_id", unit_id)
+                .eq("month", month)
+                .limit(1)
+            )
+            if not response.data:
+                return None, None
+            row = response.data[0]
+            payload = row.get("payload")
+            sources = ReportSnapshotRepository.load_sources(payload) if payload else None
+            return sources, int(row.get("version") or 0)
+        except Exception as e:
+            print(f"[REPORT] Falha ao ler snapshot {unit_id}/{month}: {e}")
+            return None, None
+
+    @staticmethod
+    async def claim(unit_id: str, month: str) -> Optional[int]:
+        """
+        Cria a linha do snapshot (sem payload) antes de gerar os dados, para que uma
+        invalidação durante a geração incremente a version e impeça a gravação.
+        Retorna a version inicial, ou None se a linha já existia (outra geração em
+        andamento): nesse caso o relatório não é gravado.
+        """
+        try:
+            response = await execute(
+                supabase.table(ReportSnapshotRepository.TABLE_NAME)
+                .upsert(
+                    {"unit_id": unit_id, "month": month, "payload": None, "version": 0},
+                    on_conflict="unit_id,month",
+                    ignore_duplicates=True,
+                )
+            )
+            return 0 if response.data else None
+        except Exception as e:
+            print(f"[REPORT] Falha ao reservar snapshot {unit_id}/{month}: {e}")
+            return None
+
+    @staticmethod
+    async def save_snapshot(
+        unit_id: str,
+        month: str,
+        version: int,
+        sources: Dict[str, Any],
+        range_start: Optional[datetime],
+        range_end: Optional[datetime],
+    ) -> bool:
+        """
+        Grava os dados do mês se o snapshot não foi invalidado desde a leitura de `version`.
+        Retorna True se gravou.
+        """
+        try:
+            response = await execute(
+                supabase.table(ReportSnapshotRepository.TABLE_NAME)
+                .update({
+                    "payload": ReportSnapshotRepository.dump_sources(sources),
+                    "range_start": range_start.isoformat() if range_start and range_end else None,
+                    "range_end": range_end.isoformat() if range_start and range_end else None,
+                    "updated_at": datetime.now(timezone.utc).isoformat(),
+                })
+                .eq("unit_id", unit_id)
+                .eq("month", month)
+                .eq("version", version)
+            )
+            return bool(response.data)
+        except Exception as e:
+            print(f"[REPORT] Falha ao gravar snapshot {unit_id}/{month}: {e}")
+            return False
+
+    @staticmethod
+    async def invalidate(
+        unit_id: Optional[str] = None,
+        months: Optional[List[str]] = None,
+        at: Optional[datetime] = None,
+    ) -> None:
+        """
+        Invalida snapshots para que sejam recalculados na próxima leitura
+        (RPC invalidate_report_snapshots). Filtros opcionais:
+        - unit_id: apenas a unidade
+        - months: apenas esses meses (YYYY-MM)
+        - at: apenas snapshots cujo intervalo de pedidos contém o instante
+        """
+        try:
+            await execute(
+                supabase.rpc(
+                    "invalidate_report_snapshots",
+                    {
+                        "p_unit_id": unit_id,
+                        "p_months": months,
+                        "p_at": at.isoformat() if at else None,
+                    },
+                )
+            )
+        except Exception as e:
+            print(f"[REPORT] Falha ao invalidar snapshots unit={unit_id} months={months} at={at}: {e}")
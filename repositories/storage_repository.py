@@ -1,6 +1,7 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from fastapi import HTTPException
-from lib.supabase_client import supabase
+from lib.supabase_client import supabase, execute, raise_rpc_error
+from lib.pagination import apply_keyset
 from entities.models.storage import Storage
 from datetime import datetime, timezone
 
@@ -9,17 +10,35 @@ class StorageRepository:
     TABLE_NAME = "storage"
 
     @staticmethod
-    async def get_storage_by_unit(unit_id: str) -> List[Storage]:
+    async def get_storage_by_unit(
+        unit_id: str,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> List[Storage]:
         """
         Busca todos os itens de estoque de uma unidade.
+        Com `limit`, retorna uma página (created_at DESC, id DESC) a partir de `cursor`.
         Retorna lista de Storage.
         """
-        response = (
+        query = (
             supabase.table(StorageRepository.TABLE_NAME)
             .select("*")
             .eq("unit_id", unit_id)
-            .execute()
         )
+        response = await execute(apply_keyset(query, limit, cursor))
+
+        if not response.data:
+            return []
+
+        return [Storage(**item) for item in response.data]
+
+    @staticmethod
+    async def list_all_storage() -> List[Storage]:
+        """
+        Busca os itens de estoque de todas as unidades (relatório consolidado).
+        Retorna lista de Storage.
+        """
+        response = await execute(supabase.table(StorageRepository.TABLE_NAME).select("*"))
 
         if not response.data:
             return []
@@ -32,13 +51,12 @@ class StorageRepository:
         Busca um item específico por unidade e nome.
         Retorna Storage ou None.
         """
-        response = (
+        response = await execute(
             supabase.table(StorageRepository.TABLE_NAME)
             .select("*")
             .eq("unit_id", unit_id)
             .eq("name", name)
             .limit(1)
-            .execute()
         )
 
         if not response.data:
@@ -59,7 +77,7 @@ class StorageRepository:
         Retorna o registro criado.
         """
         try:
-            response = (
+            response = await execute(
                 supabase.table(StorageRepository.TABLE_NAME)
                 .insert(
                     {
@@ -71,7 +89,6 @@ class StorageRepository:
                         "used_quantity": 0,
                     }
                 )
-                .execute()
             )
 
             if not response.data:
@@ -100,40 +117,34 @@ class StorageRepository:
             raise HTTPException(status_code=500, detail=f"Erro ao criar item no estoque: {str(e)}")
 
     @staticmethod
-    async def increment_initial_quantity(storage_id: str, increment: int, new_amount: float = None, new_type: str = None) -> Storage:
+    async def upsert_storage_items(unit_id: str, items: List[Dict[str, Any]]) -> List[Storage]:
         """
-        Incrementa a initial_quantity de um item existente.
-        Se new_amount/new_type forem passados atualiza esses campos também.
-        Retorna o item atualizado.
+        Cria ou incrementa itens do estoque em um único comando (RPC upsert_storage_entries),
+        usando a chave única (unit_id, name).
+        Cada item: {"name", "amount", "type", "initial_quantity"}.
+        Itens existentes têm só initial_quantity incrementada (amount/type são mantidos);
+        incremento <= 0 em item existente gera 400.
+        Retorna os itens criados/atualizados.
         """
-        if increment <= 0:
-            raise HTTPException(status_code=400, detail="increment deve ser maior que 0")
-
-        # pega os valores atuais
-        resp = supabase.table(StorageRepository.TABLE_NAME).select("*").eq("id", storage_id).limit(1).execute()
-        if not resp.data:
-            raise HTTPException(status_code=404, detail="Item não encontrado")
-
-        current = resp.data[0]
-        new_initial = (current.get("initial_quantity") or 0) + increment
-
-        update_payload = {"initial_quantity": new_initial, "updated_at": datetime.now(timezone.utc).isoformat()}
-        if new_amount is not None:
-            update_payload["amount"] = new_amount
-        if new_type is not None:
-            update_payload["type"] = new_type
-
-        response = (
-            supabase.table(StorageRepository.TABLE_NAME)
-            .update(update_payload)
-            .eq("id", storage_id)
-            .execute()
-        )
+        if not items:
+            return []
 
-        if not response.data:
-            raise HTTPException(status_code=500, detail="Erro ao incrementar quantidade no estoque")
+        try:
+            response = await execute(
+                supabase.rpc(
+                    "upsert_storage_entries",
+                    {"p_unit_id": unit_id, "p_items": items},
+                )
+            )
+        except Exception as e:
+            if getattr(e, "code", None) == "23503":
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Unidade com ID '{unit_id}' não encontrada. Verifique se o unit_id está correto e existe na tabela 'units'.",
+                )
+            raise_rpc_error(e, "Erro ao registrar entrada no estoque")
 
-        return Storage(**response.data[0])
+        return [Storage(**item) for item in response.data or []]
 
     @staticmethod
     async def update_storage_used_quantity(storage_id: str, new_used_quantity: int) -> Storage:
@@ -142,7 +153,7 @@ class StorageRepository:
         Retorna o registro atualizado.
         """
         # busca initial_quantity e used_quantity atuais
-        resp = supabase.table(StorageRepository.TABLE_NAME).select("initial_quantity", "used_quantity").eq("id", storage_id).limit(1).execute()
+        resp = await execute(supabase.table(StorageRepository.TABLE_NAME).select("initial_quantity", "used_quantity").eq("id", storage_id).limit(1))
         if not resp.data:
             raise HTTPException(status_code=404, detail="Item não encontrado")
 
@@ -159,14 +170,42 @@ class StorageRepository:
             )
 
         now = datetime.now(timezone.utc)
-        response = (
+        response = await execute(
             supabase.table(StorageRepository.TABLE_NAME)
             .update({"used_quantity": new_used_quantity, "updated_at": now.isoformat()})
             .eq("id", storage_id)
-            .execute()
         )
 
         if not response.data:
             raise HTTPException(status_code=500, detail="Erro ao atualizar quantidade no estoque")
 
         return Storage(**response.data[0])
+
+    @staticmethod
+    async def register_exit(unit_id: str, quantities: Dict[str, int]) -> List[Storage]:
+        """
+        Incrementa used_quantity de vários itens (name -> quantidade) em uma única
+        chamada atômica (RPC register_storage_exit).
+        Se algum item não existir (404) ou não tiver saldo (400), nada é alterado.
+        Retorna os itens atualizados.
+        """
+        if not quantities:
+            return []
+
+        try:
+            response = await execute(
+                supabase.rpc(
+                    "register_storage_exit",
+                    {
+                        "p_unit_id": unit_id,
+                        "p_items": [
+                            {"name": name, "used_quantity": quantity}
+                            for name, quantity in quantities.items()
+                        ],
+                    },
+                )
+            )
+        except Exception as e:
+            raise_rpc_error(e, "Erro ao registrar saída de estoque")
+
+        return [Storage(**item) for item in response.data or []]
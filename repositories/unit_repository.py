@@ -1,40 +1,77 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from fastapi import HTTPException
-from lib.supabase_client import supabase
+from lib.supabase_client import supabase, execute
+from lib.pagination import apply_keyset
+from lib.cache import TTLCache
+from lib.joins import select_in
 from entities.models.unit import Unit
 
 class UnitRepository:
     TABLE_NAME = "units"
+    # cache de get_unit_by_id (unit_id -> Unit)
+    cache = TTLCache("units")
 
     @staticmethod
-    async def list_units(unit_type: Optional[str] = None) -> List[Unit]:
+    async def list_units(
+        unit_type: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> List[Unit]:
         query = supabase.table(UnitRepository.TABLE_NAME).select("*")
         if unit_type:
             query = query.eq("type", unit_type)
-        response = query.execute()
+        query = apply_keyset(query, limit, cursor)
+        response = await execute(query)
         if not response.data:
             return []
         return [Unit(**item) for item in response.data]
 
     @staticmethod
     async def get_unit_by_id(unit_id: str) -> Optional[Unit]:
-        response = (
+        cached = UnitRepository.cache.get(unit_id)
+        if cached is not None:
+            return cached.model_copy()
+
+        token = UnitRepository.cache.token()
+        response = await execute(
             supabase.table(UnitRepository.TABLE_NAME)
             .select("*")
             .eq("id", unit_id)
             .limit(1)
-            .execute()
         )
         if not response.data:
             return None
-        return Unit(**response.data[0])
+        unit = Unit(**response.data[0])
+        UnitRepository.cache.set(unit_id, unit.model_copy(), since=token)
+        return unit
+
+    @staticmethod
+    async def get_units_by_ids(unit_ids: List[str]) -> Dict[str, Unit]:
+        """
+        Busca várias unidades por ID (cache + uma query in_ para as que faltarem).
+        Retorna dict unit_id -> Unit; IDs inexistentes não aparecem.
+        """
+        units: Dict[str, Unit] = {}
+        missing: List[str] = []
+        for unit_id in dict.fromkeys(unit_ids):
+            cached = UnitRepository.cache.get(unit_id)
+            if cached is not None:
+                units[unit_id] = cached.model_copy()
+            else:
+                missing.append(unit_id)
+
+        token = UnitRepository.cache.token()
+        for item in await select_in(UnitRepository.TABLE_NAME, "id", missing):
+            unit = Unit(**item)
+            UnitRepository.cache.set(unit.id, unit.model_copy(), since=token)
+            units[unit.id] = unit
+        return units
 
     @staticmethod
     async def create_unit(data: dict) -> Unit:
-        response = (
+        response = await execute(
             supabase.table(UnitRepository.TABLE_NAME)
             .insert(data)
-            .execute()
         )
         if not response.data:
             raise HTTPException(status_code=404, detail="Erro ao criar unidade no Supabase")
@@ -42,36 +79,43 @@ class UnitRepository:
 
     @staticmethod
     async def update_unit(unit_id: str, data: dict) -> Unit:
-        response = (
-            supabase.table(UnitRepository.TABLE_NAME)
-            .update(data)
-            .eq("id", unit_id)
-            .execute()
-        )
+        UnitRepository.cache.invalidate(unit_id)
+        try:
+            response = await execute(
+                supabase.table(UnitRepository.TABLE_NAME)
+                .update(data)
+                .eq("id", unit_id)
+            )
+        finally:
+            # de novo após a escrita: uma leitura concorrente pode ter recolocado a linha antiga
+            UnitRepository.cache.invalidate(unit_id)
         if not response.data:
             raise HTTPException(status_code=404, detail="Erro ao atualizar unidade no Supabase")
         return Unit(**response.data[0])
 
     @staticmethod
     async def delete_unit(unit_id: str) -> None:
-        response = (
-            supabase.table(UnitRepository.TABLE_NAME)
-            .delete()
-            .eq("id", unit_id)
-            .execute()
-        )
+        UnitRepository.cache.invalidate(unit_id)
+        try:
+            response = await execute(
+                supabase.table(UnitRepository.TABLE_NAME)
+                .delete()
+                .eq("id", unit_id)
+            )
+        finally:
+            # de novo após a escrita: uma leitura concorrente pode ter recolocado a linha antiga
+            UnitRepository.cache.invalidate(unit_id)
         if not response.data:
             raise HTTPException(status_code=404, detail="Erro ao deletar unidade no Supabase")
         return None
         
     @staticmethod
     async def get_unit_by_name(name: str) -> Optional[Unit]:
-        response = (
+        response = await execute(
             supabase.table(UnitRepository.TABLE_NAME)
             .select("*")
             .eq("name", name)
             .limit(1)
-            .execute()
         )
         if not response.data:
             return None
@@ -79,12 +123,11 @@ class UnitRepository:
 
     @staticmethod
     async def get_unit_by_address(address: str) -> Optional[Unit]:
-        response = (
+        response = await execute(
             supabase.table(UnitRepository.TABLE_NAME)
             .select("*")
             .eq("address", address)
             .limit(1)
-            .execute()
         )
         if not response.data:
             return None
@@ -92,11 +135,10 @@ class UnitRepository:
 
     @staticmethod
     async def get_unit_by_type(type: str) -> List[Unit]:
-        response = (
+        response = await execute(
             supabase.table(UnitRepository.TABLE_NAME)
             .select("*")
             .eq("type", type)
-            .execute()
         )
         if not response.data:
             return []
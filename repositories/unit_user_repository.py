@@ -1,6 +1,7 @@
 from zoneinfo import ZoneInfo
 from fastapi import HTTPException
-from lib.supabase_client import supabase  
+from lib.supabase_client import supabase, execute
+from lib.pagination import apply_keyset
 from entities.models.unit_user import UnitUser
 from repositories.user_repository import UserRepository
 from repositories.unit_repository import UnitRepository
@@ -23,7 +24,7 @@ class UnitUserRepository:
         Retorna o registro criado como dict.
         """
 
-        response = (
+        response = await execute(
             supabase.table(UnitUserRepository.TABLE_NAME)
             .insert(
                 {
@@ -32,7 +33,6 @@ class UnitUserRepository:
                     "role": role,
                 }
             )
-            .execute()
         )
 
         if not response.data:
@@ -46,12 +46,11 @@ class UnitUserRepository:
         Busca uma relação unidade-usuário pelo campo especificado.
         Retorna dict ou None.
         """
-        response = (
+        response = await execute(
             supabase.table(UnitUserRepository.TABLE_NAME)
             .select("*")
             .eq(key, value)
             .limit(1)
-            .execute()
         )
 
         if not response.data:
@@ -72,11 +71,10 @@ class UnitUserRepository:
         if not payload:
             raise HTTPException(status_code=400, detail="Nenhum campo para atualizar")
 
-        response = (
+        response = await execute(
             supabase.table(UnitUserRepository.TABLE_NAME)
             .update(payload)
             .eq("id", unit_user_id)
-            .execute()
         )
 
         if not response.data:
@@ -92,11 +90,10 @@ class UnitUserRepository:
         """
         Deleta a relação unidade-usuário pelo ID.
         """
-        response = (
+        response = await execute(
             supabase.table(UnitUserRepository.TABLE_NAME)
             .delete()
             .eq("id", unit_user_id)
-            .execute()
         )
 
         if not response.data:
@@ -107,11 +104,10 @@ class UnitUserRepository:
         """
         Lista todas as relações unidade-usuário para uma unidade específica.
         """
-        response = (
+        response = await execute(
             supabase.table(UnitUserRepository.TABLE_NAME)
             .select("*")
             .eq("unit_id", unit_id)
-            .execute()
         )
 
         if not response.data:
@@ -132,11 +128,10 @@ class UnitUserRepository:
         """
         Lista todas as relações unidade-usuário para um usuário específico.
         """
-        response = (
+        response = await execute(
             supabase.table(UnitUserRepository.TABLE_NAME)
             .select("*")
             .eq("user_id", user_id)
-            .execute()
         )
 
         if not response.data:
@@ -153,15 +148,16 @@ class UnitUserRepository:
         return unit_users
     
     @staticmethod
-    async def list_all_unit_users() -> list[UnitUser]:
+    async def list_all_unit_users(
+        limit: int | None = None,
+        cursor: str | None = None,
+    ) -> list[UnitUser]:
         """
         Lista todas as relações unidade-usuário.
+        Com `limit`, retorna uma página (created_at DESC, id DESC) a partir de `cursor`.
         """
-        response = (
-            supabase.table(UnitUserRepository.TABLE_NAME)
-            .select("*")
-            .execute()
-        )
+        query = supabase.table(UnitUserRepository.TABLE_NAME).select("*")
+        response = await execute(apply_keyset(query, limit, cursor))
 
         if not response.data:
             return []
@@ -185,22 +181,14 @@ class UnitUserRepository:
 
     @staticmethod
     async def list_users_by_unit(unit_id: str) -> list[User]:
-        """Retorna lista de Users associados a uma unidade."""
+        """Retorna lista de Users associados a uma unidade (na ordem das associações)."""
         unit_users = await UnitUserRepository.list_unit_users_by_unit(unit_id)
-        users: list[User] = []
-        for uu in unit_users:
-            user = await UserRepository.get_user("id", uu.user_id)
-            if user:
-                users.append(user)
-        return users
+        users_by_id = await UserRepository.get_users_by_ids([uu.user_id for uu in unit_users])
+        return [users_by_id[uu.user_id] for uu in unit_users if uu.user_id in users_by_id]
 
     @staticmethod
     async def list_units_by_user(user_id: str) -> list[Unit]:
-        """Retorna lista de Units associados a um usuário."""
+        """Retorna lista de Units associados a um usuário (na ordem das associações)."""
         unit_users = await UnitUserRepository.list_unit_users_by_user(user_id)
-        units: list[Unit] = []
-        for uu in unit_users:
-            unit = await UnitRepository.get_unit_by_id(uu.unit_id)
-            if unit:
-                units.append(unit)
-        return units
\ No newline at end of file
+        units_by_id = await UnitRepository.get_units_by_ids([uu.unit_id for uu in unit_users])
+        return [units_by_id[uu.unit_id] for uu in unit_users if uu.unit_id in units_by_id]
\ No newline at end of file
@@ -1,12 +1,16 @@
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 from fastapi import HTTPException
-from lib.supabase_client import supabase  
+from lib.supabase_client import supabase, execute
+from lib.cache import TTLCache
+from lib.joins import select_in
 from entities.models.user import User
 
 class UserRepository:
 
     TABLE_NAME = "users"
+    # cache de get_user("id", ...) (user_id -> User)
+    cache = TTLCache("users")
 
     @staticmethod
     async def create_user(
@@ -20,7 +24,7 @@ class UserRepository:
         Retorna o registro criado como dict.
         """
 
-        response = (
+        response = await execute(
             supabase.table(UserRepository.TABLE_NAME)
             .insert(
                 {
@@ -31,7 +35,6 @@ class UserRepository:
                     "email_verified": False
                 }
             )
-            .execute()
         )
 
         if not response.data:
@@ -42,33 +45,66 @@ class UserRepository:
     @staticmethod
     async def get_user(key: str, value: str) -> User | None:
         """
-        Busca um usuário pelo email.
+        Busca um usuário pelo campo especificado (buscas por id usam cache).
         Retorna dict ou None.
         """
-        response = (
+        if key == "id":
+            cached = UserRepository.cache.get(value)
+            if cached is not None:
+                return cached.model_copy()
+
+        token = UserRepository.cache.token()
+        response = await execute(
             supabase.table(UserRepository.TABLE_NAME)
             .select("*")
             .eq(key, value)
             .limit(1)
-            .execute()
         )
 
         if not response.data:
             return None
 
-        return User(**response.data[0])
+        user = User(**response.data[0])
+        UserRepository.cache.set(user.id, user.model_copy(), since=token)
+        return user
     
+    @staticmethod
+    async def get_users_by_ids(user_ids: List[str]) -> Dict[str, User]:
+        """
+        Busca vários usuários por ID (cache + uma query in_ para os que faltarem).
+        Retorna dict user_id -> User; IDs inexistentes não aparecem.
+        """
+        users: Dict[str, User] = {}
+        missing: List[str] = []
+        for user_id in dict.fromkeys(user_ids):
+            cached = UserRepository.cache.get(user_id)
+            if cached is not None:
+                users[user_id] = cached.model_copy()
+            else:
+                missing.append(user_id)
+
+        token = UserRepository.cache.token()
+        for item in await select_in(UserRepository.TABLE_NAME, "id", missing):
+            user = User(**item)
+            UserRepository.cache.set(user.id, user.model_copy(), since=token)
+            users[user.id] = user
+        return users
+
     @staticmethod
     async def update_user_email_verified(user_id: str, email_verified: bool) -> None:
         """
         Atualiza o campo email_verified do usuário.
         """
-        response = (
-            supabase.table(UserRepository.TABLE_NAME)
-            .update({"email_verified": email_verified})
-            .eq("id", user_id)
-            .execute()
-        )
+        UserRepository.cache.invalidate(user_id)
+        try:
+            response = await execute(
+                supabase.table(UserRepository.TABLE_NAME)
+                .update({"email_verified": email_verified})
+                .eq("id", user_id)
+            )
+        finally:
+            # de novo após a escrita: uma leitura concorrente pode ter recolocado a linha antiga
+            UserRepository.cache.invalidate(user_id)
         
         if not response.data:
             raise HTTPException(status_code=500, detail="Erro ao atualizar email_verified do usuário no Supabase")
@@ -79,12 +115,16 @@ class UserRepository:
         """
         Atualiza a senha do usuário.
         """
-        response = (
-            supabase.table(UserRepository.TABLE_NAME)
-            .update({"password": hashed_password})
-            .eq("id", user_id)
-            .execute()
-        )
+        UserRepository.cache.invalidate(user_id)
+        try:
+            response = await execute(
+                supabase.table(UserRepository.TABLE_NAME)
+                .update({"password": hashed_password})
+                .eq("id", user_id)
+            )
+        finally:
+            # de novo após a escrita: uma leitura concorrente pode ter recolocado a linha antiga
+            UserRepository.cache.invalidate(user_id)
         
         if not response.data:
             raise HTTPException(status_code=500, detail="Erro ao atualizar a senha do usuário no Supabase")    
@@ -95,12 +135,16 @@ class UserRepository:
         """
         Deleta o usuário pelo ID.
         """
-        response = (
-            supabase.table(UserRepository.TABLE_NAME)
-            .delete()
-            .eq("id", user_id)
-            .execute()
-        )
+        UserRepository.cache.invalidate(user_id)
+        try:
+            response = await execute(
+                supabase.table(UserRepository.TABLE_NAME)
+                .delete()
+                .eq("id", user_id)
+            )
+        finally:
+            # de novo após a escrita: uma leitura concorrente pode ter recolocado a linha antiga
+            UserRepository.cache.invalidate(user_id)
         
         if not response.data:
             raise HTTPException(status_code=500, detail="Erro ao deletar o usuário no Supabase")
\ No newline at end of file
@@ -1,5 +1,6 @@
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Query, Path
+from fastapi import APIRouter, HTTPException, Query, Path, Response
+from lib.pagination import MAX_PAGE_SIZE, set_next_cursor
 from entities.dtos.budgets_dto import (
     BudgetCreateDTO,
     BudgetUpdateDTO,
@@ -12,6 +13,7 @@ router = APIRouter()
 
 @router.get("", response_model=List[BudgetResponseDTO])
 async def list_budgets(
+    response: Response,
     initial_date: Optional[str] = Query(
         None,
         description="Data inicial do período (formato YYYY-MM-DD)",
@@ -20,15 +22,30 @@ async def list_budgets(
         None,
         description="Data final do período (formato YYYY-MM-DD)",
     ),
+    limit: Optional[int] = Query(
+        None,
+        ge=1,
+        le=MAX_PAGE_SIZE,
+        description="Tamanho da página; se omitido, retorna todos os registros",
+    ),
+    cursor: Optional[str] = Query(
+        None,
+        description="Cursor da próxima página (header X-Next-Cursor da resposta anterior)",
+    ),
 ):
     """
     Lista orçamentos, com filtros opcionais por período.
+    Com `limit`, pagina por cursor; o cursor seguinte vem no header X-Next-Cursor.
     """
     try:
-        return await BudgetService.list_budgets(
+        budgets, next_cursor = await BudgetService.list_budgets_page(
             initial_date=initial_date,
             final_date=final_date,
+            limit=limit,
+            cursor=cursor,
         )
+        set_next_cursor(response, next_cursor)
+        return budgets
     except HTTPException:
         raise
     except Exception as e:
@@ -1,5 +1,6 @@
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Query, Path
+from fastapi import APIRouter, HTTPException, Query, Path, Response
+from lib.pagination import MAX_PAGE_SIZE, set_next_cursor
 from services.frequency_service import FrequencyService
 from entities.dtos.frequency_dto import FrequencyResponseDTO, FrequencyCreateDTO, FrequencyUpdateDTO
 
@@ -7,20 +8,37 @@ router = APIRouter()
 
 @router.get("", response_model=List[FrequencyResponseDTO])
 async def list_frequencies(
+    response: Response,
     initial_date: Optional[str] = Query(None, description="Data inicial para filtro (YYYY-MM-DD)"),
     final_date: Optional[str] = Query(None, description="Data final para filtro (YYYY-MM-DD)"),
     unit_id: Optional[str] = Query(None, description="ID da unidade para filtro"),
+    limit: Optional[int] = Query(
+        None,
+        ge=1,
+        le=MAX_PAGE_SIZE,
+        description="Tamanho da página; se omitido, retorna todos os registros",
+    ),
+    cursor: Optional[str] = Query(
+        None,
+        description="Cursor da próxima página (header X-Next-Cursor da resposta anterior)",
+    ),
 ):
     """
     Lista todas as frequências, com filtros opcionais por período e unidade.
+    Com `limit`, pagina por cursor (data mais recente primeiro); o cursor seguinte vem no header X-Next-Cursor.
     """
     try:
-        frequencies = await FrequencyService.list_frequencies(
+        frequencies, next_cursor = await FrequencyService.list_frequencies_page(
             initial_date=initial_date,
             final_date=final_date,
             unit_id=unit_id,
+            limit=limit,
+            cursor=cursor,
         )
+        set_next_cursor(response, next_cursor)
         return frequencies
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao listar frequências: {str(e)}")
     
@@ -1,5 +1,7 @@
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Query, Path
+from fastapi import APIRouter, HTTPException, Query, Path, Response
+from lib.pagination import MAX_PAGE_SIZE, set_next_cursor
+from lib.csv_export import csv_response
 from entities.dtos.orders_dto import (
     OrderCreateDTO,
     OrderUpdateDTO,
@@ -12,6 +14,7 @@ router = APIRouter()
 
 @router.get("", response_model=List[OrderResponseDTO])
 async def list_orders(
+    response: Response,
     unit_id: Optional[str] = Query(
         None,
         description="Filtra por ID da unidade",
@@ -20,12 +23,27 @@ async def list_orders(
         None,
         description="Filtra por ID do orçamento",
     ),
+    limit: Optional[int] = Query(
+        None,
+        ge=1,
+        le=MAX_PAGE_SIZE,
+        description="Tamanho da página; se omitido, retorna todos os registros",
+    ),
+    cursor: Optional[str] = Query(
+        None,
+        description="Cursor da próxima página (header X-Next-Cursor da resposta anterior)",
+    ),
 ):
     """
     Lista todos os pedidos, com filtros opcionais por unidade e orçamento.
+    Com `limit`, pagina por cursor; o cursor seguinte vem no header X-Next-Cursor.
     """
     try:
-        return await OrderService.list_orders(unit_id=unit_id, budget_id=budget_id)
+        orders, next_cursor = await OrderService.list_orders_page(
+            unit_id=unit_id, budget_id=budget_id, limit=limit, cursor=cursor
+        )
+        set_next_cursor(response, next_cursor)
+        return orders
     except HTTPException:
         raise
     except Exception as e:
@@ -35,6 +53,36 @@ async def list_orders(
         )
 
 
+@router.get("/export.csv")
+async def export_orders(
+    unit_id: Optional[str] = Query(
+        None,
+        description="Filtra por ID da unidade",
+    ),
+    budget_id: Optional[str] = Query(
+        None,
+        description="Filtra por ID do orçamento",
+    ),
+):
+    """
+    Exporta os pedidos em CSV (do mais recente para o mais antigo), com filtros opcionais.
+    O arquivo é enviado em streaming, página a página, sem carregar todo o histórico em memória.
+    """
+    try:
+        return await csv_response(
+            "pedidos.csv",
+            OrderService.export_orders(unit_id=unit_id, budget_id=budget_id),
+            header=OrderService.EXPORT_HEADER,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erro ao exportar pedidos: {str(e)}",
+        )
+
+
 @router.get("/{order_id}", response_model=OrderResponseDTO)
 async def get_order(
     order_id: str = Path(..., description="ID do pedido"),
@@ -109,15 +157,29 @@ async def delete_order(
 
 @router.get("/unit/{unit_id}", response_model=List[OrderResponseDTO])
 async def get_orders_by_unit(
+    response: Response,
     unit_id: str = Path(..., description="ID da unidade"),
+    limit: Optional[int] = Query(
+        None,
+        ge=1,
+        le=MAX_PAGE_SIZE,
+        description="Tamanho da página; se omitido, retorna todos os registros",
+    ),
+    cursor: Optional[str] = Query(
+        None,
+        description="Cursor da próxima página (header X-Next-Cursor da resposta anterior)",
+    ),
 ):
     """
     Busca todos os pedidos de uma unidade.
+    Com `limit`, pagina por cursor; o cursor seguinte vem no header X-Next-Cursor.
     """
     try:
-        
-        print(unit_id)
-        return await OrderService.get_orders_by_unit_id(unit_id)
+        orders, next_cursor = await OrderService.list_orders_page(
+            unit_id=unit_id, limit=limit, cursor=cursor
+        )
+        set_next_cursor(response, next_cursor)
+        return orders
     except HTTPException:
         raise
     except Exception as e:
@@ -129,13 +191,29 @@ async def get_orders_by_unit(
 
 @router.get("/budget/{budget_id}", response_model=List[OrderResponseDTO])
 async def get_orders_by_budget(
+    response: Response,
     budget_id: str = Path(..., description="ID do orçamento"),
+    limit: Optional[int] = Query(
+        None,
+        ge=1,
+        le=MAX_PAGE_SIZE,
+        description="Tamanho da página; se omitido, retorna todos os registros",
+    ),
+    cursor: Optional[str] = Query(
+        None,
+        description="Cursor da próxima página (header X-Next-Cursor da resposta anterior)",
+    ),
 ):
     """
     Busca todos os pedidos de um orçamento.
+    Com `limit`, pagina por cursor; o cursor seguinte vem no header X-Next-Cursor.
     """
     try:
-        return await OrderService.get_orders_by_budget_id(budget_id)
+        orders, next_cursor = await OrderService.list_orders_page(
+            budget_id=budget_id, limit=limit, cursor=cursor
+        )
+        set_next_cursor(response, next_cursor)
+        return orders
     except HTTPException:
         raise
     except Exception as e:
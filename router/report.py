@@ -1,43 +1,29 @@
-from typing import Optional
-from fastapi import APIRouter, Query, Path, Depends, HTTPException, status, Header
+from typing import Dict, Optional
+from fastapi import APIRouter, Query, Path, Depends, HTTPException, status, Header, Response
+from lib.auth import get_current_user
+from lib.csv_export import csv_response
 
 # DTO do relatório
-from entities.dtos.report_dto import ReportByUnit
+from entities.dtos.report_dto import ConsolidatedReport, ReportByUnit
 from entities.dtos.user_dto import UserResponseDTO as UserDTO
 from services.reports_service import ReportsService
-from services.unit_user_service import UnitUserService
-from services.jwt_service import JWTService
-from repositories.user_repository import UserRepository
 
 router = APIRouter()
 
 
-async def get_current_user(authorization: str = Header(None)) -> UserDTO:
+def set_server_timing(response: Response, timings: Dict[str, float]) -> None:
     """
-    Dependência simples para resolver o usuário atual a partir do header Authorization: "Bearer <token>".
-    Retorna um UserResponseDTO se válido, ou levanta HTTPException(401).
+    Expõe a latência de cada fonte do relatório no header Server-Timing.
     """
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Authorization header missing")
-    parts = authorization.split()
-    if len(parts) != 2 or parts[0].lower() != "bearer":
-        raise HTTPException(status_code=401, detail="Invalid authorization header format")
-    token = parts[1]
-    user_id = await JWTService.get_user_id_from_token(token)
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Invalid or expired token")
-    user_record = await UserRepository.get_user("id", user_id)
-    if not user_record:
-        raise HTTPException(status_code=401, detail="User not found")
-    return UserDTO(
-        id=str(getattr(user_record, "id", "")),
-        email=getattr(user_record, "email", ""),
-        username=getattr(user_record, "username", getattr(user_record, "name", "")),
-        role=getattr(user_record, "role", "")
-    )
+    if timings:
+        response.headers["Server-Timing"] = ", ".join(
+            f"{name};dur={ms:.1f}" for name, ms in timings.items()
+        )
+
 
 @router.get("/unit/{unit_id}", response_model=ReportByUnit)
 async def get_report_by_unit(
+    response: Response,
     unit_id: str = Path(..., description="ID da unidade (unit_id)"),
     month: Optional[str] = Query(None, description="Período no formato YYYY-MM (opcional)"),
 ):
@@ -45,8 +31,10 @@ async def get_report_by_unit(
     Retorna o relatório da unidade especificada.
     `month` (opcional) deve vir no formato "YYYY-MM". Se omisso, é usado o período padrão (todos os dados / acumulado).
     """
+    timings: Dict[str, float] = {}
     try:
-        report = await ReportsService.generate_unit_report(unit_id=unit_id, month=month)
+        report = await ReportsService.get_unit_report(unit_id=unit_id, month=month, timings=timings)
+        set_server_timing(response, timings)
         return report
     except HTTPException:
         raise
@@ -54,30 +42,72 @@ async def get_report_by_unit(
         raise HTTPException(status_code=500, detail=f"Erro ao gerar relatório: {str(e)}")
 
 
+@router.get("/unit/{unit_id}/export.csv")
+async def export_report_by_unit(
+    unit_id: str = Path(..., description="ID da unidade (unit_id)"),
+    month: Optional[str] = Query(None, description="Período no formato YYYY-MM (opcional)"),
+):
+    """
+    Exporta o relatório da unidade em CSV, uma seção por bloco
+    (resumo, estoque, comparativo mensal, pedidos recentes e frequências).
+    """
+    timings: Dict[str, float] = {}
+    try:
+        # só dígitos e "-" do mês no nome do arquivo (month ainda é validado no relatório)
+        suffix = "-" + "".join(c for c in month if c.isdigit() or c == "-") if month else ""
+        response = await csv_response(
+            f"relatorio-{unit_id}{suffix}.csv",
+            ReportsService.export_unit_report(unit_id=unit_id, month=month, timings=timings),
+        )
+        set_server_timing(response, timings)
+        return response
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao exportar relatório: {str(e)}")
+
+
+@router.get("/consolidated", response_model=ConsolidatedReport)
+async def get_consolidated_report(
+    response: Response,
+    month: Optional[str] = Query(None, description="Período no formato YYYY-MM (opcional)"),
+):
+    """
+    Retorna o relatório de todas as unidades (um bloco ReportByUnit por unidade) e os totais da rede.
+    `month` (opcional) deve vir no formato "YYYY-MM".
+    """
+    timings: Dict[str, float] = {}
+    try:
+        report = await ReportsService.generate_consolidated_report(month=month, timings=timings)
+        set_server_timing(response, timings)
+        return report
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao gerar relatório consolidado: {str(e)}")
+
+
 @router.get("/me", response_model=ReportByUnit)
 async def get_my_unit_report(
+    response: Response,
     month: Optional[str] = Query(None, description="Período no formato YYYY-MM (opcional)"),
     current_user: UserDTO = Depends(get_current_user),
 ):
     """
     Resolve a unidade do usuário autenticado e retorna o relatório dessa unidade.
     Regras:
-      - tenta buscar as units associadas ao usuário via UnitUserService e seleciona a primeira (ou a default).
-      - se não for possível resolver a unidade, retorna 404.
+      - usa as units associadas ao usuário (resolvidas junto com a autenticação) e seleciona a primeira.
+      - se o usuário não tiver unidade, retorna 404.
     """
-    if UnitUserService is None:
-        raise HTTPException(status_code=501, detail="Serviço de associação usuário-unidade não configurado")
-
+    timings: Dict[str, float] = {}
     try:
-        # espera que UnitUserService.list_units_for_user retorne lista de Unit DTOs ou registros com 'id'
-        units = await UnitUserService.list_unit_by_user(getattr(current_user, "id", None))
+        # política simples: pega a primeira unit associada (você pode alterar para escolher a default)
+        units = current_user.units or []
         if not units:
             raise HTTPException(status_code=404, detail="Nenhuma unidade associada ao usuário")
-        # política simples: pega a primeira unit associada (você pode alterar para escolher a default)
-        unit_id = getattr(units[0], "id", None)
-        if not unit_id:
-            raise HTTPException(status_code=500, detail="Formato inesperado ao recuperar unidades do usuário")
-        report = await ReportsService.generate_unit_report(unit_id=unit_id, month=month)
+        unit_id = units[0]
+        report = await ReportsService.get_unit_report(unit_id=unit_id, month=month, timings=timings)
+        set_server_timing(response, timings)
         return report
     except HTTPException:
         raise
@@ -1,17 +1,34 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import List
+from fastapi import APIRouter, HTTPException, Query, Response
+from typing import List, Optional
+from lib.pagination import MAX_PAGE_SIZE, set_next_cursor
 from services.storage_service import StorageService
-from entities.dtos.storage_dto import StorageEntryDTO, StorageExitDTO, StorageResponseDTO
+from entities.dtos.storage_dto import StorageBulkEntryDTO, StorageEntryDTO, StorageExitDTO, StorageResponseDTO
 
 router = APIRouter()
 
 @router.get("", response_model=List[StorageResponseDTO])
-async def get_storage(unit_id: str = Query(..., description="ID da unidade")):
+async def get_storage(
+    response: Response,
+    unit_id: str = Query(..., description="ID da unidade"),
+    limit: Optional[int] = Query(
+        None,
+        ge=1,
+        le=MAX_PAGE_SIZE,
+        description="Tamanho da página; se omitido, retorna todos os registros",
+    ),
+    cursor: Optional[str] = Query(
+        None,
+        description="Cursor da próxima página (header X-Next-Cursor da resposta anterior)",
+    ),
+):
     """
     Lista todos os itens de estoque de uma unidade.
+    Com `limit`, pagina por cursor; o cursor seguinte vem no header X-Next-Cursor.
     """
     try:
-        return await StorageService.get_storage_by_unit(unit_id)
+        items, next_cursor = await StorageService.get_storage_page(unit_id, limit=limit, cursor=cursor)
+        set_next_cursor(response, next_cursor)
+        return items
     except HTTPException:
         raise
     except Exception as e:
@@ -32,6 +49,19 @@ async def register_entry(dto: StorageEntryDTO):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao registrar entrada: {str(e)}")
 
+@router.post("/entry/bulk", response_model=List[StorageResponseDTO])
+async def register_entries(dto: StorageBulkEntryDTO):
+    """
+    Registra a entrada de vários itens de uma vez (ex.: uma nota fiscal inteira).
+    Itens existentes têm a quantidade incrementada; os demais são criados.
+    """
+    try:
+        return await StorageService.register_entries(dto)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao registrar entradas: {str(e)}")
+
 @router.post("/exit", response_model=List[StorageResponseDTO])
 async def register_exit(dto: StorageExitDTO):
     """
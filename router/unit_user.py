@@ -1,5 +1,6 @@
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Query, Path
+from fastapi import APIRouter, HTTPException, Query, Path, Response
+from lib.pagination import MAX_PAGE_SIZE, set_next_cursor
 from entities.dtos.unit_user_dto import UnitUserCreateDTO, UnitUserResponseDTO, UnitUserUpdateDTO
 from services.unit_user_service import UnitUserService
 from entities.dtos.unit_dto import UnitResponseDTO
@@ -24,12 +25,27 @@ async def create_unit_user(dto: UnitUserCreateDTO):
         )
     
 @router.get("", response_model=List[UnitUserResponseDTO])
-async def list_unit_users():
+async def list_unit_users(
+    response: Response,
+    limit: Optional[int] = Query(
+        None,
+        ge=1,
+        le=MAX_PAGE_SIZE,
+        description="Tamanho da página; se omitido, retorna todos os registros",
+    ),
+    cursor: Optional[str] = Query(
+        None,
+        description="Cursor da próxima página (header X-Next-Cursor da resposta anterior)",
+    ),
+):
     """
     Lista todas as associações entre usuários e unidades.
+    Com `limit`, pagina por cursor; o cursor seguinte vem no header X-Next-Cursor.
     """
     try:
-        return await UnitUserService.list_all_unit_users()
+        unit_users, next_cursor = await UnitUserService.list_unit_users_page(limit=limit, cursor=cursor)
+        set_next_cursor(response, next_cursor)
+        return unit_users
     except HTTPException:
         raise
     except Exception as e:
@@ -1,5 +1,6 @@
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Query, Path
+from fastapi import APIRouter, HTTPException, Query, Path, Response
+from lib.pagination import MAX_PAGE_SIZE, set_next_cursor
 from entities.dtos.unit_dto import (
     UnitCreateDTO,
     UnitUpdateDTO,
@@ -12,16 +13,30 @@ router = APIRouter()
 
 @router.get("", response_model=List[UnitResponseDTO])
 async def list_units(
+    response: Response,
     type: Optional[str] = Query(
         None,
         description="Filtra por tipo de unidade (ex: CCA, CEI)",
-    )
+    ),
+    limit: Optional[int] = Query(
+        None,
+        ge=1,
+        le=MAX_PAGE_SIZE,
+        description="Tamanho da página; se omitido, retorna todos os registros",
+    ),
+    cursor: Optional[str] = Query(
+        None,
+        description="Cursor da próxima página (header X-Next-Cursor da resposta anterior)",
+    ),
 ):
     """
     Lista todas as unidades, com filtro opcional por tipo.
+    Com `limit`, pagina por cursor; o cursor seguinte vem no header X-Next-Cursor.
     """
     try:
-        return await UnitService.list_units(type)
+        units, next_cursor = await UnitService.list_units_page(type, limit=limit, cursor=cursor)
+        set_next_cursor(response, next_cursor)
+        return units
     except HTTPException:
         raise
     except Exception as e:
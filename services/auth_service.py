@@ -9,6 +9,7 @@ from services.code_service import CodeService
 from services.email_service import EmailService
 from services.jwt_service import JWTService
 from services.user_service import UserService
+from lib.auth import invalidate_principals
 from repositories.unit_user_repository import UnitUserRepository
 
 class AuthService:
@@ -142,7 +143,7 @@ class AuthService:
         if not user_record:
             raise HTTPException(status_code=400, detail="Invalid email or password.")
         
-        if not UserService.verify_password(password, user_record.password):
+        if not await UserService.verify_password(password, user_record.password):
             raise HTTPException(status_code=400, detail="Invalid email or password.")
 
         generated_jwt = await JWTService.generate_jwt_token(user_record.id)
@@ -164,5 +165,6 @@ class AuthService:
     
     @staticmethod
     async def change_password(user_id: int, new_password: str):
-        hashed_password = UserService.hash_password(new_password)
-        await UserRepository.update_user_password(user_id, hashed_password)
\ No newline at end of file
+        hashed_password = await UserService.hash_password(new_password)
+        await UserRepository.update_user_password(user_id, hashed_password)
+        invalidate_principals(user_id)
\ No newline at end of file
@@ -1,6 +1,8 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from fastapi import HTTPException
+from lib.pagination import build_next_cursor
 from repositories.budgets_repository import BudgetRepository
+from services.reports_service import ReportsService
 from entities.dtos.budgets_dto import (
     BudgetCreateDTO,
     BudgetUpdateDTO,
@@ -17,12 +19,31 @@ class BudgetService:
         """
         Lista orçamentos, com filtros opcionais por período.
         """
+        budgets, _ = await BudgetService.list_budgets_page(
+            initial_date=initial_date,
+            final_date=final_date,
+        )
+        return budgets
+
+    @staticmethod
+    async def list_budgets_page(
+        initial_date: Optional[str] = None,
+        final_date: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[BudgetResponseDTO], Optional[str]]:
+        """
+        Lista orçamentos com paginação por cursor (sem `limit`, retorna todos).
+        Retorna (lista de BudgetResponseDTO, cursor da próxima página ou None).
+        """
         budgets = await BudgetRepository.list_budgets(
             initial_date=initial_date,
             final_date=final_date,
+            limit=limit,
+            cursor=cursor,
         )
 
-        return [
+        items = [
             BudgetResponseDTO(
                 id=b.id,
                 description=b.description,
@@ -34,6 +55,7 @@ class BudgetService:
             )
             for b in budgets
         ]
+        return items, build_next_cursor(budgets, limit)
     
     @staticmethod
     async def get_budget_by_id(budget_id: str) -> BudgetResponseDTO:
@@ -62,6 +84,8 @@ class BudgetService:
         data = dto.model_dump(mode="json")
 
         created_budget = await BudgetRepository.create_budget(data)
+        # orçamentos não pertencem a uma unidade: afetam os meses cobertos em todas as unidades
+        await ReportsService.invalidate_budget_reports(created_budget)
         return BudgetResponseDTO(
             id=created_budget.id,
             description=created_budget.description,
@@ -98,7 +122,13 @@ class BudgetService:
                 detail="A data final deve ser posterior ou igual à data inicial.",
             )
 
+        # com mudança de datas, os meses do período anterior também são afetados
+        previous = None
+        if "initial_date" in data or "final_date" in data:
+            previous = await BudgetRepository.get_budget_by_id(budget_id)
+
         budget = await BudgetRepository.update_budget(budget_id, data)
+        await ReportsService.invalidate_budget_reports(*(b for b in (previous, budget) if b is not None))
 
         return BudgetResponseDTO(
             id=budget.id,
@@ -117,4 +147,5 @@ class BudgetService:
         Valida se há pedidos associados antes de deletar.
         Retorna None.
         """
-        await BudgetRepository.delete_budget(budget_id)
\ No newline at end of file
+        deleted = await BudgetRepository.delete_budget(budget_id)
+        await ReportsService.invalidate_budget_reports(deleted)
\ No newline at end of file
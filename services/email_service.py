@@ -1,17 +1,13 @@
 from fastapi import BackgroundTasks
-from jinja2 import Environment, FileSystemLoader
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from lib import templates
+from lib.email_outbox import email_outbox
 import os
 
 class EmailService:
 
     @staticmethod
     def render_template(template_name: str, context: dict) -> str:
-        env = Environment(loader=FileSystemLoader("templates"))
-        template = env.get_template(template_name)
-        return template.render(context)
+        return templates.render_template(template_name, context)
 
     @staticmethod
     async def send_email_verification(email: str, username: str, code: str) -> None:
@@ -46,18 +42,7 @@ class EmailService:
 
     @staticmethod
     async def send_email(to: str, subject: str, html_content: str):
-        smtp_host = os.getenv("SMTP_HOST")
-        smtp_port = int(os.getenv("SMTP_PORT"))
-        smtp_user = os.getenv("SMTP_USER")
-        smtp_pass = os.getenv("SMTP_PASS")
-
-        msg = MIMEMultipart("alternative")
-        msg["Subject"] = subject
-        msg["From"] = smtp_user
-        msg["To"] = to
-
-        msg.attach(MIMEText(html_content, "html"))
-
-        with smtplib.SMTP_SSL(smtp_host, smtp_port) as server:
-            server.login(smtp_user, smtp_pass)
-            server.sendmail(smtp_user, to, msg.as_string())
+        """
+        Enfileira o e-mail no outbox; o envio SMTP acontece em background.
+        """
+        await email_outbox.enqueue(to, subject, html_content)
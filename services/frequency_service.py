@@ -1,6 +1,8 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from fastapi import HTTPException
+from lib.pagination import build_next_cursor
 from repositories.frequency_repository import FrequencyRepository
+from services.reports_service import ReportsService
 from services.unit_user_service import to_brazil
 from entities.dtos.frequency_dto import (
     FrequencyCreateDTO,
@@ -20,13 +22,34 @@ class FrequencyService:
         Lista todas as frequências, com filtros opcionais por período e unidade.
         Retorna lista de FrequencyResponseDTO.
         """
+        frequencies, _ = await FrequencyService.list_frequencies_page(
+            initial_date=initial_date,
+            final_date=final_date,
+            unit_id=unit_id,
+        )
+        return frequencies
+
+    @staticmethod
+    async def list_frequencies_page(
+        initial_date: Optional[str] = None,
+        final_date: Optional[str] = None,
+        unit_id: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[FrequencyResponseDTO], Optional[str]]:
+        """
+        Lista frequências com paginação por cursor (sem `limit`, retorna todas).
+        Retorna (lista de FrequencyResponseDTO, cursor da próxima página ou None).
+        """
         frequencies = await FrequencyRepository.list_frequencies(
             initial_date=initial_date,
             final_date=final_date,
             unit_id=unit_id,
+            limit=limit,
+            cursor=cursor,
         )
 
-        return [
+        items = [
             FrequencyResponseDTO(
                 id=freq.id,
                 unit_id=freq.unit_id,
@@ -36,6 +59,7 @@ class FrequencyService:
             )
             for freq in frequencies
         ]
+        return items, build_next_cursor(frequencies, limit, column="date")
     
     @staticmethod
     async def get_frequency_by_id(frequency_id: str) -> FrequencyResponseDTO:
@@ -65,6 +89,7 @@ class FrequencyService:
         elif 'date' in data and hasattr(data['date'], 'isoformat'):
             data['date'] = data['date'].isoformat()
         frequency = await FrequencyRepository.create_frequency(data)
+        await ReportsService.invalidate_unit_reports(frequency.unit_id, frequency.date)
         return FrequencyResponseDTO(
             id=frequency.id,
             unit_id=frequency.unit_id,
@@ -88,7 +113,15 @@ class FrequencyService:
         elif 'date' in data and hasattr(data['date'], 'isoformat'):
             data['date'] = data['date'].isoformat()
         
+        # unidade/data anteriores, para invalidar também o mês de onde a frequência saiu
+        previous = (
+            await FrequencyRepository.get_frequency_by_id(frequency_id)
+            if "unit_id" in data or "date" in data else None
+        )
         frequency = await FrequencyRepository.update_frequency(frequency_id, data)
+        if previous is not None and (previous.unit_id, previous.date) != (frequency.unit_id, frequency.date):
+            await ReportsService.invalidate_unit_reports(previous.unit_id, previous.date)
+        await ReportsService.invalidate_unit_reports(frequency.unit_id, frequency.date)
         return FrequencyResponseDTO(
             id=frequency.id,
             unit_id=frequency.unit_id,
@@ -102,6 +135,8 @@ class FrequencyService:
         """
         Deleta uma frequência pelo ID.
         """
-        await FrequencyRepository.delete_frequency(frequency_id)
+        deleted = await FrequencyRepository.delete_frequency(frequency_id)
+        if deleted:
+            await ReportsService.invalidate_unit_reports(deleted.get("unit_id"), deleted.get("date"))
     
     
\ No newline at end of file
@@ -1,9 +1,11 @@
+import hashlib
 import os
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict, Any
 from fastapi import HTTPException
 from dotenv import load_dotenv
-from jose import jwt, JWTError
+from lib.cache import TTLCache
 
 load_dotenv()
 
@@ -13,6 +15,23 @@ class JWTService:
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24  * 7
 
+    # Chave HMAC construída uma única vez (o python-jose reconstrói a chave a cada chamada se receber a string),
+    # no primeiro uso: importar o python-jose (e os backends de criptografia) fica fora do cold start
+    _KEY = None
+    _ALGORITHMS = [ALGORITHM]
+    _DECODE_OPTIONS = {"verify_aud": False}
+
+    # Tokens já verificados (hash SHA-256 -> payload), válidos até o `exp` do token
+    verified_tokens = TTLCache("jwt")
+
+    @staticmethod
+    def _signing_key():
+        if JWTService._KEY is None:
+            from jose import jwk
+
+            JWTService._KEY = jwk.construct(JWTService.SECRET_KEY, JWTService.ALGORITHM)
+        return JWTService._KEY
+
     @staticmethod
     async def generate_jwt_token(
         user_id: str
@@ -29,7 +48,9 @@ class JWTService:
             "exp": int(expire.timestamp()) 
         }
         
-        token = jwt.encode(payload, JWTService.SECRET_KEY, algorithm=JWTService.ALGORITHM)
+        from jose import jwt
+
+        token = jwt.encode(payload, JWTService._signing_key(), algorithm=JWTService.ALGORITHM)
         
         return token
 
@@ -41,19 +62,33 @@ class JWTService:
         - expiração
 
         Retorna o payload se for válido.
-        Levanta JWTError se for inválido/expirado.
+        Levanta HTTPException(401) se for inválido/expirado.
+        Tokens já verificados ficam em cache até expirarem, sem novo decode.
         """
+        key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+        cached = JWTService.verified_tokens.get(key)
+        if cached is not None:
+            return dict(cached)
+
+        from jose import JWTError, jwt
+
         try:
             payload = jwt.decode(
                 token,
-                JWTService.SECRET_KEY,
-                algorithms=[JWTService.ALGORITHM],
-                options={"verify_aud": False}, 
+                JWTService._signing_key(),
+                algorithms=JWTService._ALGORITHMS,
+                options=JWTService._DECODE_OPTIONS,
             )
-            return payload
         except JWTError as e:
             raise HTTPException(status_code=401, detail="Token inválido ou expirado") from e
 
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            ttl = min(JWTService.verified_tokens.ttl, exp - time.time())
+            if ttl > 0:
+                JWTService.verified_tokens.set(key, dict(payload), ttl=ttl)
+        return payload
+
     @staticmethod
     async def get_user_id_from_token(token: str) -> Optional[str]:
         """
@@ -66,7 +101,7 @@ class JWTService:
             if not isinstance(user_id, str):
                 return None
             return user_id
-        except JWTError:
+        except HTTPException:
             return None
 
     @staticmethod
@@ -78,5 +113,5 @@ class JWTService:
         try:
             payload = await JWTService.validate_token(token)
             return payload.get(claim)
-        except JWTError:
+        except HTTPException:
             return None
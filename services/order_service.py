@@ -1,6 +1,9 @@
-from typing import List, Optional
+from typing import Any, AsyncIterator, List, Optional, Tuple
 from fastapi import HTTPException
+from lib.pagination import build_next_cursor
+from lib.csv_export import iter_keyset
 from repositories.order_repository import OrderRepository, OrderItemRepository
+from services.reports_service import ReportsService
 from entities.dtos.orders_dto import (
     OrderCreateDTO,
     OrderUpdateDTO,
@@ -10,6 +13,8 @@ from entities.dtos.orders_dto import (
 )
 
 class OrderService:
+    # Colunas da exportação CSV de pedidos
+    EXPORT_HEADER = ["id", "unit_id", "budget_id", "status", "description", "amount", "created_at", "items_count"]
 
     @staticmethod
     async def list_orders(
@@ -20,14 +25,32 @@ class OrderService:
         Lista todos os pedidos, com filtros opcionais.
         Retorna lista de OrderResponseDTO.
         """
-        orders = await OrderRepository.list_orders(unit_id=unit_id, budget_id=budget_id)
-        
-        
+        orders, _ = await OrderService.list_orders_page(unit_id=unit_id, budget_id=budget_id)
+        return orders
+
+    @staticmethod
+    async def list_orders_page(
+        unit_id: Optional[str] = None,
+        budget_id: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[OrderResponseDTO], Optional[str]]:
+        """
+        Lista pedidos com paginação por cursor (sem `limit`, retorna todos).
+        Retorna (lista de OrderResponseDTO, cursor da próxima página ou None).
+        """
+        orders = await OrderRepository.list_orders(
+            unit_id=unit_id, budget_id=budget_id, limit=limit, cursor=cursor
+        )
+
+        # carrega os itens de todos os pedidos de uma vez (evita uma query por pedido)
+        items_by_order = await OrderItemRepository.get_order_items_by_order_ids(
+            [order.id for order in orders]
+        )
 
         result = []
         for order in orders:
-            
-            items = await OrderItemRepository.get_order_items_by_order_id(order.id)
+            items = items_by_order.get(order.id, [])
 
             result.append(OrderResponseDTO(
                 id=order.id,
@@ -52,7 +75,36 @@ class OrderService:
                 ] if items else None
             ))
 
-        return result
+        return result, build_next_cursor(orders, limit)
+
+    @staticmethod
+    async def export_orders(
+        unit_id: Optional[str] = None,
+        budget_id: Optional[str] = None,
+    ) -> AsyncIterator[List[List[Any]]]:
+        """
+        Linhas da exportação de pedidos (colunas de EXPORT_HEADER), uma página por vez
+        (keyset, do mais recente para o mais antigo): a memória usada não cresce com o histórico.
+        """
+        async for orders in iter_keyset(
+            lambda limit, cursor: OrderRepository.list_orders(
+                unit_id=unit_id, budget_id=budget_id, limit=limit, cursor=cursor
+            )
+        ):
+            counts = await OrderItemRepository.count_items_by_order_ids([order.id for order in orders])
+            yield [
+                [
+                    order.id,
+                    order.unit_id,
+                    order.budget_id,
+                    order.status,
+                    order.description,
+                    order.amount,
+                    order.created_at.isoformat() if order.created_at else None,
+                    counts.get(order.id, 0),
+                ]
+                for order in orders
+            ]
 
     @staticmethod
     async def get_order_by_id(order_id: str) -> OrderResponseDTO:
@@ -98,45 +150,37 @@ class OrderService:
         Retorna OrderResponseDTO.
         """
         try:
+            items_data = [
+                {
+                    "description": item_dto.description,
+                    "amount": item_dto.amount,
+                    "measure_unit": item_dto.measure_unit if item_dto.measure_unit else "pacote",
+                    "received": item_dto.received if item_dto.received is not None else True,
+                }
+                for item_dto in dto.items or []
+            ]
+            # Remove keys com valor None (a coluna fica com o DEFAULT, como antes)
+            items_data = [{k: v for k, v in item.items() if v is not None} for item in items_data]
+
+            # Calcula o total automaticamente se não foi fornecido e há itens
+            amount = dto.amount
+            if not amount and items_data:
+                amount = sum(item["amount"] for item in items_data) or amount
+
             # prepara os dados do pedido (exclui items que não vai para a tabela orders)
             order_data = {
                 "description": dto.description,
-                "amount": dto.amount,
+                "amount": amount,
                 "unit_id": dto.unit_id,
                 "budget_id": dto.budget_id,
             }
             # Remove keys com valor None
             order_data = {k: v for k, v in order_data.items() if v is not None}
 
-            # cria o pedido
-            order = await OrderRepository.create_order(order_data)
-
-            # cria os itens do pedido, se fornecidos
-            if dto.items:
-                for item_dto in dto.items:
-                    item_data = {
-                        "order_id": order.id,
-                        "description": item_dto.description,
-                        "amount": item_dto.amount,
-                        "measure_unit": item_dto.measure_unit if item_dto.measure_unit else "pacote",
-                        "received": item_dto.received if item_dto.received is not None else True,
-                    }
-                    # remove None values
-                    item_data = {k: v for k, v in item_data.items() if v is not None}
-
-                    await OrderItemRepository.create_order_item(item_data)
+            # cria o pedido e os itens em uma única transação
+            order, all_items = await OrderRepository.create_order_with_items(order_data, items_data)
 
-            # busca todos os itens do pedido (para garantir que está completo)
-            all_items = await OrderItemRepository.get_order_items_by_order_id(order.id)
-            
-            # Calcula o total automaticamente se não foi fornecido e há itens
-            calculated_amount = order.amount
-            if not calculated_amount and all_items:
-                calculated_amount = sum(item.amount for item in all_items)
-                # Atualiza o pedido com o total calculado
-                if calculated_amount:
-                    await OrderRepository.update_order(order.id, {"amount": calculated_amount})
-                    order.amount = calculated_amount
+            await ReportsService.invalidate_order_reports(order.unit_id, order.created_at)
 
             return OrderResponseDTO(
                 id=order.id,
@@ -173,8 +217,14 @@ class OrderService:
         try:
             # exclude_unset=True para não sobrescrever com None campos não enviados
             data = dto.model_dump(exclude_unset=True)
+            # com troca de unidade, os relatórios da unidade anterior também são afetados
+            previous = await OrderRepository.get_order_by_id(order_id) if "unit_id" in data else None
             order = await OrderRepository.update_order(order_id, data)
 
+            if previous is not None and previous.unit_id != order.unit_id:
+                await ReportsService.invalidate_order_reports(previous.unit_id, previous.created_at)
+            await ReportsService.invalidate_order_reports(order.unit_id, order.created_at)
+
             # busca os itens do pedido
             items = await OrderItemRepository.get_order_items_by_order_id(order.id)
 
@@ -214,7 +264,8 @@ class OrderService:
             # Deleta os itens primeiro para evitar erro de foreign key constraint
             await OrderItemRepository.delete_order_items_by_order_id(order_id)
             # Depois deleta o pedido
-            await OrderRepository.delete_order(order_id)
+            order = await OrderRepository.delete_order(order_id)
+            await ReportsService.invalidate_order_reports(order.unit_id, order.created_at)
             return None
         except HTTPException:
             raise
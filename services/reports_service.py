@@ -1,14 +1,30 @@
 # services/reports_service.py
 import asyncio
-from typing import List, Optional, Dict
+import os
+import time
+from typing import Any, AsyncIterator, Awaitable, List, Optional, Dict, Tuple
 from datetime import datetime, date
 from zoneinfo import ZoneInfo
 from fastapi import HTTPException
 
 from entities.dtos.report_dto import (
     ReportByUnit, ReportMetrics, ReportTotals, StorageSummary,
-    OrderSummary, MonthlyComparison, FrequencySummary
+    OrderSummary, MonthlyComparison, FrequencySummary,
+    ConsolidatedReport, NetworkTotals,
 )
+from repositories.report_snapshot_repository import ReportSnapshotRepository
+from repositories.report_aggregate_repository import ReportAggregateRepository
+from lib.report_engine import (
+    to_naive_datetime, empty_order_totals, summarize_storage, summarize_orders,
+    OrderColumns, StorageColumns,
+)
+
+# Tempo máximo (segundos) para cada fonte de dados do relatório
+REPORT_SOURCE_TIMEOUT = float(os.getenv("REPORT_SOURCE_TIMEOUT", "10"))
+
+# Agrega estoque e pedidos no banco (view/RPC da migration report_aggregates);
+# com "false", carrega as linhas e agrega em Python.
+REPORT_DB_AGGREGATION = os.getenv("REPORT_DB_AGGREGATION", "true").lower() == "true"
 
 # Helpers (mantidos localmente)
 def parse_month_to_range(month_str: Optional[str]):
@@ -36,21 +52,77 @@ def parse_month_to_range(month_str: Optional[str]):
         raise HTTPException(status_code=400, detail=f"Parâmetro 'month' inválido: {str(e)}")
 
 
-def to_naive_datetime(dt: Optional[datetime]) -> Optional[datetime]:
+def month_key(dt: Optional[datetime]) -> Optional[str]:
+    """Chave de mês (YYYY-MM) usada nos snapshots de relatório."""
     if dt is None:
         return None
-    if isinstance(dt, str):
-        try:
-            dt = datetime.fromisoformat(dt)
-        except Exception:
-            return None
-    if isinstance(dt, date) and not isinstance(dt, datetime):
-        return datetime.combine(dt, datetime.min.time())
-    if isinstance(dt, datetime):
-        if dt.tzinfo is not None:
-            return dt.replace(tzinfo=None)
-        return dt
-    return None
+    return f"{dt.year:04d}-{dt.month:02d}"
+
+
+def is_closed_month(start_dt: Optional[datetime]) -> bool:
+    """Indica se o mês iniciado em start_dt já terminou (anterior ao mês corrente)."""
+    if start_dt is None:
+        return False
+    now = datetime.now(ZoneInfo("America/Sao_Paulo"))
+    return (start_dt.year, start_dt.month) < (now.year, now.month)
+
+
+async def fetch_source(name: str, coro: Awaitable[Any], timings: Dict[str, float]) -> Any:
+    """
+    Aguarda uma fonte de dados do relatório com timeout individual.
+    Registra a latência (ms) da fonte em `timings`, mesmo em caso de erro.
+    """
+    start = time.perf_counter()
+    try:
+        return await asyncio.wait_for(coro, timeout=REPORT_SOURCE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=504,
+            detail=f"Tempo esgotado ao buscar '{name}' para o relatório",
+        )
+    finally:
+        timings[name] = (time.perf_counter() - start) * 1000.0
+
+
+def effective_range(
+    budgets: List[Any],
+    start_dt: Optional[datetime],
+    end_dt: Optional[datetime],
+) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """
+    Intervalo efetivo do relatório: o do primeiro orçamento do período, se houver,
+    senão o do mês pedido.
+    """
+    actual_start_dt = start_dt
+    actual_end_dt = end_dt
+    if budgets:
+        first_budget = budgets[0]
+        budget_initial = getattr(first_budget, "initial_date", None)
+        budget_final = getattr(first_budget, "final_date", None)
+
+        if budget_initial:
+            try:
+                if isinstance(budget_initial, str):
+                    budget_initial = datetime.fromisoformat(budget_initial)
+                else:
+                    budget_initial = to_naive_datetime(budget_initial)
+            except Exception:
+                budget_initial = None
+
+        if budget_final:
+            try:
+                if isinstance(budget_final, str):
+                    budget_final = datetime.fromisoformat(budget_final)
+                else:
+                    budget_final = to_naive_datetime(budget_final)
+            except Exception:
+                budget_final = None
+
+        if budget_initial:
+            actual_start_dt = budget_initial
+        if budget_final:
+            actual_end_dt = budget_final
+    return actual_start_dt, actual_end_dt
 
 
 class ReportsService:
@@ -61,119 +133,360 @@ class ReportsService:
     """
 
     @staticmethod
-    async def generate_unit_report(unit_id: str, month: Optional[str] = None) -> ReportByUnit:
-        # Imports feitos localmente para evitar circular imports
+    async def get_unit_report(
+        unit_id: str,
+        month: Optional[str] = None,
+        timings: Optional[Dict[str, float]] = None,
+    ) -> ReportByUnit:
+        """
+        Retorna o relatório da unidade.
+        Em meses encerrados, orçamentos, frequências e totais de pedidos vêm do snapshot
+        (report_snapshots), gerado na primeira leitura e invalidado quando esses dados
+        mudam; unidade e estoque são sempre lidos na hora. O mês corrente e o acumulado
+        são sempre recalculados.
+        """
+        if timings is None:
+            timings = {}
+
+        start_dt, _ = parse_month_to_range(month)
+        if not is_closed_month(start_dt):
+            return await ReportsService.generate_unit_report(unit_id, month, timings)
+
+        key = month_key(start_dt)
+        started = time.perf_counter()
+        (sources, version), (unit, storage_groups) = await asyncio.gather(
+            fetch_source("snapshot", ReportSnapshotRepository.get_snapshot(unit_id, key), timings),
+            ReportsService.fetch_live_sources(unit_id, timings),
+        )
+
+        if sources is None:
+            # reserva a linha antes de ler os dados: uma invalidação no meio do caminho
+            # muda a version e a gravação abaixo é descartada
+            if version is None:
+                version = await ReportSnapshotRepository.claim(unit_id, key)
+            sources = await ReportsService.fetch_month_sources(unit_id, month, timings)
+            if version is not None:
+                await ReportSnapshotRepository.save_snapshot(
+                    unit_id, key, version, sources, sources["range_start"], sources["range_end"],
+                )
+        timings["total"] = (time.perf_counter() - started) * 1000.0
+
+        return ReportsService.assemble_report(
+            unit_id, unit, storage_groups, sources["order_totals"],
+            sources["budgets"], sources["frequencies"], month,
+        )
+
+    @staticmethod
+    async def export_unit_report(
+        unit_id: str,
+        month: Optional[str] = None,
+        timings: Optional[Dict[str, float]] = None,
+    ) -> AsyncIterator[List[List[Any]]]:
+        """
+        Linhas da exportação CSV do relatório da unidade, uma seção por vez
+        (resumo, storage_summary, monthly_comparison, recent_orders, frequencies).
+        Cada seção começa com o nome e o cabeçalho e termina com uma linha em branco.
+        """
+        report = await ReportsService.get_unit_report(unit_id, month, timings)
+        metrics, totals = report.metrics, report.totals
+
+        yield [
+            ["report"],
+            ["unit_id", "unit_name", "month", "generated_at", "capacity", "frequency_pct",
+             "cost_per_capita", "total_spending", "packs_budget", "packs_donations", "total_packs"],
+            [report.unit_id, report.unit_name, report.month, report.generated_at.isoformat(),
+             metrics.capacity, metrics.frequency_pct, metrics.cost_per_capita, metrics.total_spending,
+             totals.packs_budget, totals.packs_donations, totals.total_packs],
+            [],
+        ]
+        yield [
+            ["storage_summary"],
+            ["food", "measure_unit", "bought_amount", "donated_amount", "total_amount"],
+            *([s.food, s.measure_unit, s.bought_amount, s.donated_amount, s.total_amount] for s in report.storage_summary),
+            [],
+        ]
+        yield [
+            ["monthly_comparison"],
+            ["month", "budget", "spent"],
+            *([m.month, m.budget, m.spent] for m in report.monthly_comparison),
+            [],
+        ]
+        yield [
+            ["recent_orders"],
+            ["id", "date", "amount", "items_count"],
+            *([o.id, o.date.isoformat() if o.date else None, o.amount, o.items_count] for o in report.recent_orders),
+            [],
+        ]
+        yield [
+            ["frequencies"],
+            ["id", "date", "amount"],
+            *([f.id, f.date, f.amount] for f in report.frequencies),
+        ]
+
+    @staticmethod
+    async def invalidate_unit_reports(unit_id: Optional[str], when=None) -> None:
+        """
+        Invalida snapshots afetados por uma alteração nas frequências da unidade.
+        Com `when` (data do registro alterado), invalida apenas aquele mês.
+        """
+        if not unit_id:
+            return
+        dt = to_naive_datetime(when)
+        await ReportSnapshotRepository.invalidate(unit_id, [month_key(dt)] if dt else None)
+
+    @staticmethod
+    async def invalidate_order_reports(unit_id: Optional[str], created_at) -> None:
+        """
+        Invalida os snapshots da unidade cujo intervalo de pedidos (mês ou período do
+        orçamento) contém o pedido criado em `created_at`.
+        """
+        if not unit_id:
+            return
+        await ReportSnapshotRepository.invalidate(unit_id, at=to_naive_datetime(created_at))
+
+    @staticmethod
+    async def invalidate_budget_reports(*budgets: Any) -> None:
+        """
+        Invalida, em todas as unidades, os meses cobertos pelos orçamentos
+        (initial_date a final_date). Orçamentos não pertencem a uma unidade.
+        """
+        months = set()
+        for budget in budgets:
+            initial = to_naive_datetime(getattr(budget, "initial_date", None))
+            final = to_naive_datetime(getattr(budget, "final_date", None)) or initial
+            if initial is None:
+                continue
+            year, mon = initial.year, initial.month
+            while (year, mon) <= (final.year, final.month):
+                months.add(f"{year:04d}-{mon:02d}")
+                year, mon = (year + 1, 1) if mon == 12 else (year, mon + 1)
+        if months:
+            await ReportSnapshotRepository.invalidate(months=sorted(months))
+
+    @staticmethod
+    async def fetch_live_sources(unit_id: str, timings: Dict[str, float]) -> Tuple[Any, List[Dict[str, Any]]]:
+        """
+        Unidade e estoque agrupado por item, sempre lidos na hora (o estoque não é do mês).
+        UnitService.get_unit_by_id levanta 404 se a unidade não existir.
+        """
         from services.unit_service import UnitService
         from services.storage_service import StorageService
+
+        unit, storage = await asyncio.gather(
+            fetch_source("unit", UnitService.get_unit_by_id(unit_id), timings),
+            fetch_source(
+                "storage",
+                ReportAggregateRepository.list_storage_summary(unit_id)
+                if REPORT_DB_AGGREGATION
+                else StorageService.get_storage_by_unit(unit_id),
+                timings,
+            ),
+        )
+        return unit, storage if REPORT_DB_AGGREGATION else summarize_storage(storage)
+
+    @staticmethod
+    async def fetch_month_sources(
+        unit_id: str,
+        month: Optional[str],
+        timings: Dict[str, float],
+    ) -> Dict[str, Any]:
+        """
+        Dados do período do relatório (o que vai para o snapshot): orçamentos, frequências
+        e totais de pedidos no intervalo efetivo [range_start, range_end).
+        Com REPORT_DB_AGGREGATION, os pedidos chegam já agregados do banco.
+        """
         from services.order_service import OrderService
         from services.budget_service import BudgetService
-        from services.unit_user_service import UnitUserService
         from services.frequency_service import FrequencyService
 
-        # 1) validar unidade
-        unit = await UnitService.get_unit_by_id(unit_id)
-        if not unit:
-            raise HTTPException(status_code=404, detail="Unidade não encontrada")
-
-        # 2) período: usar month como base inicial
         start_dt, end_dt = parse_month_to_range(month)
-
         initial_date = start_dt.isoformat() if start_dt else None
         final_date = end_dt.isoformat() if end_dt else None
+        freq_initial_date = start_dt.date().isoformat() if start_dt else None
+        freq_final_date = end_dt.date().isoformat() if end_dt else None
 
+        sources = {
+            "budgets": BudgetService.list_budgets(initial_date=initial_date, final_date=final_date),
+            "frequencies": FrequencyService.list_frequencies(initial_date=freq_initial_date, final_date=freq_final_date, unit_id=unit_id),
+        }
+        if not REPORT_DB_AGGREGATION:
+            sources["orders"] = OrderService.list_orders(unit_id=unit_id)
+
+        results = dict(zip(sources, await asyncio.gather(
+            *(fetch_source(name, coro, timings) for name, coro in sources.items())
+        )))
+
+        # o intervalo efetivo depende dos orçamentos: pedidos são agregados depois
+        range_start, range_end = effective_range(results["budgets"], start_dt, end_dt)
+        if REPORT_DB_AGGREGATION:
+            order_aggregates = await fetch_source(
+                "orders",
+                ReportAggregateRepository.get_order_aggregates(unit_id, range_start, range_end),
+                timings,
+            )
+            order_totals = order_aggregates.get(unit_id) or empty_order_totals()
+        else:
+            order_totals = summarize_orders(results["orders"], range_start, range_end)
+
+        return {
+            "budgets": results["budgets"],
+            "frequencies": results["frequencies"],
+            "order_totals": order_totals,
+            "range_start": range_start,
+            "range_end": range_end,
+        }
+
+    @staticmethod
+    async def generate_unit_report(
+        unit_id: str,
+        month: Optional[str] = None,
+        timings: Optional[Dict[str, float]] = None,
+    ) -> ReportByUnit:
+        """
+        Monta o relatório da unidade, buscando em paralelo a unidade e o estoque
+        (fetch_live_sources) e os dados do período (fetch_month_sources).
+        Se `timings` for passado, é preenchido com a latência (ms) de cada fonte de dados.
+        """
+        if timings is None:
+            timings = {}
+
+        started = time.perf_counter()
+        try:
+            (unit, storage_groups), sources = await asyncio.gather(
+                ReportsService.fetch_live_sources(unit_id, timings),
+                ReportsService.fetch_month_sources(unit_id, month, timings),
+            )
+        finally:
+            timings["total"] = (time.perf_counter() - started) * 1000.0
+
+        return ReportsService.assemble_report(
+            unit_id, unit, storage_groups, sources["order_totals"],
+            sources["budgets"], sources["frequencies"], month,
+        )
+
+    @staticmethod
+    async def generate_consolidated_report(
+        month: Optional[str] = None,
+        timings: Optional[Dict[str, float]] = None,
+    ) -> ConsolidatedReport:
+        """
+        Monta o relatório de todas as unidades com uma consulta por fonte de dados
+        (unidades, estoque, pedidos, orçamentos, frequências), agrupando os registros
+        por unidade em uma única passada, mais os totais da rede.
+        """
+        from services.unit_service import UnitService
+        from services.storage_service import StorageService
+        from services.order_service import OrderService
+        from services.budget_service import BudgetService
+        from services.frequency_service import FrequencyService
+
+        if timings is None:
+            timings = {}
+
+        start_dt, end_dt = parse_month_to_range(month)
+        initial_date = start_dt.isoformat() if start_dt else None
+        final_date = end_dt.isoformat() if end_dt else None
         freq_initial_date = start_dt.date().isoformat() if start_dt else None
         freq_final_date = end_dt.date().isoformat() if end_dt else None
 
-        # 3) buscar dados em paralelo (os serviços devem suportar os filtros usados)
-        tasks = [
-            StorageService.get_storage_by_unit(unit_id),
-            OrderService.list_orders(unit_id=unit_id),
-            BudgetService.list_budgets(initial_date=initial_date, final_date=final_date),
-            UnitUserService.list_users_by_unit(unit_id),
-            FrequencyService.list_frequencies(initial_date=freq_initial_date, final_date=freq_final_date, unit_id=unit_id)
-        ]
-        storage_items, orders, budgets, members, frequencies = await asyncio.gather(*tasks)
-
-        # 4) se budgets presentes, ajustar intervalo efetivo do relatório
-        actual_start_dt = start_dt
-        actual_end_dt = end_dt
-        if budgets:
-            first_budget = budgets[0]
-            budget_initial = getattr(first_budget, "initial_date", None)
-            budget_final = getattr(first_budget, "final_date", None)
-
-            if budget_initial:
-                try:
-                    if isinstance(budget_initial, str):
-                        budget_initial = datetime.fromisoformat(budget_initial)
-                    else:
-                        budget_initial = to_naive_datetime(budget_initial)
-                except Exception:
-                    budget_initial = None
-
-            if budget_final:
-                try:
-                    if isinstance(budget_final, str):
-                        budget_final = datetime.fromisoformat(budget_final)
-                    else:
-                        budget_final = to_naive_datetime(budget_final)
-                except Exception:
-                    budget_final = None
-
-            if budget_initial:
-                actual_start_dt = budget_initial
-            if budget_final:
-                actual_end_dt = budget_final
-
-        # 5) filtrar orders por intervalo efetivo
-        filtered_orders = []
-        for o in (orders or []):
-            created = getattr(o, "created_at", None)
-            created = to_naive_datetime(created)
-            if actual_start_dt and actual_end_dt:
-                if created and (created >= actual_start_dt and created < actual_end_dt):
-                    filtered_orders.append(o)
-            else:
-                filtered_orders.append(o)
-
-        # 6) total_spending (soma dos orders filtrados)
-        total_spending = 0.0
-        for o in filtered_orders:
-            amt = getattr(o, "amount", 0) or 0
-            try:
-                total_spending += float(amt)
-            except Exception:
-                pass
-
-        # 7) storage summary: agrupar por (name, measure_unit) usando initial/used/current
-        storage_map: Dict[str, Dict[str, float]] = {}
-        for s in (storage_items or []):
-            name = getattr(s, "name", "Desconhecido")
-            origin = getattr(s, "type", "") or ""
-            initial_q = float(getattr(s, "initial_quantity", 0) or 0)
-            used_q = float(getattr(s, "used_quantity", 0) or 0)
-            current_q = max(0.0, initial_q - used_q)
-            measure_unit = getattr(s, "measure_unit", None) or getattr(s, "measureUnit", None) or None
-
-            key_str = f"{name}||{measure_unit or ''}"
-            if key_str not in storage_map:
-                storage_map[key_str] = {
-                    "name": name,
-                    "measure_unit": measure_unit,
-                    "bought": 0.0,
-                    "donated": 0.0,
-                    "current": 0.0
-                }
-
-            if isinstance(origin, str) and origin.lower().startswith("doa"):
-                storage_map[key_str]["donated"] += initial_q
-            else:
-                storage_map[key_str]["bought"] += initial_q
-
-            storage_map[key_str]["current"] += current_q
+        sources = {
+            "units": UnitService.list_units(),
+            "storage": (
+                ReportAggregateRepository.list_storage_summary()
+                if REPORT_DB_AGGREGATION
+                else StorageService.list_all_storage()
+            ),
+            "budgets": BudgetService.list_budgets(initial_date=initial_date, final_date=final_date),
+            "frequencies": FrequencyService.list_frequencies(initial_date=freq_initial_date, final_date=freq_final_date),
+        }
+        if not REPORT_DB_AGGREGATION:
+            sources["orders"] = OrderService.list_orders()
+
+        started = time.perf_counter()
+        try:
+            results = dict(zip(sources, await asyncio.gather(
+                *(fetch_source(name, coro, timings) for name, coro in sources.items())
+            )))
+            budgets = results["budgets"]
+
+            range_start, range_end = effective_range(budgets, start_dt, end_dt)
+            if REPORT_DB_AGGREGATION:
+                order_aggregates = await fetch_source(
+                    "orders",
+                    ReportAggregateRepository.get_order_aggregates(None, range_start, range_end),
+                    timings,
+                )
+        finally:
+            timings["total"] = (time.perf_counter() - started) * 1000.0
+
+        started = time.perf_counter()
+        # agrupa cada fonte por unidade em uma passada
+        if REPORT_DB_AGGREGATION:
+            storage_by_unit: Dict[str, List[Dict[str, Any]]] = {}
+            for item in results["storage"] or []:
+                storage_by_unit.setdefault(item["unit_id"], []).append(item)
+        else:
+            storage_by_unit = StorageColumns(results["storage"]).groups_by_unit()
+            order_aggregates = OrderColumns(results["orders"]).totals_by_unit(range_start, range_end)
+        frequencies_by_unit: Dict[str, List[Any]] = {}
+        for freq in results["frequencies"] or []:
+            frequencies_by_unit.setdefault(freq.unit_id, []).append(freq)
+
+        reports: List[ReportByUnit] = []
+        totals = NetworkTotals()
+        attendance = 0.0
+        for unit in results["units"] or []:
+            report = ReportsService.assemble_report(
+                unit.id,
+                unit,
+                storage_by_unit.get(unit.id, []),
+                order_aggregates.get(unit.id) or empty_order_totals(),
+                budgets,
+                frequencies_by_unit.get(unit.id, []),
+                month,
+            )
+            reports.append(report)
+
+            capacity = report.metrics.capacity or 0
+            totals.units_count += 1
+            totals.total_capacity += capacity
+            totals.total_spending += report.metrics.total_spending or 0.0
+            totals.packs_budget += report.totals.packs_budget or 0
+            totals.packs_donations += report.totals.packs_donations or 0
+            totals.total_packs += report.totals.total_packs or 0
+            # frequency_pct = média de presença / capacidade: volta à média de presença
+            attendance += (report.metrics.frequency_pct or 0.0) * capacity / 100.0
+
+        # orçamentos são globais: entram uma única vez nos totais da rede
+        totals.budget_total = float(sum(float(getattr(b, "amount", 0) or 0) for b in (budgets or [])))
+        if totals.total_capacity > 0:
+            totals.frequency_pct = attendance / totals.total_capacity * 100.0
+        timings["aggregate"] = (time.perf_counter() - started) * 1000.0
+
+        return ConsolidatedReport(
+            month=month,
+            generated_at=datetime.now(ZoneInfo("America/Sao_Paulo")),
+            totals=totals,
+            units=reports,
+        )
 
+    @staticmethod
+    def assemble_report(
+        unit_id: str,
+        unit: Any,
+        storage_groups: List[Dict[str, Any]],
+        order_totals: Dict[str, Any],
+        budgets: List[Any],
+        frequencies: List[Any],
+        month: Optional[str],
+    ) -> ReportByUnit:
+        """
+        Monta o ReportByUnit a partir do estoque agrupado por item (summarize_storage ou
+        view report_storage_summary) e dos totais de pedidos (summarize_orders ou RPC
+        report_order_aggregates).
+        """
         storage_summary: List[StorageSummary] = []
-        for v in storage_map.values():
+        for v in storage_groups:
             total_amt = v["bought"] + v["donated"]
             storage_summary.append(StorageSummary(
                 food=v["name"],
@@ -186,7 +499,7 @@ class ReportsService:
         # packs heuristics (usar current para pacotes)
         packs_budget = 0
         packs_donations = 0
-        for v in storage_map.values():
+        for v in storage_groups:
             mu = (v["measure_unit"] or "").lower()
             if "pacote" in mu or "pacotes" in mu or mu == "":
                 # contagem conservadora baseada em current
@@ -202,7 +515,7 @@ class ReportsService:
         total_packs = sum(
             int(round(v["current"])) if ((v.get("measure_unit") or "").lower().find("pacote") != -1 or (v.get("measure_unit") or "") == "")
             else 0
-            for v in storage_map.values()
+            for v in storage_groups
         )
 
         totals = ReportTotals(
@@ -251,28 +564,11 @@ class ReportsService:
             capacity=capacity,
             frequency_pct=frequency_pct,
             cost_per_capita=cost_per_capita,
-            total_spending=total_spending
+            total_spending=order_totals["total_spending"]
         )
 
         # 9) recent orders
-        order_summaries: List[OrderSummary] = []
-        def order_key(o):
-            created = getattr(o, "created_at", None)
-            created = to_naive_datetime(created)
-            return created or datetime.min
-
-        sorted_orders = sorted(filtered_orders, key=order_key, reverse=True)[:10]
-        for o in sorted_orders:
-            created = getattr(o, "created_at", None)
-            created = to_naive_datetime(created)
-            items = getattr(o, "items", None)
-            items_count = len(items) if isinstance(items, (list, tuple)) else getattr(o, "items_count", None)
-            order_summaries.append(OrderSummary(
-                id=str(getattr(o, "id", "")),
-                date=created,
-                amount=float(getattr(o, "amount", 0) or 0),
-                items_count=items_count
-            ))
+        order_summaries: List[OrderSummary] = order_totals["recent_orders"]
 
         # 10) monthly comparison
         month_map: Dict[str, Dict[str, float]] = {}
@@ -286,15 +582,10 @@ class ReportsService:
                     month_map.setdefault(key, {"budget": 0.0, "spent": 0.0})
                     month_map[key]["budget"] += float(getattr(b, "amount", 0) or 0)
 
-        all_orders_to_count = filtered_orders  # usa apenas pedidos do mês filtrado
-
-        for o in all_orders_to_count:
-            created = getattr(o, "created_at", None)
-            created_dt = to_naive_datetime(created)
-            if created_dt:
-                key = f"{created_dt.year:04d}-{created_dt.month:02d}"
-                month_map.setdefault(key, {"budget": 0.0, "spent": 0.0})
-                month_map[key]["spent"] += float(getattr(o, "amount", 0) or 0)
+        # usa apenas pedidos do período filtrado
+        for key, spent in order_totals["monthly_spent"].items():
+            month_map.setdefault(key, {"budget": 0.0, "spent": 0.0})
+            month_map[key]["spent"] += spent
 
         monthly_comparison: List[MonthlyComparison] = []
         for k in sorted(month_map.keys()):
@@ -328,7 +619,5 @@ class ReportsService:
             recent_orders=order_summaries,
             frequencies=frequency_summaries
         )
-        
-        print(report.metrics)
 
         return report
@@ -1,8 +1,10 @@
-from typing import List
+from typing import Dict, List, Optional, Tuple
 from fastapi import HTTPException
+from lib.pagination import build_next_cursor
 from repositories.storage_repository import StorageRepository
 from entities.models.storage import Storage
 from entities.dtos.storage_dto import (
+    StorageBulkEntryDTO,
     StorageEntryDTO,
     StorageExitDTO,
     StorageResponseDTO,
@@ -12,36 +14,63 @@ from datetime import datetime
 
 class StorageService:
 
+    @staticmethod
+    def to_response(item: Storage) -> StorageResponseDTO:
+        """
+        Converte um Storage em StorageResponseDTO (com current_quantity calculada).
+        """
+        return StorageResponseDTO(
+            id=item.id,
+            name=item.name,
+            amount=item.amount,
+            unit_id=item.unit_id,
+            type=item.type,
+            initial_quantity=item.initial_quantity,
+            used_quantity=item.used_quantity,
+            current_quantity=(item.initial_quantity - item.used_quantity),
+            created_at=item.created_at.isoformat() if item.created_at else None,
+            updated_at=item.updated_at.isoformat() if item.updated_at else None,
+        )
+
     @staticmethod
     async def get_storage_by_unit(unit_id: str) -> List[StorageResponseDTO]:
         """
         Lista todos os itens de estoque de uma unidade.
         Retorna lista de StorageResponseDTO.
         """
-        storage_items = await StorageRepository.get_storage_by_unit(unit_id)
-
-        return [
-            StorageResponseDTO(
-                id=item.id,
-                name=item.name,
-                amount=item.amount,
-                unit_id=item.unit_id,
-                type=item.type,
-                initial_quantity=item.initial_quantity,
-                used_quantity=item.used_quantity,
-                current_quantity=(item.initial_quantity - item.used_quantity),
-                created_at=item.created_at.isoformat() if item.created_at else None,
-                updated_at=item.updated_at.isoformat() if item.updated_at else None,
-            )
-            for item in storage_items
-        ]
+        items, _ = await StorageService.get_storage_page(unit_id)
+        return items
+
+    @staticmethod
+    async def get_storage_page(
+        unit_id: str,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[StorageResponseDTO], Optional[str]]:
+        """
+        Lista itens de estoque da unidade com paginação por cursor (sem `limit`, retorna todos).
+        Retorna (lista de StorageResponseDTO, cursor da próxima página ou None).
+        """
+        storage_items = await StorageRepository.get_storage_by_unit(unit_id, limit=limit, cursor=cursor)
+
+        items = [StorageService.to_response(item) for item in storage_items]
+        return items, build_next_cursor(storage_items, limit)
+
+    @staticmethod
+    async def list_all_storage() -> List[StorageResponseDTO]:
+        """
+        Lista os itens de estoque de todas as unidades.
+        Retorna lista de StorageResponseDTO.
+        """
+        return [StorageService.to_response(item) for item in await StorageRepository.list_all_storage()]
 
     @staticmethod
     async def register_entry(dto: StorageEntryDTO) -> StorageResponseDTO:
         """
         Registra entrada de estoque.
-        Se o item já existe (mesmo name + unit_id), incrementa initial_quantity.
-        Caso contrário, cria um novo registro.
+        Se o item já existe (mesmo name + unit_id), incrementa initial_quantity
+        (incremento 0 gera 400). Caso contrário, cria um novo registro (upsert em uma
+        única ida ao banco).
         Retorna o item atualizado ou criado.
         """
         # Valida o tipo de entrada (opcional, mantive a validação)
@@ -52,105 +81,75 @@ class StorageService:
             )
 
         try:
-            existing = await StorageRepository.get_storage_item(dto.unit_id, dto.name)
-            if existing:
-                # Incrementa initial_quantity; também atualiza preço (amount) e type se vierem no DTO
-                updated = await StorageRepository.increment_initial_quantity(
-                    storage_id=existing.id,
-                    increment=dto.initial_quantity,
-                    new_amount=dto.amount,
-                    new_type=dto.type,
-                )
-
-                return StorageResponseDTO(
-                    id=updated.id,
-                    name=updated.name,
-                    amount=updated.amount,
-                    unit_id=updated.unit_id,
-                    type=updated.type,
-                    initial_quantity=updated.initial_quantity,
-                    used_quantity=updated.used_quantity,
-                    current_quantity=(updated.initial_quantity - updated.used_quantity),
-                    created_at=updated.created_at.isoformat() if updated.created_at else None,
-                    updated_at=updated.updated_at.isoformat() if updated.updated_at else None,
-                )
-            else:
-                # Cria novo item
-                created = await StorageRepository.create_storage_item(
-                    unit_id=dto.unit_id,
-                    name=dto.name,
-                    amount=dto.amount,
-                    type=dto.type,
-                    initial_quantity=dto.initial_quantity,
-                )
-                return StorageResponseDTO(
-                    id=created.id,
-                    name=created.name,
-                    amount=created.amount,
-                    unit_id=created.unit_id,
-                    type=created.type,
-                    initial_quantity=created.initial_quantity,
-                    used_quantity=created.used_quantity,
-                    current_quantity=(created.initial_quantity - created.used_quantity),
-                    created_at=created.created_at.isoformat() if created.created_at else None,
-                    updated_at=created.updated_at.isoformat() if created.updated_at else None,
-                )
+            # Cria o item ou incrementa initial_quantity (amount/type de item existente são mantidos)
+            items = await StorageRepository.upsert_storage_items(
+                dto.unit_id,
+                [{
+                    "name": dto.name,
+                    "amount": dto.amount,
+                    "type": dto.type,
+                    "initial_quantity": dto.initial_quantity,
+                }],
+            )
+            if not items:
+                raise HTTPException(status_code=500, detail="Erro ao registrar entrada no estoque")
+            return StorageService.to_response(items[0])
         except HTTPException:
             raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Erro ao registrar entrada: {str(e)}")
 
+    @staticmethod
+    async def register_entries(dto: StorageBulkEntryDTO) -> List[StorageResponseDTO]:
+        """
+        Registra a entrada de vários itens de uma vez (ex.: uma nota fiscal inteira).
+        Cada item é criado ou tem initial_quantity incrementada, tudo em um único comando.
+        Retorna os itens na ordem da requisição (nomes repetidos são somados).
+        """
+        if dto.type not in ["comprado", "doado"]:
+            raise HTTPException(
+                status_code=400,
+                detail="Tipo de entrada deve ser 'comprado' ou 'doado'",
+            )
+
+        try:
+            items = await StorageRepository.upsert_storage_items(
+                dto.unit_id,
+                [
+                    {
+                        "name": item.name,
+                        "amount": item.amount,
+                        "type": dto.type,
+                        "initial_quantity": item.initial_quantity,
+                    }
+                    for item in dto.items
+                ],
+            )
+
+            by_name = {item.name: item for item in items}
+            names = dict.fromkeys(item.name for item in dto.items)
+            return [StorageService.to_response(by_name[name]) for name in names if name in by_name]
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Erro ao registrar entradas: {str(e)}")
+
     @staticmethod
     async def register_exit(dto: StorageExitDTO) -> List[StorageResponseDTO]:
         """
         Registra saída de estoque.
-        Para cada item na lista, incrementa used_quantity (consumo).
-        Valida disponibilidade antes de cada incremento.
+        Incrementa used_quantity (consumo) de todos os itens em uma única operação
+        atômica: se algum item não existir ou não tiver saldo, nenhum é alterado.
         """
-        updated_items: List[StorageResponseDTO] = []
-
+        # soma itens repetidos, preservando a ordem da requisição
+        quantities: Dict[str, int] = {}
         for item in dto.items:
-            try:
-                existing = await StorageRepository.get_storage_item(dto.unit_id, item.name)
-                if not existing:
-                    raise HTTPException(status_code=404, detail=f"Item '{item.name}' não encontrado")
-
-                # calcular novo used_quantity (incremental)
-                new_used_quantity = existing.used_quantity + item.used_quantity
-
-                # valida e aplica
-                updated = await StorageRepository.update_storage_used_quantity(
-                    storage_id=existing.id,
-                    new_used_quantity=new_used_quantity,
-                )
-
-                updated_items.append(
-                    StorageResponseDTO(
-                        id=updated.id,
-                        name=updated.name,
-                        amount=updated.amount,
-                        unit_id=updated.unit_id,
-                        type=updated.type,
-                        initial_quantity=updated.initial_quantity,
-                        used_quantity=updated.used_quantity,
-                        current_quantity=(updated.initial_quantity - updated.used_quantity),
-                        created_at=updated.created_at.isoformat() if updated.created_at else None,
-                        updated_at=updated.updated_at.isoformat() if updated.updated_at else None,
-                    )
-                )
-            except HTTPException as e:
-                # Propaga o erro com contexto do item
-                raise HTTPException(
-                    status_code=e.status_code,
-                    detail=f"Erro ao processar item '{item.name}': {e.detail}",
-                )
-            except Exception as e:
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Erro inesperado ao processar item '{item.name}': {str(e)}",
-                )
-
-        return updated_items
+            quantities[item.name] = quantities.get(item.name, 0) + item.used_quantity
+
+        updated = await StorageRepository.register_exit(dto.unit_id, quantities)
+
+        by_name = {item.name: item for item in updated}
+        return [StorageService.to_response(by_name[name]) for name in quantities if name in by_name]
 
     @staticmethod
     async def get_item_by_name_and_unit(unit_id: str, name: str) -> StorageResponseDTO:
@@ -162,18 +161,7 @@ class StorageService:
         if not item:
             raise HTTPException(status_code=404, detail="Item de estoque não encontrado")
 
-        return StorageResponseDTO(
-            id=item.id,
-            name=item.name,
-            amount=item.amount,
-            unit_id=item.unit_id,
-            type=item.type,
-            initial_quantity=item.initial_quantity,
-            used_quantity=item.used_quantity,
-            current_quantity=(item.initial_quantity - item.used_quantity),
-            created_at=item.created_at.isoformat() if item.created_at else None,
-            updated_at=item.updated_at.isoformat() if item.updated_at else None,
-        )
+        return StorageService.to_response(item)
 
     @staticmethod
     async def add_new_item(
@@ -195,18 +183,7 @@ class StorageService:
                 type=type,
                 initial_quantity=initial_quantity,
             )
-            return StorageResponseDTO(
-                id=item.id,
-                name=item.name,
-                amount=item.amount,
-                unit_id=item.unit_id,
-                type=item.type,
-                initial_quantity=item.initial_quantity,
-                used_quantity=item.used_quantity,
-                current_quantity=(item.initial_quantity - item.used_quantity),
-                created_at=item.created_at.isoformat() if item.created_at else None,
-                updated_at=item.updated_at.isoformat() if item.updated_at else None,
-            )
+            return StorageService.to_response(item)
         except HTTPException:
             raise
         except Exception as e:
@@ -231,18 +208,7 @@ class StorageService:
                 new_used_quantity=used_quantity,
             )
 
-            return StorageResponseDTO(
-                id=updated_item.id,
-                name=updated_item.name,
-                amount=updated_item.amount,
-                unit_id=updated_item.unit_id,
-                type=updated_item.type,
-                initial_quantity=updated_item.initial_quantity,
-                used_quantity=updated_item.used_quantity,
-                current_quantity=(updated_item.initial_quantity - updated_item.used_quantity),
-                created_at=updated_item.created_at.isoformat() if updated_item.created_at else None,
-                updated_at=updated_item.updated_at.isoformat() if updated_item.updated_at else None,
-            )
+            return StorageService.to_response(updated_item)
         except HTTPException:
             raise
         except Exception as e:
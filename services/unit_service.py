@@ -1,5 +1,7 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from fastapi import HTTPException
+from lib.pagination import build_next_cursor
+from lib.auth import invalidate_principals
 from repositories.unit_repository import UnitRepository
 from entities.dtos.unit_dto import (
     UnitCreateDTO,
@@ -12,8 +14,17 @@ class UnitService:
 
     @staticmethod
     async def list_units(unit_type: Optional[str] = None) -> List[UnitResponseDTO]:
-        units = await UnitRepository.list_units(unit_type)
-        return [
+        units, _ = await UnitService.list_units_page(unit_type)
+        return units
+
+    @staticmethod
+    async def list_units_page(
+        unit_type: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[UnitResponseDTO], Optional[str]]:
+        units = await UnitRepository.list_units(unit_type, limit=limit, cursor=cursor)
+        items = [
             UnitResponseDTO(
                 id=unit.id,
                 name=unit.name,
@@ -25,6 +36,7 @@ class UnitService:
             )
             for unit in units
         ]
+        return items, build_next_cursor(units, limit)
 
     @staticmethod
     async def get_unit_by_id(unit_id: str) -> UnitResponseDTO:
@@ -74,6 +86,8 @@ class UnitService:
     @staticmethod
     async def delete_unit(unit_id: str) -> None:
         await UnitRepository.delete_unit(unit_id)
+        # as associações da unidade somem junto: descarta as unidades em cache dos usuários
+        invalidate_principals()
 
     @staticmethod
     async def get_unit_by_name(name: str) -> UnitResponseDTO:
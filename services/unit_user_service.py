@@ -1,11 +1,13 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from fastapi import HTTPException
+from lib.pagination import build_next_cursor
 from repositories.unit_user_repository import UnitUserRepository
 from repositories.user_repository import UserRepository
 from repositories.unit_repository import UnitRepository
 from entities.dtos.unit_user_dto import UnitUserCreateDTO, UnitUserResponseDTO, UnitUserUpdateDTO
 from entities.dtos.unit_dto import UnitResponseDTO
 from entities.dtos.user_dto import UserResponseDTO
+from lib.auth import invalidate_principals
 from zoneinfo import ZoneInfo
 
 def to_brazil(dt):
@@ -33,6 +35,7 @@ class UnitUserService:
                 raise HTTPException(status_code=400, detail="Associação usuário-unidade já existe")
 
         unit_user = await UnitUserRepository.create_unit_user(dto.unit_id, dto.user_id, dto.role)
+        invalidate_principals(dto.user_id)
         return UnitUserResponseDTO(
             id=unit_user.id,
             unit_id=unit_user.unit_id,
@@ -44,8 +47,16 @@ class UnitUserService:
 
     @staticmethod
     async def list_all_unit_users() -> List[UnitUserResponseDTO]:
-        unit_users = await UnitUserRepository.list_all_unit_users()
-        return [
+        unit_users, _ = await UnitUserService.list_unit_users_page()
+        return unit_users
+
+    @staticmethod
+    async def list_unit_users_page(
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[UnitUserResponseDTO], Optional[str]]:
+        unit_users = await UnitUserRepository.list_all_unit_users(limit=limit, cursor=cursor)
+        items = [
             UnitUserResponseDTO(
                 id=unit_user.id,
                 unit_id=unit_user.unit_id,
@@ -55,6 +66,7 @@ class UnitUserService:
                 updated_at=to_brazil(unit_user.updated_at),
             ) for unit_user in unit_users
         ]
+        return items, build_next_cursor(unit_users, limit)
 
     @staticmethod
     async def update_unit_user(unit_user_id: str, dto: UnitUserUpdateDTO) -> UnitUserResponseDTO:
@@ -62,6 +74,7 @@ class UnitUserService:
         unit_user = await UnitUserRepository.update_unit_user(unit_user_id, dto.role)
         if not unit_user:
             raise HTTPException(status_code=404, detail="Associação não encontrada")
+        invalidate_principals(unit_user.user_id)
 
         return UnitUserResponseDTO(
             id=unit_user.id,
@@ -126,4 +139,6 @@ class UnitUserService:
 
     @staticmethod
     async def delete_unit_user(unit_user_id: str) -> None:
-        await UnitUserRepository.delete_unit_user(unit_user_id)
\ No newline at end of file
+        unit_user = await UnitUserRepository.get_unit_user_by_id(unit_user_id)
+        await UnitUserRepository.delete_unit_user(unit_user_id)
+        invalidate_principals(unit_user.user_id if unit_user else None)
\ No newline at end of file
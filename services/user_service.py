@@ -1,22 +1,39 @@
+from typing import TYPE_CHECKING, Optional
 from fastapi import HTTPException
-from passlib.context import CryptContext
 from entities.models.user import User
 from repositories.user_repository import UserRepository
-from lib.supabase_client import supabase
+from lib.supabase_client import supabase, execute
+from lib.password_pool import run_in_password_pool
+from lib.auth import invalidate_principals
 
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+_pwd_context: Optional["CryptContext"] = None
+
+
+def get_pwd_context() -> "CryptContext":
+    """Contexto bcrypt do passlib, criado no primeiro hash/verificação (fora do cold start)."""
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+
+        _pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return _pwd_context
 
 
 class UserService:
 
     @staticmethod
-    def hash_password(password: str) -> str:
-        return pwd_context.hash(password)
+    async def hash_password(password: str) -> str:
+        """Gera o hash bcrypt da senha no pool dedicado."""
+        return await run_in_password_pool(get_pwd_context().hash, password)
 
     @staticmethod
-    def verify_password(plain_password: str, hashed_password: str) -> bool:
-        return pwd_context.verify(plain_password, hashed_password)
+    async def verify_password(plain_password: str, hashed_password: str) -> bool:
+        """Verifica a senha contra o hash bcrypt no pool dedicado."""
+        return await run_in_password_pool(get_pwd_context().verify, plain_password, hashed_password)
 
     @staticmethod
     async def register_user(email: str, password: str, username: str, role: str) -> User | None:
@@ -25,7 +42,7 @@ class UserService:
         if existing_user_record:
             raise HTTPException(status_code=400, detail="User with this email already exists.")
 
-        hashed_password = UserService.hash_password(password)
+        hashed_password = await UserService.hash_password(password)
 
         created_user_record = await UserRepository.create_user(
             email=email,
@@ -42,7 +59,7 @@ class UserService:
         if not user_record:
             return None
 
-        if not UserService.verify_password(password, user_record.password):
+        if not await UserService.verify_password(password, user_record.password):
             return None
 
         return user_record
@@ -63,7 +80,7 @@ class UserService:
             query = query.eq("role", role)
 
 
-        response = query.execute()
+        response = await execute(query)
         if not response.data:
             return []
 
@@ -89,12 +106,17 @@ class UserService:
         if not payload:
             raise HTTPException(status_code=400, detail="Nenhum campo para atualizar")
 
-        response = (
-            supabase.table(UserRepository.TABLE_NAME)
-            .update(payload)
-            .eq("id", user_id)
-            .execute()
-        )
+        UserRepository.cache.invalidate(user_id)
+        try:
+            response = await execute(
+                supabase.table(UserRepository.TABLE_NAME)
+                .update(payload)
+                .eq("id", user_id)
+            )
+        finally:
+            # de novo após a escrita: uma leitura concorrente pode ter recolocado a linha antiga
+            UserRepository.cache.invalidate(user_id)
+        invalidate_principals(user_id)
 
         if not response.data:
             raise HTTPException(status_code=500, detail="Erro ao atualizar usuário no Supabase")
@@ -103,3 +125,9 @@ class UserService:
             return User(**response.data[0])
         except Exception:
             return None
+
+    @staticmethod
+    async def delete_user(user_id: str) -> None:
+        """Remove o usuário e encerra as sessões autenticadas em cache."""
+        await UserRepository.delete_user(user_id)
+        invalidate_principals(user_id)
@@ -0,0 +1,49 @@
+-- Snapshots materializados dos relatórios mensais por unidade.
+-- Usados por ReportsService.get_unit_report para meses já encerrados.
+-- Guardam só os dados do mês (orçamentos, frequências e totais de pedidos);
+-- unidade e estoque são sempre lidos na hora.
+--
+-- payload NULL = snapshot invalidado (ou ainda em geração). Cada invalidação
+-- incrementa version; a gravação só acontece se version não mudou desde que a
+-- geração começou (ReportSnapshotRepository.save_snapshot).
+CREATE TABLE IF NOT EXISTS public.report_snapshots (
+  unit_id uuid NOT NULL,
+  month text NOT NULL, -- formato YYYY-MM
+  payload jsonb,
+  version bigint NOT NULL DEFAULT 0,
+  -- intervalo [range_start, range_end) dos pedidos agregados (horário UTC, sem fuso);
+  -- NULL = todos os pedidos
+  range_start timestamp,
+  range_end timestamp,
+  created_at timestamp with time zone NOT NULL DEFAULT now(),
+  updated_at timestamp with time zone NOT NULL DEFAULT now(),
+  CONSTRAINT report_snapshots_pkey PRIMARY KEY (unit_id, month),
+  CONSTRAINT report_snapshots_unit_id_fkey FOREIGN KEY (unit_id)
+    REFERENCES public.units (id) ON DELETE CASCADE
+);
+
+-- Invalida snapshots: payload volta a NULL e version é incrementada, para que uma
+-- geração em andamento não grave dados anteriores à alteração.
+-- Usado por ReportSnapshotRepository.invalidate. Parâmetros NULL não filtram:
+--   p_unit_id - só a unidade
+--   p_months  - só esses meses (YYYY-MM)
+--   p_at      - só snapshots cujo intervalo de pedidos contém o instante (UTC, sem fuso)
+CREATE OR REPLACE FUNCTION public.invalidate_report_snapshots(
+  p_unit_id uuid DEFAULT NULL,
+  p_months text[] DEFAULT NULL,
+  p_at timestamp DEFAULT NULL
+)
+RETURNS void
+LANGUAGE sql
+AS $$
+  UPDATE public.report_snapshots r
+  SET payload = NULL,
+      version = r.version + 1,
+      updated_at = now()
+  WHERE (p_unit_id IS NULL OR r.unit_id = p_unit_id)
+    AND (p_months IS NULL OR r.month = ANY (p_months))
+    AND (
+      p_at IS NULL OR r.range_start IS NULL OR r.range_end IS NULL
+      OR (p_at >= r.range_start AND p_at < r.range_end)
+    );
+$$;
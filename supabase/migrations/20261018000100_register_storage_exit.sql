@@ -0,0 +1,75 @@
+-- Saída de estoque em lote, atômica.
+-- Usada por StorageRepository.register_exit (StorageService.register_exit).
+--
+-- p_items: [{"name": "...", "used_quantity": 3}, ...] (nomes repetidos são somados)
+-- Trava as linhas do estoque (FOR UPDATE, em ordem de id) antes de validar,
+-- então saídas concorrentes não conseguem consumir além da quantidade inicial.
+-- Quantidades NULL (no estoque ou na requisição) contam como 0.
+-- Erros (o PostgREST converte o SQLSTATE PTxxx no status HTTP xxx):
+--   PT404 - item não encontrado na unidade
+--   PT400 - quantidade solicitada maior que a disponível
+CREATE OR REPLACE FUNCTION public.register_storage_exit(p_unit_id uuid, p_items jsonb)
+RETURNS SETOF public.storage
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_names text[];
+  v_quantities integer[];
+  v_missing text;
+  v_row record;
+BEGIN
+  SELECT array_agg(x.name ORDER BY x.name), array_agg(x.quantity ORDER BY x.name)
+    INTO v_names, v_quantities
+  FROM (
+    SELECT r.name, coalesce(sum(r.used_quantity), 0)::integer AS quantity
+    FROM jsonb_to_recordset(p_items) AS r(name text, used_quantity integer)
+    GROUP BY r.name
+  ) AS x;
+
+  IF v_names IS NULL THEN
+    RETURN;
+  END IF;
+
+  PERFORM 1
+  FROM public.storage s
+  WHERE s.unit_id = p_unit_id AND s.name = ANY (v_names)
+  ORDER BY s.id
+  FOR UPDATE;
+
+  SELECT req.name INTO v_missing
+  FROM unnest(v_names) AS req(name)
+  WHERE NOT EXISTS (
+    SELECT 1 FROM public.storage s WHERE s.unit_id = p_unit_id AND s.name = req.name
+  )
+  LIMIT 1;
+
+  IF v_missing IS NOT NULL THEN
+    RAISE EXCEPTION 'Item ''%'' não encontrado', v_missing USING ERRCODE = 'PT404';
+  END IF;
+
+  SELECT s.name,
+         coalesce(s.initial_quantity, 0) AS initial_quantity,
+         coalesce(s.used_quantity, 0) AS used_quantity,
+         req.quantity
+    INTO v_row
+  FROM public.storage s
+  JOIN unnest(v_names, v_quantities) AS req(name, quantity) ON req.name = s.name
+  WHERE s.unit_id = p_unit_id
+    AND coalesce(s.used_quantity, 0) + req.quantity > coalesce(s.initial_quantity, 0)
+  LIMIT 1;
+
+  IF FOUND THEN
+    RAISE EXCEPTION 'Quantidade indisponível para o item ''%''. Disponível: %, Solicitada: %',
+      v_row.name, v_row.initial_quantity - v_row.used_quantity, v_row.quantity
+      USING ERRCODE = 'PT400';
+  END IF;
+
+  RETURN QUERY
+  UPDATE public.storage s
+  SET used_quantity = coalesce(s.used_quantity, 0) + req.quantity,
+      updated_at = now()
+  FROM unnest(v_names, v_quantities) AS req(name, quantity)
+  WHERE s.unit_id = p_unit_id AND s.name = req.name
+  RETURNING s.*;
+END;
+$$;
@@ -0,0 +1,87 @@
+-- Entrada de estoque por upsert em (unit_id, name).
+-- Usada por StorageRepository.upsert_storage_items (StorageService.register_entry/register_entries).
+
+-- 1) A chave única exige um único registro por (unit_id, name). Duplicados não são
+--    mesclados aqui (type/amount/quantidades divergentes precisam de decisão manual):
+--    a migration falha e lista os pares. Para ver todos:
+--      SELECT unit_id, name, count(*), array_agg(id ORDER BY created_at) AS ids,
+--             array_agg(DISTINCT type) AS types
+--      FROM public.storage
+--      GROUP BY unit_id, name
+--      HAVING count(*) > 1;
+--    Depois de resolver à mão, rode a migration de novo.
+DO $$
+DECLARE
+  v_duplicates text;
+BEGIN
+  SELECT string_agg(format('%s/%s (%s registros)', d.unit_id, d.name, d.total), ', ')
+    INTO v_duplicates
+  FROM (
+    SELECT unit_id, name, count(*) AS total
+    FROM public.storage
+    GROUP BY unit_id, name
+    HAVING count(*) > 1
+    ORDER BY unit_id, name
+    LIMIT 50
+  ) AS d;
+
+  IF v_duplicates IS NOT NULL THEN
+    RAISE EXCEPTION 'public.storage tem itens duplicados por (unit_id, name): %', v_duplicates
+      USING HINT = 'Resolva os duplicados manualmente (consulta no cabeçalho desta migration) e rode a migration de novo.';
+  END IF;
+END;
+$$;
+
+-- 2) Chave única usada pelo ON CONFLICT
+CREATE UNIQUE INDEX IF NOT EXISTS storage_unit_id_name_key
+  ON public.storage (unit_id, name);
+
+-- 3) Cria ou incrementa vários itens em um único comando.
+-- p_items: [{"name": "...", "amount": 10.5, "type": "doado", "initial_quantity": 3}, ...]
+-- Nomes repetidos são somados. Item novo: amount/type do último valor informado.
+-- Item existente: só initial_quantity é incrementada; amount e type do registro são
+-- mantidos (uma doação não muda o tipo do que já foi comprado nem reprecifica o saldo).
+-- initial_quantity 0 é aceita para item novo; para item existente (incremento) gera
+-- PT400 - increment deve ser maior que 0 (o PostgREST converte em HTTP 400).
+CREATE OR REPLACE FUNCTION public.upsert_storage_entries(p_unit_id uuid, p_items jsonb)
+RETURNS SETOF public.storage
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF EXISTS (
+    SELECT 1
+    FROM (
+      SELECT x.value->>'name' AS name,
+             coalesce(sum((x.value->>'initial_quantity')::integer), 0) AS initial_quantity
+      FROM jsonb_array_elements(p_items) AS x(value)
+      GROUP BY 1
+    ) AS e
+    JOIN public.storage s ON s.unit_id = p_unit_id AND s.name = e.name
+    WHERE e.initial_quantity <= 0
+  ) THEN
+    RAISE EXCEPTION 'increment deve ser maior que 0' USING ERRCODE = 'PT400';
+  END IF;
+
+  RETURN QUERY
+  INSERT INTO public.storage AS s (unit_id, name, amount, type, initial_quantity, used_quantity)
+  SELECT p_unit_id,
+         e.name,
+         (array_agg(e.amount ORDER BY e.ord DESC))[1],
+         (array_agg(e.type ORDER BY e.ord DESC))[1],
+         coalesce(sum(e.initial_quantity), 0)::integer,
+         0
+  FROM (
+    SELECT x.value->>'name' AS name,
+           (x.value->>'amount')::numeric AS amount,
+           x.value->>'type' AS type,
+           (x.value->>'initial_quantity')::integer AS initial_quantity,
+           x.ord
+    FROM jsonb_array_elements(p_items) WITH ORDINALITY AS x(value, ord)
+  ) AS e
+  GROUP BY e.name
+  ON CONFLICT (unit_id, name) DO UPDATE
+  SET initial_quantity = coalesce(s.initial_quantity, 0) + excluded.initial_quantity,
+      updated_at = now()
+  RETURNING s.*;
+END;
+$$;
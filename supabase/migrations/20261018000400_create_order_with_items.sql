@@ -0,0 +1,55 @@
+-- Criação de pedido com todos os itens em uma única transação.
+-- Usada por OrderRepository.create_order_with_items (OrderService.create_order).
+--
+-- p_order: {"description", "amount", "unit_id", "budget_id"}
+-- p_items: [{"description", "amount", "measure_unit", "received"}, ...]
+-- Como no insert do PostgREST, só as chaves presentes entram no INSERT: chaves
+-- ausentes ficam com o DEFAULT da coluna (chaves com null explícito gravam NULL).
+-- Retorna {"order": {...}, "items": [...]} com os registros criados.
+CREATE OR REPLACE FUNCTION public.create_order_with_items(p_order jsonb, p_items jsonb DEFAULT '[]'::jsonb)
+RETURNS jsonb
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_order public.orders;
+  v_item public.order_items;
+  v_item_data jsonb;
+  v_columns text[];
+  v_items jsonb := '[]'::jsonb;
+BEGIN
+  SELECT array_agg(k ORDER BY k) INTO v_columns
+  FROM jsonb_object_keys(coalesce(p_order, '{}'::jsonb)) AS k
+  WHERE k IN ('description', 'amount', 'unit_id', 'budget_id');
+
+  IF v_columns IS NULL THEN
+    INSERT INTO public.orders DEFAULT VALUES RETURNING * INTO v_order;
+  ELSE
+    EXECUTE format(
+      'INSERT INTO public.orders (%s) SELECT %s FROM jsonb_populate_record(NULL::public.orders, $1) AS r RETURNING *',
+      (SELECT string_agg(format('%I', c), ', ') FROM unnest(v_columns) AS c),
+      (SELECT string_agg(format('r.%I', c), ', ') FROM unnest(v_columns) AS c)
+    ) INTO v_order USING p_order;
+  END IF;
+
+  FOR v_item_data IN
+    SELECT value FROM jsonb_array_elements(coalesce(p_items, '[]'::jsonb))
+  LOOP
+    -- order_id sempre vem do pedido criado
+    v_item_data := v_item_data || jsonb_build_object('order_id', v_order.id);
+
+    SELECT array_agg(k ORDER BY k) INTO v_columns
+    FROM jsonb_object_keys(v_item_data) AS k
+    WHERE k IN ('order_id', 'description', 'amount', 'measure_unit', 'received');
+
+    EXECUTE format(
+      'INSERT INTO public.order_items (%s) SELECT %s FROM jsonb_populate_record(NULL::public.order_items, $1) AS r RETURNING *',
+      (SELECT string_agg(format('%I', c), ', ') FROM unnest(v_columns) AS c),
+      (SELECT string_agg(format('r.%I', c), ', ') FROM unnest(v_columns) AS c)
+    ) INTO v_item USING v_item_data;
+
+    v_items := v_items || jsonb_build_array(to_jsonb(v_item));
+  END LOOP;
+
+  RETURN jsonb_build_object('order', to_jsonb(v_order), 'items', v_items);
+END;
+$$;
@@ -0,0 +1,81 @@
+-- Agregações dos relatórios calculadas no banco.
+-- Usadas por ReportAggregateRepository (ReportsService com REPORT_DB_AGGREGATION=true):
+-- a API recebe poucas linhas de resumo em vez de todo o histórico da unidade.
+
+-- Estoque agrupado por unidade e item, separando comprado/doado pela origem (type).
+-- Mesma regra do relatório em Python: type começando com "doa" é doação, o resto é compra.
+CREATE OR REPLACE VIEW public.report_storage_summary AS
+SELECT
+  s.unit_id,
+  s.name,
+  sum(CASE WHEN lower(coalesce(s.type, '')) LIKE 'doa%' THEN 0 ELSE coalesce(s.initial_quantity, 0) END)::double precision AS bought,
+  sum(CASE WHEN lower(coalesce(s.type, '')) LIKE 'doa%' THEN coalesce(s.initial_quantity, 0) ELSE 0 END)::double precision AS donated,
+  sum(greatest(coalesce(s.initial_quantity, 0) - coalesce(s.used_quantity, 0), 0))::double precision AS current
+FROM public.storage s
+GROUP BY s.unit_id, s.name;
+
+-- Pedidos agregados por unidade no intervalo [p_start, p_end) (horário UTC, sem fuso,
+-- como o relatório em Python). Sem intervalo completo, considera todos os pedidos.
+-- p_unit_id NULL agrega todas as unidades (relatório consolidado).
+-- Retorna, por unidade: gasto total, gasto por mês (YYYY-MM) e os 10 pedidos mais recentes.
+CREATE OR REPLACE FUNCTION public.report_order_aggregates(
+  p_unit_id uuid DEFAULT NULL,
+  p_start timestamp DEFAULT NULL,
+  p_end timestamp DEFAULT NULL
+)
+RETURNS TABLE (
+  unit_id uuid,
+  total_spending double precision,
+  monthly_spent jsonb,
+  recent_orders jsonb
+)
+LANGUAGE sql
+STABLE
+AS $$
+  WITH filtered AS (
+    SELECT o.id,
+           o.unit_id,
+           coalesce(o.amount, 0)::double precision AS amount,
+           (o.created_at AT TIME ZONE 'UTC') AS created_at
+    FROM public.orders o
+    WHERE (p_unit_id IS NULL OR o.unit_id = p_unit_id)
+      AND o.unit_id IS NOT NULL
+      AND (
+        p_start IS NULL OR p_end IS NULL
+        OR ((o.created_at AT TIME ZONE 'UTC') >= p_start AND (o.created_at AT TIME ZONE 'UTC') < p_end)
+      )
+  ),
+  monthly AS (
+    SELECT f.unit_id, to_char(f.created_at, 'YYYY-MM') AS month, sum(f.amount) AS spent
+    FROM filtered f
+    GROUP BY f.unit_id, to_char(f.created_at, 'YYYY-MM')
+  ),
+  ranked AS (
+    SELECT f.*, row_number() OVER (PARTITION BY f.unit_id ORDER BY f.created_at DESC, f.id DESC) AS rn
+    FROM filtered f
+  ),
+  recent AS (
+    SELECT r.unit_id,
+           jsonb_agg(
+             jsonb_build_object(
+               'id', r.id,
+               'date', r.created_at,
+               'amount', r.amount,
+               'items_count', (SELECT nullif(count(*), 0) FROM public.order_items i WHERE i.order_id = r.id)
+             )
+             ORDER BY r.created_at DESC, r.id DESC
+           ) AS orders
+    FROM ranked r
+    WHERE r.rn <= 10
+    GROUP BY r.unit_id
+  )
+  SELECT t.unit_id,
+         t.total_spending,
+         coalesce((SELECT jsonb_object_agg(m.month, m.spent) FROM monthly m WHERE m.unit_id = t.unit_id), '{}'::jsonb),
+         coalesce((SELECT rc.orders FROM recent rc WHERE rc.unit_id = t.unit_id), '[]'::jsonb)
+  FROM (
+    SELECT f.unit_id, sum(f.amount) AS total_spending
+    FROM filtered f
+    GROUP BY f.unit_id
+  ) AS t;
+$$;
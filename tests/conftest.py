@@ -0,0 +1,40 @@
+"""
+Fixtures compartilhadas. Os testes nunca falam com o Supabase real: o backend em
+memória (lib/fake_postgrest) é escolhido antes de qualquer import da aplicação.
+"""
+import os
+
+os.environ["SUPABASE_BACKEND"] = "memory"
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "test")
+
+import pytest
+
+import lib.query_budget as query_budget_module
+from lib.cache import clear_caches
+from lib.supabase_client import fake_backend
+
+
+@pytest.fixture
+def memory_supabase():
+    """Backend em memória vazio (e caches limpos); popular com memory_supabase.seed(tabela, linhas)."""
+    fake_backend.reset()
+    clear_caches()
+    yield fake_backend
+    fake_backend.reset()
+    clear_caches()
+
+
+@pytest.fixture
+def query_budget(monkeypatch):
+    """
+    Liga o orçamento de consultas em QUERY_BUDGET_MODE=raise: a consulta que passar do
+    orçamento (ou repetir o mesmo formato com n_plus_one valores) gera HTTPException(500).
+    Uso: `query_budget(budget=2)` e depois `with track_queries() as stats: ...`.
+    """
+    def configure(budget: int = 0, n_plus_one: int = 3) -> None:
+        monkeypatch.setattr(query_budget_module, "QUERY_BUDGET", budget)
+        monkeypatch.setattr(query_budget_module, "N_PLUS_ONE_THRESHOLD", n_plus_one)
+        monkeypatch.setattr(query_budget_module, "QUERY_BUDGET_MODE", "raise")
+
+    return configure
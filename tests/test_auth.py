@@ -0,0 +1,55 @@
+"""
+Cache de usuários autenticados (lib/auth) com o backend em memória.
+"""
+import asyncio
+
+from lib import auth
+from repositories.unit_user_repository import UnitUserRepository
+from services.jwt_service import JWTService
+
+UNIT_ID = "00000000-0000-0000-0000-0000000000ee"
+
+
+def seed_user(memory_supabase):
+    user = memory_supabase.seed("users", [{
+        "email": "gestor@unas.org.br",
+        "password": "hash-" + "x" * 20,
+        "username": "gestor",
+        "role": "gestor",
+        "active": True,
+        "email_verified": True,
+    }])[0]
+    memory_supabase.seed("unit_users", [{"unit_id": UNIT_ID, "user_id": user["id"], "role": "gestor"}])
+    return user
+
+
+def test_principal_is_cached(memory_supabase):
+    user = seed_user(memory_supabase)
+    token = asyncio.run(JWTService.generate_jwt_token(user["id"]))
+
+    first = asyncio.run(auth.resolve_principal(token))
+    requests = memory_supabase.requests
+    second = asyncio.run(auth.resolve_principal(token))
+
+    assert first.units == second.units == [UNIT_ID]
+    assert memory_supabase.requests == requests
+
+
+def test_revocation_during_lookup_is_not_cached(memory_supabase, monkeypatch):
+    user = seed_user(memory_supabase)
+    token = asyncio.run(JWTService.generate_jwt_token(user["id"]))
+    list_unit_users_by_user = UnitUserRepository.list_unit_users_by_user
+
+    async def revoked_while_reading(user_id):
+        unit_users = await list_unit_users_by_user(user_id)
+        # acesso à unidade revogado enquanto a consulta estava em andamento
+        memory_supabase.table("unit_users").clear()
+        auth.invalidate_principals(user_id)
+        return unit_users
+
+    monkeypatch.setattr(UnitUserRepository, "list_unit_users_by_user", revoked_while_reading)
+    stale = asyncio.run(auth.resolve_principal(token))
+    monkeypatch.setattr(UnitUserRepository, "list_unit_users_by_user", list_unit_users_by_user)
+
+    assert stale.units == [UNIT_ID]
+    assert asyncio.run(auth.resolve_principal(token)).units == []
@@ -0,0 +1,129 @@
+"""
+Outbox de e-mails contra um servidor SMTP local (aiosmtpd), sem TLS nem login.
+"""
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("aiosmtpd")
+from aiosmtpd.controller import Controller
+
+import lib.email_outbox as outbox_module
+from lib.email_outbox import EmailOutbox
+
+
+class CollectingHandler:
+    def __init__(self):
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        return "250 OK"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server(monkeypatch):
+    handler = CollectingHandler()
+    port = free_port()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    monkeypatch.setenv("SMTP_HOST", "127.0.0.1")
+    monkeypatch.setenv("SMTP_PORT", str(port))
+    monkeypatch.setenv("SMTP_SSL", "false")
+    monkeypatch.setenv("SMTP_USER", "noreply@unas.org.br")
+    monkeypatch.delenv("SMTP_PASS", raising=False)
+    monkeypatch.delenv("SMTP_FROM", raising=False)
+    yield handler
+    controller.stop()
+
+
+@pytest.fixture
+def outbox_enabled(monkeypatch):
+    monkeypatch.setattr(outbox_module, "EMAIL_OUTBOX_ENABLED", True)
+
+
+def test_outbox_sends_batch_over_one_connection(smtp_server, outbox_enabled):
+    async def scenario():
+        outbox = EmailOutbox()
+        for i in range(3):
+            await outbox.enqueue(f"user{i}@unas.org.br", f"Assunto {i}", "<p>olá</p>")
+        await outbox.stop()
+        return outbox.stats()
+
+    stats = asyncio.run(scenario())
+
+    assert sorted(m.rcpt_tos[0] for m in smtp_server.messages) == [
+        "user0@unas.org.br", "user1@unas.org.br", "user2@unas.org.br",
+    ]
+    assert stats["sent"] == 3
+    assert stats["connections_opened"] == 1
+
+
+def test_stop_flushes_emails_waiting_for_retry(smtp_server, outbox_enabled, monkeypatch):
+    # backoff longo: sem o flush do stop(), o e-mail ficaria esperando e seria perdido
+    monkeypatch.setattr(outbox_module, "EMAIL_RETRY_BASE_SECONDS", 60)
+
+    async def scenario():
+        outbox = EmailOutbox()
+        real_send = outbox.sender.send
+        failures = []
+
+        def flaky_send(email):
+            if not failures:
+                failures.append(email)
+                raise ConnectionError("conexão recusada")
+            real_send(email)
+
+        outbox.sender.send = flaky_send
+        await outbox.enqueue("retry@unas.org.br", "Assunto", "<p>olá</p>")
+        while outbox.stats()["pending_retries"] == 0:
+            await asyncio.sleep(0.01)
+        await outbox.stop(timeout=5)
+        return outbox.stats()
+
+    stats = asyncio.run(scenario())
+
+    assert [m.rcpt_tos for m in smtp_server.messages] == [["retry@unas.org.br"]]
+    assert stats["retried"] == 1
+    assert stats["sent"] == 1
+    assert stats["pending_retries"] == 0
+
+
+def test_disabled_outbox_sends_inline(smtp_server, monkeypatch):
+    monkeypatch.setattr(outbox_module, "EMAIL_OUTBOX_ENABLED", False)
+
+    async def scenario():
+        outbox = EmailOutbox()
+        await outbox.enqueue("inline@unas.org.br", "Assunto", "<p>olá</p>")
+        # já entregue ao retornar, sem worker em background
+        delivered = [m.rcpt_tos for m in smtp_server.messages]
+        await outbox.stop()
+        return delivered, outbox.stats()
+
+    delivered, stats = asyncio.run(scenario())
+
+    assert delivered == [["inline@unas.org.br"]]
+    assert stats["queue_size"] == 0
+
+
+@pytest.mark.parametrize("vercel, expected", [("1", "False"), (None, "True")])
+def test_outbox_default_depends_on_serverless(vercel, expected):
+    env = {k: v for k, v in os.environ.items() if k not in ("VERCEL", "EMAIL_OUTBOX_ENABLED")}
+    if vercel:
+        env["VERCEL"] = vercel
+    completed = subprocess.run(
+        [sys.executable, "-c", "import lib.email_outbox as m; print(m.EMAIL_OUTBOX_ENABLED)"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=env, capture_output=True, text=True, check=True,
+    )
+    assert completed.stdout.strip() == expected
@@ -0,0 +1,56 @@
+"""
+Rotas de infraestrutura (estatísticas e métricas) exigem administrador.
+"""
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from cmd.main import app
+from lib import auth
+from services.jwt_service import JWTService
+
+INFRA_ROUTES = ["/cache/stats", "/password-pool/stats", "/email/stats", "/metrics"]
+
+
+def token_for(memory_supabase, role):
+    user = memory_supabase.seed("users", [{
+        "email": f"{role}@unas.org.br",
+        "password": "hash-" + "x" * 20,
+        "username": role,
+        "role": role,
+        "active": True,
+        "email_verified": True,
+    }])[0]
+    return asyncio.run(JWTService.generate_jwt_token(user["id"]))
+
+
+@pytest.fixture
+def client(memory_supabase):
+    auth.invalidate_principals()
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("route", INFRA_ROUTES)
+def test_infra_route_requires_token(client, route):
+    assert client.get(route).status_code == 401
+
+
+@pytest.mark.parametrize("route", INFRA_ROUTES)
+def test_infra_route_rejects_non_admin(client, memory_supabase, route):
+    token = token_for(memory_supabase, "voluntario")
+    response = client.get(route, headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 403
+
+
+@pytest.mark.parametrize("route", INFRA_ROUTES)
+def test_infra_route_allows_admin(client, memory_supabase, route):
+    token = token_for(memory_supabase, "gestor")
+    response = client.get(route, headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+
+
+def test_infra_routes_public_flag(client, monkeypatch):
+    monkeypatch.setattr(auth, "INFRA_STATS_PUBLIC", True)
+    for route in INFRA_ROUTES:
+        assert client.get(route).status_code == 200
@@ -0,0 +1,28 @@
+"""
+Criação de pedidos (RPC create_order_with_items) com o backend em memória.
+"""
+import asyncio
+
+from entities.dtos.orders_dto import OrderCreateDTO
+from services.order_service import OrderService
+
+UNIT_ID = "00000000-0000-0000-0000-0000000000ff"
+
+
+def test_create_order_omits_missing_fields(memory_supabase):
+    memory_supabase.seed("units", [{"id": UNIT_ID, "name": "Unidade"}])
+
+    order = asyncio.run(OrderService.create_order(OrderCreateDTO(
+        description="Compra do mês",
+        unit_id=UNIT_ID,
+        items=[{"amount": 2.0}, {"description": "feijão", "amount": 3.0}],
+    )))
+
+    assert order.amount == 5.0
+    assert [(item.description, item.amount) for item in order.items] == [(None, 2.0), ("feijão", 3.0)]
+    # chaves ausentes não são enviadas: no banco, a coluna fica com o DEFAULT
+    stored_order = memory_supabase.table("orders")[0]
+    stored_items = memory_supabase.table("order_items")
+    assert "budget_id" not in stored_order
+    assert "description" not in stored_items[0]
+    assert stored_items[1]["description"] == "feijão"
@@ -0,0 +1,91 @@
+"""
+Paginação keyset (lib/pagination) de ponta a ponta, com o backend em memória.
+"""
+import asyncio
+import base64
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from lib.pagination import decode_cursor, encode_cursor
+from services.order_service import OrderService
+from services.unit_user_service import UnitUserService
+
+UNIT_ID = "00000000-0000-0000-0000-0000000000cc"
+ROW_ID = "00000000-0000-0000-0000-0000000000dd"
+
+
+def raw_cursor(sort_value, row_id) -> str:
+    raw = json.dumps([sort_value, row_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def collect_pages(fetch_page, limit: int):
+    ids, cursor, pages = [], None, 0
+    while True:
+        items, cursor = asyncio.run(fetch_page(limit=limit, cursor=cursor))
+        ids.extend(item.id for item in items)
+        pages += 1
+        if cursor is None:
+            return ids, pages
+
+
+def test_orders_round_trip_with_ties(memory_supabase):
+    # 3 pedidos por timestamp: o id desempata dentro do mesmo created_at
+    memory_supabase.seed("orders", [
+        {"unit_id": UNIT_ID, "description": f"pedido {i}", "amount": 1.0,
+         "created_at": f"2026-0{1 + i // 3}-01T12:00:00+00:00"}
+        for i in range(10)
+    ])
+
+    ids, pages = collect_pages(
+        lambda limit, cursor: OrderService.list_orders_page(unit_id=UNIT_ID, limit=limit, cursor=cursor),
+        limit=3,
+    )
+
+    expected = sorted(
+        memory_supabase.table("orders"),
+        key=lambda row: (row["created_at"], row["id"]),
+        reverse=True,
+    )
+    assert ids == [row["id"] for row in expected]
+    assert pages == 4
+
+
+def test_round_trip_with_null_created_at(memory_supabase):
+    memory_supabase.seed("unit_users", [
+        {"unit_id": UNIT_ID, "user_id": f"user-{i}", "role": "gestor",
+         "created_at": None if i % 3 == 0 else f"2026-10-{10 + i:02d}T08:00:00+00:00"}
+        for i in range(11)
+    ])
+
+    ids, _ = collect_pages(UnitUserService.list_unit_users_page, limit=2)
+
+    rows = memory_supabase.table("unit_users")
+    nulls = sorted((row for row in rows if row["created_at"] is None), key=lambda row: row["id"], reverse=True)
+    dated = sorted((row for row in rows if row["created_at"] is not None),
+                   key=lambda row: (row["created_at"], row["id"]), reverse=True)
+    # NULLS FIRST: primeiro os nulos (pelo id), depois os demais, cada linha uma vez
+    assert ids == [row["id"] for row in nulls + dated]
+
+
+def test_encode_decode_round_trip():
+    assert decode_cursor(encode_cursor("2026-10-18T05:00:00+00:00", ROW_ID)) == ("2026-10-18T05:00:00+00:00", ROW_ID)
+    assert decode_cursor(encode_cursor(None, ROW_ID)) == (None, ROW_ID)
+    assert decode_cursor(encode_cursor("2026-10-18", ROW_ID)) == ("2026-10-18", ROW_ID)
+
+
+@pytest.mark.parametrize("cursor", [
+    "não-é-base64!",
+    raw_cursor("2026-10-18T05:00:00", "não-é-uuid"),
+    raw_cursor("2026-10-18T05:00:00", ROW_ID + '"),id.gt.("0'),
+    raw_cursor('2026-10-18",created_at.gt."2000-01-01', ROW_ID),
+    raw_cursor("ontem", ROW_ID),
+    raw_cursor(123, ROW_ID),
+])
+def test_invalid_cursor_is_400(memory_supabase, cursor):
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(OrderService.list_orders_page(unit_id=UNIT_ID, limit=5, cursor=cursor))
+    assert error.value.status_code == 400
+    assert memory_supabase.requests == 0
@@ -0,0 +1,44 @@
+"""
+Contadores do pool de hash de senha (lib/password_pool).
+"""
+import asyncio
+
+import pytest
+
+import lib.password_pool as password_pool
+
+
+@pytest.fixture
+def fresh_metrics(monkeypatch):
+    monkeypatch.setattr(password_pool, "_metrics", {key: 0 for key in password_pool._metrics})
+
+
+def fail():
+    raise ValueError("hash inválido")
+
+
+def test_failures_are_not_completed(fresh_metrics):
+    async def scenario():
+        assert await password_pool.run_in_password_pool(lambda value: value * 2, 21) == 42
+        with pytest.raises(ValueError):
+            await password_pool.run_in_password_pool(fail)
+
+    asyncio.run(scenario())
+    stats = password_pool.password_pool_stats()
+
+    assert stats["completed"] == 1
+    assert stats["failed"] == 1
+    assert stats["in_flight"] == 0
+
+
+def test_concurrent_counts(fresh_metrics):
+    async def scenario():
+        await asyncio.gather(*[
+            password_pool.run_in_password_pool(sum, range(1000)) for _ in range(50)
+        ])
+
+    asyncio.run(scenario())
+    stats = password_pool.password_pool_stats()
+
+    assert stats["completed"] == 50
+    assert stats["failed"] == stats["rejected"] == stats["in_flight"] == 0
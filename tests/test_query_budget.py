@@ -0,0 +1,109 @@
+"""
+Orçamento de consultas e detector de N+1 (lib/query_budget) nas listagens, com o
+backend em memória.
+"""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from lib.query_budget import track_queries
+from lib.supabase_client import execute, supabase
+from repositories.user_repository import UserRepository
+from services.order_service import OrderService
+from services.reports_service import ReportsService
+from services.unit_user_service import UnitUserService
+
+UNIT_ID = "00000000-0000-0000-0000-0000000000aa"
+
+
+def seed_unit(memory_supabase, users: int = 10, orders: int = 10):
+    memory_supabase.seed("units", [{"id": UNIT_ID, "name": "Unidade"}])
+    created_users = memory_supabase.seed("users", [
+        {
+            "email": f"user{i}@unas.org.br",
+            "password": "hash-" + "x" * 20,
+            "username": f"user{i}",
+            "role": "gestor",
+            "active": True,
+            "email_verified": True,
+        }
+        for i in range(users)
+    ])
+    memory_supabase.seed("unit_users", [
+        {"unit_id": UNIT_ID, "user_id": user["id"], "role": "gestor"} for user in created_users
+    ])
+    created_orders = memory_supabase.seed("orders", [
+        {"unit_id": UNIT_ID, "description": f"pedido {i}", "amount": 10.0, "status": "pending"}
+        for i in range(orders)
+    ])
+    memory_supabase.seed("order_items", [
+        {"order_id": order["id"], "description": "arroz", "amount": 5.0, "measure_unit": "pacote", "received": True}
+        for order in created_orders
+        for _ in range(2)
+    ])
+    return created_users, created_orders
+
+
+def test_list_orders_within_budget(memory_supabase, query_budget):
+    _, orders = seed_unit(memory_supabase)
+    query_budget(budget=2)
+
+    with track_queries("list_orders") as stats:
+        result = asyncio.run(OrderService.list_orders(unit_id=UNIT_ID))
+
+    assert len(result) == len(orders)
+    assert all(len(order.items) == 2 for order in result)
+    assert stats.queries == 2
+
+
+def test_list_users_by_unit_within_budget(memory_supabase, query_budget):
+    users, _ = seed_unit(memory_supabase)
+    query_budget(budget=3)
+
+    with track_queries("list_users_by_unit") as stats:
+        result = asyncio.run(UnitUserService.list_users_by_unit(UNIT_ID))
+
+    assert sorted(user.id for user in result) == sorted(user["id"] for user in users)
+    assert stats.queries == 3
+
+
+def test_n_plus_one_raises(memory_supabase, query_budget):
+    users, _ = seed_unit(memory_supabase)
+    query_budget(n_plus_one=3)
+
+    async def one_query_per_user():
+        for user in users:
+            await UserRepository.get_user("id", user["id"])
+
+    with track_queries("n_plus_one"), pytest.raises(HTTPException) as error:
+        asyncio.run(one_query_per_user())
+    assert "N+1" in error.value.detail
+
+
+def test_concurrent_queries_count_when_dispatched(memory_supabase, query_budget):
+    seed_unit(memory_supabase)
+    query_budget(budget=2, n_plus_one=0)
+
+    async def three_at_once():
+        await asyncio.gather(*[
+            execute(supabase.table(table).select("*"))
+            for table in ("units", "orders", "order_items")
+        ])
+
+    with track_queries("gather") as stats, pytest.raises(HTTPException):
+        asyncio.run(three_at_once())
+    assert stats.queries == 3
+
+
+def test_unit_report_within_budget(memory_supabase, query_budget):
+    seed_unit(memory_supabase)
+    query_budget(budget=5)
+
+    with track_queries("unit_report") as stats:
+        report = asyncio.run(ReportsService.get_unit_report(UNIT_ID))
+
+    assert report.metrics.total_spending == 100.0
+    # unidade, estoque, orçamentos, frequências e pedidos; nada de unit_users/users
+    assert stats.queries == 5
+    assert not {"unit_users", "users"} & {table for table, _ in stats.by_table}
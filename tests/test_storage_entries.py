@@ -0,0 +1,71 @@
+"""
+Entradas de estoque (upsert em (unit_id, name)) com o backend em memória.
+"""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from entities.dtos.storage_dto import StorageBulkEntryDTO, StorageEntryDTO
+from services.storage_service import StorageService
+
+UNIT_ID = "00000000-0000-0000-0000-0000000000bb"
+
+
+def entry(**values) -> StorageEntryDTO:
+    data = {
+        "name": "Arroz",
+        "amount": 5.0,
+        "unit_id": UNIT_ID,
+        "type": "comprado",
+        "responsible": "Maria",
+        "date": "2026-10-01",
+        "initial_quantity": 10,
+    }
+    data.update(values)
+    return StorageEntryDTO(**data)
+
+
+def test_entry_on_existing_item_keeps_type_and_amount(memory_supabase):
+    memory_supabase.seed("units", [{"id": UNIT_ID, "name": "Unidade"}])
+
+    created = asyncio.run(StorageService.register_entry(entry()))
+    updated = asyncio.run(StorageService.register_entry(entry(type="doado", amount=9.0, initial_quantity=4)))
+
+    assert updated.id == created.id
+    assert updated.initial_quantity == 14
+    assert updated.type == "comprado"
+    assert updated.amount == 5.0
+
+
+def test_bulk_entry_creates_and_increments(memory_supabase):
+    memory_supabase.seed("units", [{"id": UNIT_ID, "name": "Unidade"}])
+    asyncio.run(StorageService.register_entry(entry()))
+
+    result = asyncio.run(StorageService.register_entries(StorageBulkEntryDTO(
+        unit_id=UNIT_ID,
+        type="doado",
+        responsible="Maria",
+        date="2026-10-01",
+        items=[
+            {"name": "Feijão", "amount": 7.0, "initial_quantity": 3},
+            {"name": "Arroz", "amount": 6.0, "initial_quantity": 2},
+            {"name": "Feijão", "amount": 8.0, "initial_quantity": 1},
+        ],
+    )))
+
+    assert [(item.name, item.initial_quantity, item.type, item.amount) for item in result] == [
+        ("Feijão", 4, "doado", 8.0),
+        ("Arroz", 12, "comprado", 5.0),
+    ]
+
+
+def test_zero_quantity_creates_new_item_but_not_increment(memory_supabase):
+    memory_supabase.seed("units", [{"id": UNIT_ID, "name": "Unidade"}])
+
+    created = asyncio.run(StorageService.register_entry(entry(initial_quantity=0)))
+    assert created.initial_quantity == 0
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(StorageService.register_entry(entry(initial_quantity=0)))
+    assert error.value.status_code == 400